@@ -0,0 +1,56 @@
+"""Recall / speed trade-off of approximate k nearest neighbors.
+
+Compares PyntCloud.get_neighbors(k=...) exact search against approximate
+KDTree searches with increasing eps, on the point clouds shipped with the
+repository.
+
+Usage:
+
+    python benchmarks/bench_approximate_k_neighbors.py [k]
+"""
+import os
+import sys
+from timeit import default_timer
+
+import numpy as np
+
+from pyntcloud import PyntCloud
+from pyntcloud.neighbors import EPS_CANDIDATES, k_neighbors, neighbors_recall
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DATASETS = [
+    os.path.join(ROOT, "tests", "data", "sphere.ply"),
+    os.path.join(ROOT, "tests", "data", "mnist.npz"),
+    os.path.join(ROOT, "examples", "data", "ankylosaurus_mesh.ply"),
+]
+
+
+def timed(function, *args, **kwargs):
+    start = default_timer()
+    result = function(*args, **kwargs)
+    return result, default_timer() - start
+
+
+def main(k=16):
+    for path in DATASETS:
+        cloud = PyntCloud.from_file(path)
+        kdtree = cloud.structures[cloud.add_structure("kdtree")]
+
+        exact, exact_time = timed(k_neighbors, kdtree, k)
+        print("{} ({} points, k={})".format(os.path.basename(path), len(cloud.xyz), k))
+        print("{:>8} {:>8} {:>10} {:>8}".format("eps", "recall", "time (s)", "speedup"))
+        print("{:>8} {:>8.4f} {:>10.4f} {:>8.2f}".format(0, 1, exact_time, 1))
+
+        for eps in EPS_CANDIDATES:
+            approximate, approximate_time = timed(k_neighbors, kdtree, k, eps=eps)
+            print("{:>8} {:>8.4f} {:>10.4f} {:>8.2f}".format(
+                eps,
+                neighbors_recall(approximate, exact),
+                approximate_time,
+                exact_time / approximate_time))
+        print()
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,61 @@
+"""Closed-form 3x3 eigen solvers against numpy.linalg.
+
+Times the eigen decomposition of the neighbourhood covariances of the point
+clouds shipped with the repository.
+
+Usage:
+
+    python benchmarks/bench_eigh3D.py [k]
+"""
+import os
+import sys
+from timeit import default_timer
+
+import numpy as np
+
+from pyntcloud import PyntCloud
+from pyntcloud.utils.array import cov3D, eigh3D, eigvalsh3D
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DATASETS = [
+    os.path.join(ROOT, "tests", "data", "sphere.ply"),
+    os.path.join(ROOT, "examples", "data", "ankylosaurus_mesh.ply"),
+]
+
+SOLVERS = [
+    ("numpy.linalg.eigvals", np.linalg.eigvals),
+    ("numpy.linalg.eigvalsh", np.linalg.eigvalsh),
+    ("eigvalsh3D", eigvalsh3D),
+    ("numpy.linalg.eig", np.linalg.eig),
+    ("numpy.linalg.eigh", np.linalg.eigh),
+    ("numpy.linalg.svd", np.linalg.svd),
+    ("eigh3D", eigh3D),
+]
+
+
+def timed(function, *args, **kwargs):
+    start = default_timer()
+    result = function(*args, **kwargs)
+    return result, default_timer() - start
+
+
+def main(k=16):
+    for path in DATASETS:
+        cloud = PyntCloud.from_file(path)
+        k_neighbors = cloud.get_neighbors(k=k)
+        xyz = cloud.xyz.astype(np.float64)
+        cov = cov3D(xyz[np.c_[np.arange(len(xyz)), k_neighbors]])
+
+        expected = np.linalg.eigvalsh(cov)[:, ::-1]
+        error = np.abs(eigvalsh3D(cov) - expected).max() / np.abs(expected).max()
+        print("{} ({} points, k={}, max relative error {:.2e})".format(
+            os.path.basename(path), len(xyz), k, error))
+        print("{:>24} {:>10}".format("solver", "time (s)"))
+        for name, solver in SOLVERS:
+            print("{:>24} {:>10.4f}".format(name, timed(solver, cov)[1]))
+        print()
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
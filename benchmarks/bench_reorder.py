@@ -0,0 +1,57 @@
+"""Neighbor heavy scalar fields before and after spatial reordering.
+
+Points are first shuffled to mimic a spatially incoherent scanner order, then
+reordered along Morton and Hilbert curves with PyntCloud.reorder.
+
+Usage:
+
+    python benchmarks/bench_reorder.py [k]
+"""
+import os
+import sys
+from timeit import default_timer
+
+import numpy as np
+
+from pyntcloud import PyntCloud
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DATASETS = [
+    os.path.join(ROOT, "tests", "data", "mnist.npz"),
+    os.path.join(ROOT, "examples", "data", "ankylosaurus_mesh.ply"),
+]
+
+
+def timed(function, *args, **kwargs):
+    start = default_timer()
+    result = function(*args, **kwargs)
+    return result, default_timer() - start
+
+
+def neighbor_heavy_fields(cloud, k):
+    k_neighbors = cloud.get_neighbors(k=k)
+    cloud.add_scalar_field("eigen_features", k_neighbors=k_neighbors)
+    cloud.add_scalar_field("normals", k_neighbors=k_neighbors)
+
+
+def main(k=16):
+    for path in DATASETS:
+        cloud = PyntCloud.from_file(path)
+        shuffle = np.random.RandomState(0).permutation(len(cloud.points))
+        cloud.points = cloud.points.iloc[shuffle].reset_index(drop=True)
+
+        print("{} ({} points, k={})".format(os.path.basename(path), len(cloud.points), k))
+        print("{:>10} {:>12} {:>12}".format("order", "reorder (s)", "fields (s)"))
+        for method in ["shuffled", "morton", "hilbert"]:
+            reorder_time = 0
+            if method != "shuffled":
+                reorder_time = timed(cloud.reorder, method=method)[1]
+            fields_time = timed(neighbor_heavy_fields, cloud, k)[1]
+            print("{:>10} {:>12.4f} {:>12.4f}".format(method, reorder_time, fields_time))
+            cloud.reorder(method="original")
+        print()
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,60 @@
+"""Voxel assignment with searchsorted over segments against arithmetic voxelize.
+
+Points are drawn uniformly inside the unit cube, as float32 like the points of
+a PyntCloud. The numba kernel is run once before timing to exclude compilation.
+
+Usage:
+
+    python benchmarks/bench_voxelize.py [n_points] [n]
+"""
+import sys
+from timeit import default_timer
+
+import numpy as np
+
+import pyntcloud.structures.voxelgrid as voxelgrid_module
+
+
+def timed(function, *args, **kwargs):
+    start = default_timer()
+    result = function(*args, **kwargs)
+    return result, default_timer() - start
+
+
+def searchsorted_voxelize(points, segments):
+    x_y_z = [len(s) - 1 for s in segments]
+    ijk = [np.clip(np.searchsorted(segments[i], points[:, i]) - 1, 0, x_y_z[i]) for i in range(3)]
+    return ijk, np.ravel_multi_index(ijk, x_y_z)
+
+
+def numpy_voxelize(points, segments):
+    is_numba_avaliable = voxelgrid_module.is_numba_avaliable
+    voxelgrid_module.is_numba_avaliable = False
+    try:
+        return voxelgrid_module.voxelize(points, segments)
+    finally:
+        voxelgrid_module.is_numba_avaliable = is_numba_avaliable
+
+
+def main(n_points=10 ** 8, n=256):
+    points = np.random.RandomState(0).rand(n_points, 3).astype(np.float32)
+    segments = [np.linspace(0, 1, num=n + 1) for _ in range(3)]
+
+    methods = [("searchsorted", searchsorted_voxelize), ("numpy", numpy_voxelize)]
+    if voxelgrid_module.is_numba_avaliable:
+        voxelgrid_module.voxelize(points[:10], segments)
+        methods.append(("numba", voxelgrid_module.voxelize))
+
+    print("{} points, {}^3 voxels".format(n_points, n))
+    print("{:>14} {:>10} {:>8}".format("method", "time (s)", "equal"))
+    expected = None
+    for name, function in methods:
+        (ijk, voxel_n), seconds = timed(function, points, segments)
+        if expected is None:
+            expected = voxel_n
+        print("{:>14} {:>10.4f} {:>8}".format(name, seconds, str(np.array_equal(voxel_n, expected))))
+        del ijk, voxel_n
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
@@ -6,7 +6,14 @@ import pandas as pd
 from .structures.base import StructuresDict
 from .filters import ALL_FILTERS
 from .io import FROM, TO
-from .neighbors import k_neighbors, r_neighbors
+from .neighbors import (
+    DEFAULT_MAX_MEMORY,
+    calibrate_eps,
+    exclude_self,
+    interpolate_k_neighbors,
+    k_neighbors,
+    r_neighbors,
+    r_neighbors_csr)
 from .plot import DESCRIPTION, plot_PyntCloud
 from .plot.pythreejs import (
     get_pointcloud_pythreejs,
@@ -14,6 +21,7 @@ from .plot.pythreejs import (
 from .samplers import ALL_SAMPLERS
 from .scalar_fields import ALL_SF
 from .structures import ALL_STRUCTURES
+from .utils.array import MORTON_BITS, hilbert_encode, morton_encode
 from .utils.dataframe import convert_columns_dtype
 
 
@@ -56,7 +64,8 @@ class PyntCloud(object):
             "_PyntCloud__mesh",
             "structures",
             "xyz",
-            "centroid"
+            "centroid",
+            "original_order"
         ]
         others = ["\n\t {}: {}".format(x, str(type(getattr(self, x))))
                   for x in self.__dict__ if x not in default]
@@ -155,13 +164,19 @@ class PyntCloud(object):
 
         TO[ext](**kwargs)
 
-    def add_scalar_field(self, name, **kwargs):
+    def add_scalar_field(self, name, dtype=None, **kwargs):
         """Add one or multiple columns to PyntCloud.points.
 
+        All the columns are inserted at once.
+
         Parameters
         ----------
         name: str
             One of the available names. See below.
+        dtype: numpy.dtype, optional
+            Default: None
+            If given, floating point scalar fields are cast to it, i.e.
+            np.float32 to halve the memory of float64 results.
         kwargs
             Vary for each name. See below.
 
@@ -205,11 +220,40 @@ class PyntCloud(object):
                     Returned from: self.get_neighbors(k, ...) /
                     manually querying some self.kdtrees[x] /
                     other methods.
+                or
+                r_neighbors: (indptr, indices) tuple of ndarray
+                    Returned from: self.get_neighbors(r=r, as_csr=True, ...)
+                r: float
+                    Radius of r_neighbors, used to name the scalar fields.
+                min_neighbors: int, optional
+                    Default: 3
+                    Points with fewer r_neighbors get NaN.
 
             eigen_decomposition
 
+            eigen_features
+                features: list of str, optional
+                    Default: None
+                    Subset of the scalar fields that require eigenvalues.
+                    If None, all of them are computed.
+
             eigen_values
 
+            multiscale_eigen_features
+                ks: list of int
+                    Number of neighbors of each scale, at most k.
+                features: list of str, optional
+                    Default: None
+                    See eigen_features.
+
+            normals
+
+            oriented_normals
+                method: {"viewpoint", "mst"}, optional
+                    Default: "viewpoint"
+                viewpoint: (3,) array-like, optional
+                    Default: (0, 0, 0)
+
         **REQUIRE NORMALS**
 
             orientation_degrees
@@ -220,6 +264,22 @@ class PyntCloud(object):
 
             inclination_degrees
 
+            region_growing
+                k_neighbors: (N, k) ndarray
+                    Returned from: self.get_neighbors(k, ...)
+                curvature: str
+                    Name of the curvature column.
+                normals: list of str, optional
+                    Default: None
+                    If None, ["nx", "ny", "nz"] if present, else the
+                    columns added by the normals scalar field.
+                angle_threshold: float, optional
+                    Default: 10
+                curvature_threshold: float, optional
+                    Default: 0.05
+                min_size: int, optional
+                    Default: 1
+
         **REQUIRE RGB**
 
             hsv
@@ -244,6 +304,9 @@ class PyntCloud(object):
             voxel_z
 
             euclidean_clusters
+                connectivity: {6, 18, 26}, optional
+                    Default: 26
+                    Neighbors of each voxel considered connected.
 
 
         **ONLY REQUIRE XYZ**
@@ -281,12 +344,25 @@ class PyntCloud(object):
                 degrees: bool, optional
                     Default: True.
                     Return polar and azimuthal angles in degrees.
+
+            euclidean_clusters_points
+                eps: float
+                    Maximum distance between neighbors.
+                min_points: int, optional
+                    Default: 1
+                    Minimum neighbors of core points.
+                kdtree, hashgrid: str, optional
+                    Default: None
+                    See get_neighbors.
+                sizes: bool, optional
+                    Default: False
+                    Also add the size of the cluster of each point.
         """
         if name in ALL_SF:
             scalar_field = ALL_SF[name](pyntcloud=self, **kwargs)
             scalar_field.extract_info()
             scalar_field.compute()
-            scalar_fields_added = scalar_field.get_and_set()
+            scalar_fields_added = scalar_field.get_and_set(dtype=dtype)
 
         else:
             raise ValueError("Unsupported scalar field. Check docstring")
@@ -339,9 +415,45 @@ class PyntCloud(object):
                     Default: True
                     If True, the bounding box of the point cloud will be adjusted
                     in order to have all the dimensions of equal length.
+                sparse: bool, optional
+                    Default: False
+                    If True, only the occupied voxels are stored and feature
+                    vectors are returned in coordinate (COO) form.
+
+            hashgrid
+                size: float
+                    Side of each cubic cell of the spatial hash.
+                    Radius queries with r <= size only visit 27 cells.
 
             octree
-                TODO
+                max_level: int, optional
+                    Default: 2
+                    Number of subdivisions of the bounding box. At most 21.
+
+            voxel_accumulator
+                size: float
+                    Side of each cubic voxel.
+                origin: (3,) array-like, optional
+                    Default: None
+                    Corner of the voxel (0, 0, 0). If None, the minimum of the points.
+                decay: float, optional
+                    Default: 1
+                    Counts and sums are multiplied by decay before adding each new frame.
+                max_frames: int, optional
+                    Default: None
+                    If not None, only the last max_frames frames are kept.
+                Add later frames with structure.add_points.
+
+            voxel_pyramid
+                max_level: int, optional
+                    Default: 6
+                    The finest level has 2 ** max_level voxels along each axis.
+                n_levels: int, optional
+                    Default: 4
+                    Number of levels, from max_level - n_levels + 1 to max_level.
+                sparse: bool, optional
+                    Default: False
+                The VoxelGrid of each level is also added to the structures.
 
         """
         if name in ALL_STRUCTURES:
@@ -497,7 +609,50 @@ class PyntCloud(object):
         else:
             raise ValueError("Unsupported sampling method. Check docstring")
 
-    def get_neighbors(self, k=None, r=None, kdtree=None):
+    def get_feature_vector(self, voxelgrid, mode="binary", truncation=None, kdtree=None):
+        """Feature vector of a VoxelGrid of self.structures.
+
+        Parameters
+        ----------
+        voxelgrid: str
+            VoxelGrid.id in self.structures.
+
+        mode: str, optional
+            Default: "binary"
+            See VoxelGrid.get_feature_vector.
+
+        truncation: float, optional
+            Default: None
+            Only for TDF. See VoxelGrid.get_truncated_distances.
+
+        kdtree: str, optional
+            Default: None
+            Only for TDF. KDTree.id in self.structures.
+
+            - If **kdtree** is None:
+
+            The first KDTree in self.structures will be used. If there is
+            none, it will be computed and added to self.
+
+        Returns
+        -------
+        feature_vector: ndarray or tuple
+            See VoxelGrid.get_feature_vector.
+        """
+        voxelgrid = self.structures[voxelgrid]
+        if mode != "TDF":
+            return voxelgrid.get_feature_vector(mode)
+
+        if kdtree is None:
+            kdtree = next((x for x in self.structures if x.startswith("K")), None)
+            if kdtree is None:
+                kdtree = self.add_structure("kdtree")
+        kdtree = self.structures[kdtree]
+
+        return voxelgrid.get_feature_vector(mode, truncation=truncation, kdtree=kdtree)
+
+    def get_neighbors(self, k=None, r=None, kdtree=None, hashgrid=None, as_csr=False,
+                      max_memory=DEFAULT_MAX_MEMORY, approximate=False, recall=0.95, eps=None):
         """For each point finds the indices that compose its neighborhood.
 
         Parameters
@@ -524,15 +679,56 @@ class PyntCloud(object):
 
             The given KDTree will be used for neighbor search.
 
+        hashgrid: str, optional
+            Default: None
+            HashGrid.id in self.structures.
+            If not None, the given HashGrid will be used for neighbor search
+            instead of a KDTree. Requires 'r'. If 'k' is also given, only the
+            'k' nearest neighbors within 'r' are returned, padded with N.
+
+        as_csr: bool, optional
+            Default: False
+            Only used with r. If True, return the neighborhoods in compressed
+            sparse row layout instead of an array of lists.
+
+        max_memory: int, optional
+            Default: neighbors.DEFAULT_MAX_MEMORY
+            Only used with k. Approximate number of bytes used by the temporaries
+            of each block of queried points.
+
+        approximate: bool, optional
+            Default: False
+            Only used with k. If True, trade accuracy for speed using an
+            approximate KDTree search, tuned to find at least 'recall' of the
+            true neighbors. See neighbors.calibrate_eps.
+
+        recall: float, optional
+            Default: 0.95
+            Only used with approximate. Minimum mean fraction of the true
+            'k' nearest neighbors that must be found.
+            The calibrated eps is cached in the KDTree for each 'k' and
+            'recall', so pass 'kdtree' to calibrate only once across calls.
+
+        eps: float, optional
+            Default: None
+            Only used with k. If not None, approximate search with this eps
+            instead of calibrating one. See neighbors.iter_k_neighbors.
+
         Returns
         -------
         neighbors: array-like
-            (N, k) ndarray if k is not None.
+            (N, k) int32 ndarray if k is not None.
                 Indices of the 'k' nearest neighbors for the 'N' points.
             (N,) ndarray of lists if r is not None.
                 Array holding a variable number of indices corresponding
                 to the neighbors with distance < r.
+            (indptr, indices) tuple of ndarray if r is not None and as_csr.
+                The neighbors of point i are indices[indptr[i]:indptr[i + 1]].
+                See neighbors.r_neighbors_csr.
         """
+        if hashgrid is not None:
+            return self._get_hashgrid_neighbors(self.structures[hashgrid], k, r, as_csr)
+
         if kdtree is None:
             kdtree_id = self.add_structure("kdtree")
             kdtree = self.structures[kdtree_id]
@@ -540,14 +736,161 @@ class PyntCloud(object):
             kdtree = self.structures[kdtree]
 
         if k is not None:
-            return k_neighbors(kdtree, k)
+            if eps is None:
+                eps = 0
+                if approximate:
+                    if (k, recall) not in kdtree.calibrated_eps:
+                        kdtree.calibrated_eps[k, recall] = calibrate_eps(kdtree, k, recall)
+                    eps = kdtree.calibrated_eps[k, recall]
+            return k_neighbors(kdtree, k, max_memory=max_memory, eps=eps)
 
         elif r is not None:
+            if as_csr:
+                return r_neighbors_csr(kdtree, r)
             return r_neighbors(kdtree, r)
 
         else:
             raise ValueError("You must supply 'k' or 'r' values.")
 
+    def _get_hashgrid_neighbors(self, hashgrid, k, r, as_csr):
+        """Utility function. HashGrid backend of get_neighbors."""
+        if r is None:
+            raise ValueError("You must supply 'r' value to use a HashGrid.")
+
+        if k is not None:
+            return exclude_self(hashgrid.query_knn(self.xyz, k + 1, r)[1])
+
+        indptr, indices = hashgrid.query_radius(self.xyz, r)
+        if as_csr:
+            return indptr, indices
+
+        neighbors = np.empty(len(self.xyz), dtype=object)
+        neighbors[:] = [x.tolist() for x in np.split(indices, indptr[1:-1])]
+        return neighbors
+
+    def transfer_fields(self, source, fields, k=1, weighting="uniform", kdtree=None,
+                        max_memory=DEFAULT_MAX_MEMORY):
+        """Add scalar fields interpolated from the nearest points of another PyntCloud.
+
+        Parameters
+        ----------
+        source: PyntCloud
+            Point cloud holding the scalar fields.
+
+        fields: list of str
+            Names of the columns of source.points to be transferred.
+
+        k: int, optional
+            Default: 1
+            Number of nearest source points used for each point, at most
+            the number of source points.
+            With k=1 values are copied, keeping their dtype (i.e. labels).
+
+        weighting: {"uniform", "distance"}, optional
+            Default: "uniform"
+            How the k neighbors are averaged when k > 1.
+
+        kdtree: str, optional
+            Default: None
+            KDTree.id in source.structures.
+
+            - If **kdtree** is None:
+
+            The first KDTree in source.structures will be used. If there is
+            none, it will be computed and added to source.
+
+        max_memory: int, optional
+            Default: neighbors.DEFAULT_MAX_MEMORY
+            Approximate number of bytes used by the temporaries of each block
+            of queried points.
+
+        Returns
+        -------
+        fields: list of str
+            The name of each of the columns added to self.points.
+        """
+        if kdtree is None:
+            kdtree = next((x for x in source.structures if x.startswith("K")), None)
+            if kdtree is None:
+                kdtree = source.add_structure("kdtree")
+        kdtree = source.structures[kdtree]
+
+        values = interpolate_k_neighbors(
+            kdtree,
+            self.xyz,
+            [source.points[x].values for x in fields],
+            k=k,
+            weighting=weighting,
+            max_memory=max_memory)
+
+        self._add_columns(pd.DataFrame(dict(zip(fields, values)), index=self.points.index))
+
+        return fields
+
+    def reorder(self, method="morton", bits=MORTON_BITS):
+        """Sort the points along a space filling curve for memory locality.
+
+        Neighbors queries, voxel group-bys and gathers like xyz[k_neighbors]
+        touch contiguous memory when nearby points are stored together.
+
+        Parameters
+        ----------
+        method: {"morton", "hilbert", "original"}, optional
+            Default: "morton"
+            "morton": Z-order curve.
+            "hilbert": Hilbert curve. Better locality than "morton", slower to compute.
+            "original": undo all the previous reorders.
+
+        bits: int, optional
+            Default: utils.array.MORTON_BITS
+            Resolution of the curve along each axis. At most MORTON_BITS.
+
+        Returns
+        -------
+        permutation: (N,) ndarray
+            Point i is now the one previously at position permutation[i].
+
+        Notes
+        -----
+        The mesh is remapped to the new positions and structures are removed.
+        self.original_order[i] is the position of point i before any reorder.
+        """
+        original_order = self.original_order
+        if method == "original":
+            if original_order is None:
+                original_order = np.arange(len(self.xyz))
+            permutation = np.argsort(original_order)
+        elif method in ("morton", "hilbert"):
+            if not 1 <= bits <= MORTON_BITS:
+                raise ValueError("bits must be between 1 and {}".format(MORTON_BITS))
+            xyz = self.xyz.astype(np.float64)
+            xyzmin = xyz.min(0)
+            scale = (2 ** bits - 1) / max(xyz.ptp(0).max(), np.finfo(np.float64).tiny)
+            ijk = ((xyz - xyzmin) * scale).astype(np.int64)
+            if method == "morton":
+                codes = morton_encode(ijk)
+            else:
+                codes = hilbert_encode(ijk, bits=bits)
+            permutation = np.argsort(codes, kind="mergesort")
+        else:
+            raise ValueError("Unsupported method: {}".format(method))
+
+        mesh = self.mesh
+        self.points = self.points.iloc[permutation].reset_index(drop=True)
+
+        if mesh is not None:
+            inverse = np.empty_like(permutation)
+            inverse[permutation] = np.arange(len(permutation))
+            mesh = mesh.copy()
+            vertices = ["v1", "v2", "v3"]
+            mesh[vertices] = inverse[mesh[vertices].values]
+            self.mesh = mesh
+
+        if method != "original":
+            self.original_order = permutation if original_order is None else original_order[permutation]
+
+        return permutation
+
     def get_mesh_vertices(self, rgb=False, normals=False):
         """Decompose triangles of self.mesh from vertices in self.points.
 
@@ -617,10 +960,22 @@ class PyntCloud(object):
         if and_return:
             return splits
 
+    def _add_columns(self, df):
+        """Utility function. Add, or replace, all the columns of df to self.points at once.
+
+        Unlike assigning self.points, mesh and structures are kept.
+        """
+        points = self.__points
+        existing = [x for x in df.columns if x in points.columns]
+        if existing:
+            points = points.drop(columns=existing)
+        self.__points = pd.concat([points, df], axis=1, copy=False)
+
     def _update_points(self, df):
         """Utility function. Implicitly called when self.points is assigned."""
         self.mesh = None
         self.structures = StructuresDict()
+        self.original_order = None
         self.__points = df
         self.xyz = self.__points[["x", "y", "z"]].values
         self.centroid = self.xyz.mean(0)
@@ -1,3 +1,13 @@
 
-from .k_neighbors import k_neighbors
-from .r_neighbors import r_neighbors
+from .k_neighbors import (
+    DEFAULT_MAX_MEMORY,
+    EPS_CANDIDATES,
+    block_size,
+    calibrate_eps,
+    exclude_self,
+    interpolate_k_neighbors,
+    iter_k_neighbors,
+    k_neighbors,
+    neighbors_recall
+)
+from .r_neighbors import r_neighbors, r_neighbors_csr
@@ -1,5 +1,69 @@
+import numpy as np
 
-def k_neighbors(kdtree, k):
+#: default memory budget, in bytes, for the temporaries of blocked computations
+DEFAULT_MAX_MEMORY = 2 ** 28
+
+#: eps values tried, in increasing order, by calibrate_eps
+EPS_CANDIDATES = (0.1, 0.25, 0.5, 1., 2., 4.)
+
+
+def block_size(bytes_per_row, max_memory=DEFAULT_MAX_MEMORY):
+    """ Number of rows that can be processed at once within max_memory bytes.
+    """
+    return int(max(1, max_memory // max(1, bytes_per_row)))
+
+
+def iter_k_neighbors(kdtree, k, max_memory=DEFAULT_MAX_MEMORY, return_distances=False, eps=0):
+    """ Query the K nearest neighbors of each point, one block of points at a time.
+
+    Parameters
+    ----------
+    kdtree: pyntcloud.structrues.KDTree
+        The KDTree built on top of the points in point cloud
+
+    k: int
+        Number of neighbors to find
+
+    max_memory: int, optional
+        Default: DEFAULT_MAX_MEMORY
+        Approximate number of bytes used by the temporaries of each block.
+
+    return_distances: bool, optional
+        Default: False
+        If True, also yield the distance to each neighbor.
+
+    eps: float, optional
+        Default: 0
+        Approximate search. The kth returned neighbor is guaranteed to be no
+        further than (1 + eps) times the distance to the real kth neighbor.
+        See calibrate_eps.
+
+    Yields
+    ------
+    start, stop: int
+        The block holds the neighbors of points[start:stop].
+    k_neighbors: (stop - start, k) int32 array
+        int64 if the number of points does not fit in int32.
+    distances: (stop - start, k) float32 array
+        Only if return_distances.
+    """
+    n_points = kdtree.n
+    index_dtype = np.int32 if n_points <= np.iinfo(np.int32).max else np.int64
+    # float64 distances and int64 indices from scipy plus their downcasted copies
+    rows = block_size((k + 1) * 24, max_memory)
+
+    for start in range(0, n_points, rows):
+        stop = min(start + rows, n_points)
+        distances, indices = kdtree.query(kdtree.data[start:stop], k=k + 1, eps=eps, n_jobs=-1)
+        # [:,1:] to discard self-neighbor
+        k_neighbors = indices[:, 1:].astype(index_dtype)
+        if return_distances:
+            yield start, stop, k_neighbors, distances[:, 1:].astype(np.float32)
+        else:
+            yield start, stop, k_neighbors
+
+
+def k_neighbors(kdtree, k, max_memory=DEFAULT_MAX_MEMORY, eps=0):
     """ Get indices of K neartest neighbors for each point
 
     Parameters
@@ -10,11 +74,181 @@ def k_neighbors(kdtree, k):
     k: int
         Number of neighbors to find
 
+    max_memory: int, optional
+        Default: DEFAULT_MAX_MEMORY
+        Approximate number of bytes used by the temporaries of each query block.
+
+    eps: float, optional
+        Default: 0
+        Approximate search. See iter_k_neighbors.
+
+    Returns
+    -------
+    k_neighbors: (N, k) int32 array
+        Where N = kdtree.data.shape[0]
+        int64 if N does not fit in int32.
+    """
+    index_dtype = np.int32 if kdtree.n <= np.iinfo(np.int32).max else np.int64
+    result = np.empty((kdtree.n, k), dtype=index_dtype)
+    for start, stop, block in iter_k_neighbors(kdtree, k, max_memory=max_memory, eps=eps):
+        result[start:stop] = block
+    return result
+
+
+def exclude_self(indices, start=0):
+    """ Remove each point from its own k + 1 neighbors.
+
+    The point is removed by index, not by position: with duplicate points the
+    first neighbor may be a duplicate instead of the point itself. Rows where
+    the point is missing drop their last neighbor instead.
+
+    Parameters
+    ----------
+    indices: (M, k + 1) ndarray
+        Neighbors of the points start, start + 1, ..., start + M - 1.
+
+    start: int, optional
+        Default: 0
+        Index of the point of the first row.
+
+    Returns
+    -------
+    k_neighbors: (M, k) ndarray
+    """
+    is_self = indices == np.arange(start, start + len(indices))[:, None]
+    keep = ~is_self
+    keep[~is_self.any(1), -1] = False
+    return indices[keep].reshape(len(indices), indices.shape[1] - 1)
+
+
+def neighbors_recall(approximate, exact):
+    """ Mean fraction of the exact neighbors of each point present in approximate.
+
+    Parameters
+    ----------
+    approximate, exact: (N, k) array
+        Neighbor indices of the same N points.
+
+    Returns
+    -------
+    recall: float
+    """
+    hits = (approximate[:, :, None] == exact[:, None, :]).any(1).sum(1)
+    return hits.mean() / exact.shape[1]
+
+
+def calibrate_eps(kdtree, k, recall, n_samples=1000, candidates=EPS_CANDIDATES, random_state=None):
+    """ Find the largest eps whose k neighbors reach the given recall.
+
+    The recall of each candidate is measured against the exact search on a
+    random sample of the points.
+
+    Parameters
+    ----------
+    kdtree: pyntcloud.structrues.KDTree
+        The KDTree built on top of the points in point cloud
+
+    k: int
+        Number of neighbors to find
+
+    recall: float
+        Minimum mean fraction, between 0 and 1, of the true k neighbors found.
+
+    n_samples: int, optional
+        Default: 1000
+        Number of points used to measure the recall.
+
+    candidates: sequence of float, optional
+        Default: EPS_CANDIDATES
+        eps values to try, in increasing order.
+
+    random_state: int, optional
+        Default: None
+        Seed used to choose the sample.
+
     Returns
     -------
-    k_neighbors: (N, k) array
+    eps: float
+        0 if no candidate reaches the recall.
+    """
+    random_state = np.random.RandomState(random_state)
+    sample = random_state.choice(kdtree.n, size=min(n_samples, kdtree.n), replace=False)
+    query = kdtree.data[sample]
+    exact = kdtree.query(query, k=k + 1, n_jobs=-1)[1][:, 1:]
+
+    best = 0
+    for eps in candidates:
+        approximate = kdtree.query(query, k=k + 1, eps=eps, n_jobs=-1)[1][:, 1:]
+        if neighbors_recall(approximate, exact) < recall:
+            break
+        best = eps
+    return best
+
+
+def interpolate_k_neighbors(kdtree, points, values, k=1, weighting="uniform", max_memory=DEFAULT_MAX_MEMORY):
+    """ Interpolate values of the points in kdtree at other points.
+
+    Parameters
+    ----------
+    kdtree: pyntcloud.structrues.KDTree
+        The KDTree built on top of the points holding the values.
+
+    points: (M, 3) array
+        Points where the values will be interpolated.
+
+    values: list of (N,) array
         Where N = kdtree.data.shape[0]
+
+    k: int, optional
+        Default: 1
+        Number of nearest neighbors used for each point, at most N. With
+        k=1 the values are copied and keep their dtype.
+
+    weighting: {"uniform", "distance"}, optional
+        Default: "uniform"
+        "uniform": mean of the k neighbors.
+        "distance": mean of the k neighbors weighted by inverse distance.
+
+    max_memory: int, optional
+        Default: DEFAULT_MAX_MEMORY
+        Approximate number of bytes used by the temporaries of each query block.
+
+    Returns
+    -------
+    interpolated: list of (M,) array
     """
-    # [1] to select indices and ignore distances
-    # [:,1:] to discard self-neighbor
-    return kdtree.query(kdtree.data, k=k + 1, n_jobs=-1)[1][:, 1:]
+    if weighting not in ("uniform", "distance"):
+        raise ValueError("Unsupported weighting: {}".format(weighting))
+    if k > kdtree.n:
+        raise ValueError("k must be at most the number of points in kdtree ({}), got {}".format(kdtree.n, k))
+
+    if k == 1:
+        result = [np.empty(len(points), dtype=x.dtype) for x in values]
+    else:
+        result = [np.empty(len(points), dtype=np.result_type(x.dtype, np.float32)) for x in values]
+
+    # float64 distances, int64 indices and weights
+    rows = block_size(k * 24, max_memory)
+    for start in range(0, len(points), rows):
+        stop = min(start + rows, len(points))
+        distances, indices = kdtree.query(points[start:stop], k=k, n_jobs=-1)
+
+        if k == 1:
+            for x, out in zip(values, result):
+                out[start:stop] = x[indices]
+            continue
+
+        if weighting == "uniform":
+            weights = np.full(indices.shape, 1 / k)
+        else:
+            with np.errstate(divide="ignore"):
+                weights = 1 / distances
+            # points matching a neighbor exactly only take that neighbor's value
+            exact = np.isinf(weights)
+            weights = np.where(exact.any(1, keepdims=True), exact, weights)
+            weights /= weights.sum(1, keepdims=True)
+
+        for x, out in zip(values, result):
+            out[start:stop] = np.einsum("ij,ij->i", weights, x[indices])
+
+    return result
@@ -1,3 +1,5 @@
+from itertools import chain
+
 import numpy as np
 
 
@@ -19,3 +21,70 @@ def r_neighbors(kdtree, r):
         len(X) varies for each point
     """
     return np.array(kdtree.query_ball_tree(kdtree, r))
+
+
+def r_neighbors_csr(kdtree, r, return_distances=False, chunk_size=100000):
+    """ Get indices of all nearest neighbors with a distance <= r for each point
+    in compressed sparse row (CSR) layout.
+
+    The neighbors of point i are indices[indptr[i]:indptr[i + 1]], including
+    the point itself, like in r_neighbors.
+
+    Parameters
+    ----------
+    kdtree: pyntcloud.structrues.KDTree
+        The KDTree built on top of the points in point cloud
+
+    r: float
+        Maximum distance to consider a neighbor
+
+    return_distances: bool, optional
+        Default: False
+        If True, also return the distance to each neighbor.
+
+    chunk_size: int, optional
+        Default: 100000
+        Number of points queried at once. Bounds the number of intermediate
+        Python lists alive at any time.
+
+    Returns
+    -------
+    indptr: (N + 1,) ndarray
+        int32 if the total number of neighbors allows it, int64 otherwise.
+    indices: (indptr[-1],) int32 ndarray
+        int64 if N does not fit in int32.
+    distances: (indptr[-1],) float32 ndarray
+        Only if return_distances.
+    """
+    n_points = kdtree.n
+    index_dtype = np.int32 if n_points <= np.iinfo(np.int32).max else np.int64
+
+    counts = np.empty(n_points, dtype=np.int64)
+    indices = []
+    distances = []
+    for start in range(0, n_points, chunk_size):
+        stop = min(start + chunk_size, n_points)
+        chunk = kdtree.data[start:stop]
+        chunk_neighbors = kdtree.query_ball_point(chunk, r, n_jobs=-1)
+        chunk_counts = np.fromiter(map(len, chunk_neighbors), dtype=np.int64, count=len(chunk_neighbors))
+        counts[start:stop] = chunk_counts
+        chunk_indices = np.fromiter(
+            chain.from_iterable(chunk_neighbors), dtype=index_dtype, count=chunk_counts.sum())
+        indices.append(chunk_indices)
+
+        if return_distances:
+            diffs = kdtree.data[chunk_indices] - np.repeat(chunk, chunk_counts, axis=0)
+            distances.append(np.sqrt(np.einsum("ij,ij->i", diffs, diffs)).astype(np.float32))
+
+    indptr = np.zeros(n_points + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    if indptr[-1] <= np.iinfo(np.int32).max:
+        indptr = indptr.astype(np.int32)
+
+    indices = np.concatenate(indices) if indices else np.empty(0, dtype=index_dtype)
+
+    if return_distances:
+        distances = np.concatenate(distances) if distances else np.empty(0, dtype=np.float32)
+        return indptr, indices, distances
+
+    return indptr, indices
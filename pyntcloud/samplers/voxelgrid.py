@@ -1,4 +1,3 @@
-import numpy as np
 import pandas as pd
 
 from scipy.spatial.distance import cdist
@@ -7,32 +6,40 @@ from .base import Sampler
 
 
 class VoxelgridSampler(Sampler):
+    #: whether the sampler needs the voxel of each point, which VoxelAccumulator doesn't keep
+    needs_voxel_n = False
+
     def __init__(self, *, pyntcloud, voxelgrid_id):
         super().__init__(pyntcloud=pyntcloud)
         self.voxelgrid_id = voxelgrid_id
 
     def extract_info(self):
         self.voxelgrid = self.pyntcloud.structures[self.voxelgrid_id]
+        if self.needs_voxel_n and not hasattr(self.voxelgrid, "voxel_n"):
+            raise TypeError("{} needs a VoxelGrid, {} does not keep the voxel of each point".format(
+                type(self).__name__, type(self.voxelgrid).__name__))
 
 
 class VoxelgridCentersSampler(VoxelgridSampler):
     """Returns the points that represent each occupied voxel's center."""
     def compute(self):
         return pd.DataFrame(
-            self.voxelgrid.voxel_centers[np.unique(self.voxelgrid.voxel_n)],
+            self.voxelgrid.get_voxel_centers(),
             columns=["x", "y", "z"])
 
 
 class VoxelgridCentroidsSampler(VoxelgridSampler):
     """Returns the centroid of each group of points inside each occupied voxel."""
     def compute(self):
-        df = pd.DataFrame(self.pyntcloud.xyz, columns=["x", "y", "z"])
-        df["voxel_n"] = self.voxelgrid.voxel_n
-        return df.groupby("voxel_n").mean()
+        centroids = self.voxelgrid.aggregate({"x": ["mean"], "y": ["mean"], "z": ["mean"]})
+        centroids.columns = ["x", "y", "z"]
+        return centroids.astype(self.pyntcloud.xyz.dtype)
 
 
 class VoxelgridNearestSampler(VoxelgridSampler):
     """Returns the N closest points to each occupied voxel's center."""
+    needs_voxel_n = True
+
     def __init__(self, *, pyntcloud, voxelgrid_id, n=1):
         super().__init__(pyntcloud=pyntcloud, voxelgrid_id=voxelgrid_id)
         self.n = n
@@ -44,7 +51,7 @@ class VoxelgridNearestSampler(VoxelgridSampler):
         nearests = []
         for voxel_n, x in self.pyntcloud.points.groupby(voxel_n_id, sort=False):
             xyz = x.loc[:, ["x", "y", "z"]].values
-            center = self.voxelgrid.voxel_centers[voxel_n]
+            center = self.voxelgrid.get_voxel_centers(voxel_n)
             voxel_nearest = cdist([center], xyz)[0].argsort()[:self.n]
             nearests.extend(x.index.values[voxel_nearest])
         return self.pyntcloud.points.iloc[nearests].reset_index(drop=True)
@@ -52,6 +59,8 @@ class VoxelgridNearestSampler(VoxelgridSampler):
 
 class VoxelgridHighestSampler(VoxelgridSampler):
     """Returns the highest points of each voxel."""
+    needs_voxel_n = True
+
     def compute(self):
         voxel_n_id = "voxel_n({})".format(self.voxelgrid_id)
         if voxel_n_id not in self.pyntcloud.points:
@@ -10,14 +10,18 @@ from .eigenvalues import (
 )
 from .k_neighbors import (
     EigenDecomposition,
+    EigenFeatures,
     EigenValues,
+    MultiscaleEigenFeatures,
+    OrientedNormals,
     UnorientedNormals,
 )
 from .normals import (
     InclinationDegrees,
     InclinationRadians,
     OrientationDegrees,
-    OrientationRadians
+    OrientationRadians,
+    RegionGrowing
 )
 from .rgb import (
     HueSaturationValue,
@@ -32,6 +36,7 @@ from .voxelgrid import (
     EuclideanClusters
 )
 from .xyz import (
+    EuclideanClustersPoints,
     PlaneFit,
     SphereFit,
     CustomFit,
@@ -50,13 +55,17 @@ ALL_SF = {
     'sphericity': Sphericity,
     # Kneighbors
     'eigen_decomposition': EigenDecomposition,
+    'eigen_features': EigenFeatures,
     'eigen_values': EigenValues,
+    'multiscale_eigen_features': MultiscaleEigenFeatures,
     'normals': UnorientedNormals,
+    'oriented_normals': OrientedNormals,
     # Normals
     'inclination_degrees': InclinationDegrees,
     'inclination_radians': InclinationRadians,
     'orientation_degrees': OrientationDegrees,
     'orientation_radians': OrientationRadians,
+    'region_growing': RegionGrowing,
     # RGB
     'hsv': HueSaturationValue,
     'relative_luminance': RelativeLuminance,
@@ -72,5 +81,6 @@ ALL_SF = {
     'plane_fit': PlaneFit,
     'sphere_fit': SphereFit,
     'spherical_coords': SphericalCoordinates,
-    'cylindrical_coords': CylindricalCoordinates
+    'cylindrical_coords': CylindricalCoordinates,
+    'euclidean_clusters_points': EuclideanClustersPoints
 }
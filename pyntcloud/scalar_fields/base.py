@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 
+import numpy as np
+import pandas as pd
+
 
 class ScalarField(ABC):
     """Base class for scalar fields."""
@@ -9,11 +12,22 @@ class ScalarField(ABC):
         self.pyntcloud = pyntcloud
         self.to_be_added = OrderedDict()
 
-    def get_and_set(self):
-        sf_added = []
-        for k, v in self.to_be_added.items():
-            sf_added.append(k)
-            self.pyntcloud.points[k] = v
+    def get_and_set(self, dtype=None):
+        """Add all the computed scalar fields to PyntCloud.points at once.
+
+        Parameters
+        ----------
+        dtype: numpy.dtype, optional
+            Default: None
+            If given, floating point scalar fields are cast to it, i.e. np.float32.
+        """
+        df = pd.DataFrame(self.to_be_added, index=self.pyntcloud.points.index)
+        if dtype is not None:
+            floating = [k for k, v in df.dtypes.items() if np.issubdtype(v, np.floating)]
+            if floating:
+                df = df.astype({k: dtype for k in floating}, copy=False)
+        self.pyntcloud._add_columns(df)
+        sf_added = list(self.to_be_added)
 
         if len(sf_added) == 1:
             return sf_added[0]
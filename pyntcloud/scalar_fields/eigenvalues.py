@@ -1,7 +1,57 @@
+from collections import OrderedDict
+
 import numpy as np
 from .base import ScalarField
 
 
+def anisotropy(ev):
+    return np.nan_to_num((ev[:, 0] - ev[:, 2]) / ev[:, 0])
+
+
+def curvature(ev):
+    return np.nan_to_num(ev[:, 2] / (ev[:, 0] + ev[:, 1] + ev[:, 2]))
+
+
+def eigenentropy(ev):
+    result = np.zeros(ev.shape[0])
+    for i in range(3):
+        result += ev[:, i] * np.log(ev[:, i])
+    return np.nan_to_num(-result)
+
+
+def eigen_sum(ev):
+    return ev[:, 0] + ev[:, 1] + ev[:, 2]
+
+
+def linearity(ev):
+    return np.nan_to_num((ev[:, 0] - ev[:, 1]) / ev[:, 0])
+
+
+def omnivariance(ev):
+    return np.nan_to_num((ev[:, 0] * ev[:, 1] * ev[:, 2]) ** (1 / 3))
+
+
+def planarity(ev):
+    return np.nan_to_num((ev[:, 1] - ev[:, 2]) / ev[:, 0])
+
+
+def sphericity(ev):
+    return np.nan_to_num(ev[:, 2] / ev[:, 0])
+
+
+#: map name to function(ev) of (N, 3) eigen values sorted from largest to smallest
+EIGEN_FEATURES = OrderedDict([
+    ("anisotropy", anisotropy),
+    ("curvature", curvature),
+    ("eigenentropy", eigenentropy),
+    ("eigen_sum", eigen_sum),
+    ("linearity", linearity),
+    ("omnivariance", omnivariance),
+    ("planarity", planarity),
+    ("sphericity", sphericity)
+])
+
+
 class EigenValuesScalarField(ScalarField):
     """
     Parameters
@@ -26,8 +76,7 @@ class Anisotropy(EigenValuesScalarField):
     """
     def compute(self):
         name = "anisotropy{}".format(self.k)
-        ev = self.ev
-        self.to_be_added[name] = np.nan_to_num((ev[:, 0] - ev[:, 2]) / ev[:, 0])
+        self.to_be_added[name] = anisotropy(self.ev)
 
 
 class Curvature(EigenValuesScalarField):
@@ -35,8 +84,7 @@ class Curvature(EigenValuesScalarField):
     """
     def compute(self):
         name = "curvature{}".format(self.k)
-        ev = self.ev
-        self.to_be_added[name] = np.nan_to_num(ev[:, 2] / (ev[:, 0] + ev[:, 1] + ev[:, 2]))
+        self.to_be_added[name] = curvature(self.ev)
 
 
 class Eigenentropy(EigenValuesScalarField):
@@ -44,11 +92,7 @@ class Eigenentropy(EigenValuesScalarField):
     """
     def compute(self):
         name = "eigenentropy{}".format(self.k)
-        ev = self.ev
-        result = np.zeros(ev.shape[0])
-        for i in range(3):
-            result += ev[:, i] * np.log(ev[:, i])
-        self.to_be_added[name] = np.nan_to_num(-result)
+        self.to_be_added[name] = eigenentropy(self.ev)
 
 
 class EigenSum(EigenValuesScalarField):
@@ -56,7 +100,7 @@ class EigenSum(EigenValuesScalarField):
     """
     def compute(self):
         name = "eigen_sum{}".format(self.k)
-        self.to_be_added[name] = self.ev[:, 0] + self.ev[:, 1] + self.ev[:, 2]
+        self.to_be_added[name] = eigen_sum(self.ev)
 
 
 class Linearity(EigenValuesScalarField):
@@ -64,8 +108,7 @@ class Linearity(EigenValuesScalarField):
     """
     def compute(self):
         name = "linearity{}".format(self.k)
-        ev = self.ev
-        self.to_be_added[name] = np.nan_to_num((ev[:, 0] - ev[:, 1]) / ev[:, 0])
+        self.to_be_added[name] = linearity(self.ev)
 
 
 class Omnivariance(EigenValuesScalarField):
@@ -73,8 +116,7 @@ class Omnivariance(EigenValuesScalarField):
     """
     def compute(self):
         name = "omnivariance{}".format(self.k)
-        ev = self.ev
-        self.to_be_added[name] = np.nan_to_num((ev[:, 0] * ev[:, 1] * ev[:, 2]) ** (1 / 3))
+        self.to_be_added[name] = omnivariance(self.ev)
 
 
 class Planarity(EigenValuesScalarField):
@@ -82,8 +124,7 @@ class Planarity(EigenValuesScalarField):
     """
     def compute(self):
         name = "planarity{}".format(self.k)
-        ev = self.ev
-        self.to_be_added[name] = np.nan_to_num((ev[:, 1] - ev[:, 2]) / ev[:, 0])
+        self.to_be_added[name] = planarity(self.ev)
 
 
 class Sphericity(EigenValuesScalarField):
@@ -91,5 +132,4 @@ class Sphericity(EigenValuesScalarField):
     """
     def compute(self):
         name = "sphericity{}".format(self.k)
-        ev = self.ev
-        self.to_be_added[name] = np.nan_to_num(ev[:, 2] / ev[:, 0])
+        self.to_be_added[name] = sphericity(self.ev)
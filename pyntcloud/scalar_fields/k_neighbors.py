@@ -1,7 +1,11 @@
 import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import breadth_first_order, connected_components, minimum_spanning_tree
 
 from .base import ScalarField
-from ..utils.array import cov3D
+from .eigenvalues import EIGEN_FEATURES
+from ..neighbors import DEFAULT_MAX_MEMORY, block_size
+from ..utils.array import cov3D_from_csr, cov3D_from_indices, eigh3D, eigvalsh3D, iter_cov3D_prefixes
 
 
 class KNeighborsScalarField(ScalarField):
@@ -9,86 +13,334 @@ class KNeighborsScalarField(ScalarField):
     Parameters
     ----------
     k_neighbors: ndarray
-        (N, k, 3) The k neighbours associated to each of the N points.
+        (N, k) The indices of the k neighbours associated to each of the N points.
+
+    r_neighbors: tuple of ndarray, optional
+        Default: None
+        (indptr, indices) The neighbourhoods, including each point, of radius r
+        in CSR layout, as returned by get_neighbors(r=r, as_csr=True). Used
+        instead of k_neighbors.
+
+    r: float, optional
+        Default: None
+        Radius of r_neighbors, used to name the scalar fields, e.g. "e1(r=0.5)".
+
+    min_neighbors: int, optional
+        Default: 3
+        Points with fewer members in their r_neighbors neighbourhood get NaN.
+
+    max_memory: int, optional
+        Default: neighbors.DEFAULT_MAX_MEMORY
+        Approximate number of bytes used by the temporaries of each block of
+        neighbourhoods processed at once.
     """
 
-    def __init__(self, *, pyntcloud, k_neighbors):
+    def __init__(self, *, pyntcloud, k_neighbors=None, r_neighbors=None, r=None, min_neighbors=3,
+                 max_memory=DEFAULT_MAX_MEMORY):
         super().__init__(pyntcloud=pyntcloud)
-        # add each point to its neighborhood
-        self.k_neighbors_idx = np.c_[range(len(k_neighbors)), k_neighbors]
+        if (k_neighbors is None) == (r_neighbors is None):
+            raise ValueError("Exactly one of k_neighbors and r_neighbors must be given")
+        if r_neighbors is not None and r is None:
+            raise ValueError("r is required with r_neighbors")
+        # each point is added to its neighborhood block by block
+        self.k_neighbors_idx = k_neighbors
+        self.r_neighbors = r_neighbors
+        self.r = r
+        self.min_neighbors = min_neighbors
+        self.max_memory = max_memory
 
     def extract_info(self):
-        self.k_neighbors = self.pyntcloud.xyz[self.k_neighbors_idx]
+        self.xyz = self.pyntcloud.xyz
+        self.dtype = self.xyz.dtype if np.issubdtype(self.xyz.dtype, np.floating) else np.float64
+        if self.r_neighbors is None:
+            self.n_points = len(self.k_neighbors_idx)
+            self.k = self.k_neighbors_idx.shape[1] + 1
+            self.scale = self.k
+        else:
+            self.n_points = len(self.r_neighbors[0]) - 1
+            self.scale = "r={}".format(self.r)
+
+    @property
+    def k_neighbors(self):
+        """(N, k + 1, 3) coordinates of every neighbourhood. Allocated on each access."""
+        return self.xyz[np.c_[range(len(self.k_neighbors_idx)), self.k_neighbors_idx]]
+
+    def iter_blocks(self):
+        """Yield (start, stop) bounds of the blocks of points processed at once."""
+        # float64 origin, offsets, moments, outer products and eigen solver temporaries
+        bytes_per_row = 8 * 64
+        if self.r_neighbors is not None:
+            # offsets and outer products of every member
+            bytes_per_row += 8 * 16 * self.r_neighbors[0][-1] / max(1, self.n_points)
+        rows = block_size(bytes_per_row, self.max_memory)
+        for start in range(0, self.n_points, rows):
+            yield start, min(start + rows, self.n_points)
+
+    def iter_covariances(self):
+        """Yield (start, stop, cov) where cov is the (stop - start, 3, 3)
+        covariance of the neighbourhoods of points[start:stop].
+
+        Neighbourhood coordinates are never gathered, see cov3D_from_indices
+        and cov3D_from_csr. Covariances of r_neighbors neighbourhoods with
+        fewer than min_neighbors members are NaN.
+        """
+        for start, stop in self.iter_blocks():
+            queries = np.arange(start, stop)
+            if self.r_neighbors is None:
+                yield start, stop, cov3D_from_indices(
+                    self.xyz, self.k_neighbors_idx[start:stop], queries=queries)
+            else:
+                indptr, indices = self.r_neighbors
+                indptr = indptr[start:stop + 1]
+                cov, counts = cov3D_from_csr(self.xyz, indptr, indices[indptr[0]:indptr[-1]], queries)
+                cov[counts < self.min_neighbors] = np.nan
+                yield start, stop, cov
 
 
 class EigenValues(KNeighborsScalarField):
     """Compute the eigen values of each point's neighbourhood.
     """
     def compute(self):
-        cov = cov3D(self.k_neighbors)
-        eigenvalues = np.linalg.eigvals(cov)
-        sort = eigenvalues.argsort()
+        n_points = self.n_points
+        e = np.empty((n_points, 3), dtype=self.dtype)
+
+        for start, stop, cov in self.iter_covariances():
+            # sorted from largest to smallest
+            e[start:stop] = eigvalsh3D(cov)
 
-        # range from 0-shape[0] to allow indexing along axis 1 and 2
-        idx_trick = range(eigenvalues.shape[0])
+        scale = self.scale
+        self.to_be_added["e1({})".format(scale)] = e[:, 0]
+        self.to_be_added["e2({})".format(scale)] = e[:, 1]
+        self.to_be_added["e3({})".format(scale)] = e[:, 2]
 
-        e1 = eigenvalues[idx_trick, sort[:, 2]]
-        e2 = eigenvalues[idx_trick, sort[:, 1]]
-        e3 = eigenvalues[idx_trick, sort[:, 0]]
 
-        k = self.k_neighbors.shape[1]
-        self.to_be_added["e1({})".format(k)] = e1
-        self.to_be_added["e2({})".format(k)] = e2
-        self.to_be_added["e3({})".format(k)] = e3
+class EigenFeatures(KNeighborsScalarField):
+    """Compute eigen value based features of each point's neighbourhood in one pass.
+
+    Parameters
+    ----------
+    features: list of str, optional
+        Default: None
+        Any of "anisotropy", "curvature", "eigenentropy", "eigen_sum",
+        "linearity", "omnivariance", "planarity" and "sphericity".
+        If None, all of them are computed.
+
+    Notes
+    -----
+    The columns are named like the ones obtained with "eigen_values" followed
+    by each feature's scalar field, but the eigen values are neither stored
+    nor read back from PyntCloud.points.
+    """
+
+    def __init__(self, *, pyntcloud, k_neighbors=None, r_neighbors=None, r=None, min_neighbors=3, features=None,
+                 max_memory=DEFAULT_MAX_MEMORY):
+        super().__init__(pyntcloud=pyntcloud, k_neighbors=k_neighbors, r_neighbors=r_neighbors, r=r,
+                         min_neighbors=min_neighbors, max_memory=max_memory)
+        if features is None:
+            features = list(EIGEN_FEATURES)
+        for feature in features:
+            if feature not in EIGEN_FEATURES:
+                raise ValueError("Unsupported eigen feature: {}".format(feature))
+        self.features = features
+
+    def compute(self):
+        n_points = self.n_points
+        results = [np.empty(n_points, dtype=self.dtype) for _ in self.features]
+
+        for start, stop, cov in self.iter_covariances():
+            # sorted from largest to smallest
+            ev = eigvalsh3D(cov)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for feature, result in zip(self.features, results):
+                    result[start:stop] = EIGEN_FEATURES[feature](ev)
+
+        for feature, result in zip(self.features, results):
+            self.to_be_added["{}({})".format(feature, self.scale)] = result
+
+
+class MultiscaleEigenFeatures(EigenFeatures):
+    """Compute eigen value based features of each point's neighbourhood at
+    several scales from a single neighbors query.
+
+    Parameters
+    ----------
+    ks: list of int
+        Number of neighbors of each scale. Each one must be at most
+        k_neighbors.shape[1]; the nearest ones are used, so k_neighbors must
+        be sorted by distance, like the ones returned by get_neighbors.
+
+    features: list of str, optional
+        Default: None
+        See EigenFeatures.
+
+    Notes
+    -----
+    The columns of each scale are named like the ones obtained with
+    "eigen_features" and k_neighbors[:, :k].
+    """
+
+    def __init__(self, *, pyntcloud, k_neighbors, ks, features=None, max_memory=DEFAULT_MAX_MEMORY):
+        super().__init__(pyntcloud=pyntcloud, k_neighbors=k_neighbors, features=features, max_memory=max_memory)
+        ks = sorted(set(ks))
+        if not ks or ks[0] < 1 or ks[-1] > k_neighbors.shape[1]:
+            raise ValueError("ks must be between 1 and {}".format(k_neighbors.shape[1]))
+        self.ks = ks
+
+    def compute(self):
+        n_points = self.n_points
+        results = [[np.empty(n_points, dtype=self.dtype) for _ in self.features] for _ in self.ks]
+
+        for start, stop in self.iter_blocks():
+            covariances = iter_cov3D_prefixes(
+                self.xyz, self.k_neighbors_idx[start:stop], self.ks, queries=np.arange(start, stop))
+            for cov, scale_results in zip(covariances, results):
+                ev = eigvalsh3D(cov)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    for feature, result in zip(self.features, scale_results):
+                        result[start:stop] = EIGEN_FEATURES[feature](ev)
+
+        for k, scale_results in zip(self.ks, results):
+            for feature, result in zip(self.features, scale_results):
+                self.to_be_added["{}({})".format(feature, k + 1)] = result
 
 
 class EigenDecomposition(KNeighborsScalarField):
     """Compute the eigen decomposition of each point's neighbourhood.
     """
     def compute(self):
-        cov = cov3D(self.k_neighbors)
-        eigenvalues, eigenvectors = np.linalg.eig(cov)
-        sort = eigenvalues.argsort()
+        n_points = self.n_points
+        e = np.empty((n_points, 3), dtype=self.dtype)
+        ev = np.empty((n_points, 3, 3), dtype=self.dtype)
 
-        # range from 0-shape[0] to allow indexing along axis 1 and 2
-        idx_trick = range(eigenvalues.shape[0])
+        for start, stop, cov in self.iter_covariances():
+            # sorted from largest to smallest
+            eigenvalues, eigenvectors = eigh3D(cov)
+            e[start:stop] = eigenvalues
+            # ev[i, j] is the j-th eigenvector of the i-th point
+            ev[start:stop] = eigenvectors.transpose(0, 2, 1)
 
-        e1 = eigenvalues[idx_trick, sort[:, 2]]
-        e2 = eigenvalues[idx_trick, sort[:, 1]]
-        e3 = eigenvalues[idx_trick, sort[:, 0]]
+        scale = self.scale
+        self.to_be_added["e1({})".format(scale)] = e[:, 0]
+        self.to_be_added["e2({})".format(scale)] = e[:, 1]
+        self.to_be_added["e3({})".format(scale)] = e[:, 2]
 
-        k = self.k_neighbors.shape[1]
-        self.to_be_added["e1({})".format(k)] = e1
-        self.to_be_added["e2({})".format(k)] = e2
-        self.to_be_added["e3({})".format(k)] = e3
+        self.to_be_added["ev1_x({})".format(scale)] = ev[:, 0, 0]
+        self.to_be_added["ev1_y({})".format(scale)] = ev[:, 0, 1]
+        self.to_be_added["ev1_z({})".format(scale)] = ev[:, 0, 2]
 
-        ev1 = eigenvectors[idx_trick, :, sort[:, 2]]
-        ev2 = eigenvectors[idx_trick, :, sort[:, 1]]
-        ev3 = eigenvectors[idx_trick, :, sort[:, 0]]
+        self.to_be_added["ev2_x({})".format(scale)] = ev[:, 1, 0]
+        self.to_be_added["ev2_y({})".format(scale)] = ev[:, 1, 1]
+        self.to_be_added["ev2_z({})".format(scale)] = ev[:, 1, 2]
 
-        self.to_be_added["ev1_x({})".format(k)] = ev1[:, 0]
-        self.to_be_added["ev1_y({})".format(k)] = ev1[:, 1]
-        self.to_be_added["ev1_z({})".format(k)] = ev1[:, 2]
+        self.to_be_added["ev3_x({})".format(scale)] = ev[:, 2, 0]
+        self.to_be_added["ev3_y({})".format(scale)] = ev[:, 2, 1]
+        self.to_be_added["ev3_z({})".format(scale)] = ev[:, 2, 2]
 
-        self.to_be_added["ev2_x({})".format(k)] = ev2[:, 0]
-        self.to_be_added["ev2_y({})".format(k)] = ev2[:, 1]
-        self.to_be_added["ev2_z({})".format(k)] = ev2[:, 2]
 
-        self.to_be_added["ev3_x({})".format(k)] = ev3[:, 0]
-        self.to_be_added["ev3_y({})".format(k)] = ev3[:, 1]
-        self.to_be_added["ev3_z({})".format(k)] = ev3[:, 2]
+class UnorientedNormals(KNeighborsScalarField):
+    """Compute normals as the eigenvector of the smallest eigen value of
+    each point's neighbourhood covariance.
+    """
+    def compute(self):
+        n_points = self.n_points
+        normals = np.empty((n_points, 3), dtype=self.dtype)
 
+        for start, stop, cov in self.iter_covariances():
+            eigenvectors = eigh3D(cov)[1]
+            normals[start:stop] = eigenvectors[:, :, 2]
 
-class UnorientedNormals(KNeighborsScalarField):
-    """Compute normals using SVD.
+        scale = self.scale
+        self.to_be_added["nx({})".format(scale)] = normals[:, 0]
+        self.to_be_added["ny({})".format(scale)] = normals[:, 1]
+        self.to_be_added["nz({})".format(scale)] = normals[:, 2]
+
+
+class OrientedNormals(UnorientedNormals):
+    """Compute normals like UnorientedNormals and orient them consistently.
+
+    Parameters
+    ----------
+    method: {"viewpoint", "mst"}, optional
+        Default: "viewpoint"
+        "viewpoint": flip each normal to face the viewpoint.
+        "mst": propagate the orientation along the minimum spanning tree of
+        the neighbors graph weighted by 1 - |ni . nj|. In each connected
+        component, the normal of the point closest to the viewpoint is
+        oriented to face it.
+
+    viewpoint: (3,) array-like, optional
+        Default: (0, 0, 0)
+        Sensor origin or any point the surfaces are seen from.
     """
+
+    def __init__(self, *, pyntcloud, k_neighbors=None, r_neighbors=None, r=None, min_neighbors=3,
+                 method="viewpoint", viewpoint=(0, 0, 0), max_memory=DEFAULT_MAX_MEMORY):
+        super().__init__(pyntcloud=pyntcloud, k_neighbors=k_neighbors, r_neighbors=r_neighbors, r=r,
+                         min_neighbors=min_neighbors, max_memory=max_memory)
+        if method not in ("viewpoint", "mst"):
+            raise ValueError("Unsupported method: {}".format(method))
+        self.method = method
+        self.viewpoint = np.asarray(viewpoint, dtype=np.float64)
+
     def compute(self):
-        cov = cov3D(self.k_neighbors)
-        u, s, v = np.linalg.svd(cov)
+        super().compute()
+        names = list(self.to_be_added)
+        normals = np.stack([self.to_be_added[name] for name in names], axis=1)
+
+        to_viewpoint = self.viewpoint - self.xyz
+        alignment = np.nan_to_num(np.einsum("ij,ij->i", normals, to_viewpoint))
+
+        if self.method == "viewpoint":
+            flip = alignment < 0
+        else:
+            distance = np.einsum("ij,ij->i", to_viewpoint, to_viewpoint)
+            flip = self.propagate_orientation(normals, alignment, distance)
+
+        normals[flip] *= -1
+        for i, name in enumerate(names):
+            self.to_be_added[name] = normals[:, i]
+
+    def neighbor_pairs(self):
+        """(rows, cols) indices of every point and each of its neighbors."""
+        if self.r_neighbors is None:
+            rows = np.repeat(np.arange(self.n_points), self.k_neighbors_idx.shape[1])
+            return rows, self.k_neighbors_idx.ravel()
+
+        indptr, indices = self.r_neighbors
+        rows = np.repeat(np.arange(self.n_points), np.diff(indptr))
+        not_self = rows != indices
+        return rows[not_self], indices[not_self]
+
+    def propagate_orientation(self, normals, alignment, distance):
+        """Boolean mask of the normals to flip to be consistent with their
+        minimum spanning tree root, the point of the lowest distance of each
+        connected component, itself oriented by the sign of its alignment.
+        """
+        n = self.n_points
+        rows, cols = self.neighbor_pairs()
+        weights = 1 - np.abs(np.einsum("ij,ij->i", normals[rows], normals[cols], dtype=np.float64))
+        # small offset so that parallel normals are still edges of the sparse graph
+        weights = np.clip(np.nan_to_num(weights, nan=1), 0, 1) + 1e-6
+        tree = minimum_spanning_tree(coo_matrix((weights, (rows, cols)), shape=(n, n)).tocsr()).tocoo()
+
+        n_components, labels = connected_components(tree, directed=False)
+        order = np.lexsort((distance, labels))
+        roots = order[np.searchsorted(labels[order], np.arange(n_components))]
+
+        # a virtual node linked to every root turns the forest into a single tree
+        rows = np.r_[tree.row, np.full(n_components, n)]
+        cols = np.r_[tree.col, roots]
+        graph = coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(n + 1, n + 1))
+        predecessors = breadth_first_order(graph, n, directed=False, return_predecessors=True)[1][:n]
+        predecessors[roots] = roots
+
+        # sign of each normal relative to its parent, roots are their own parent
+        flip = np.einsum("ij,ij->i", normals, normals[predecessors]) < 0
+        flip[roots] = False
 
-        normals = u[:, :, -1]
+        # pointer jumping: accumulate the flips up to the root in log(depth) steps
+        while np.any(predecessors != predecessors[predecessors]):
+            flip ^= flip[predecessors]
+            predecessors = predecessors[predecessors]
 
-        k = self.k_neighbors.shape[1]
-        self.to_be_added["nx({})".format(k)] = normals[:, 0]
-        self.to_be_added["ny({})".format(k)] = normals[:, 1]
-        self.to_be_added["nz({})".format(k)] = normals[:, 2]
+        return flip ^ (alignment[predecessors] < 0)
@@ -1,4 +1,7 @@
 import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
 from .base import ScalarField
 
 
@@ -41,3 +44,90 @@ class OrientationRadians(NormalsScalarField):
         # convert (-180 , 180) to (0 , 360)
         angle = np.where(angle < 0, angle + (2 * np.pi), angle)
         self.to_be_added["orientation_rad"] = angle
+
+
+class RegionGrowing(NormalsScalarField):
+    """ Segment smooth surfaces, i.e. planar patches, growing regions over
+    the k neighbors graph.
+
+    Points with curvature below curvature_threshold are seeds. Neighboring
+    seeds whose normals differ less than angle_threshold belong to the same
+    region. Every other point joins the region of its most aligned seed
+    neighbor within angle_threshold, if any. Points outside any region, or
+    in regions smaller than min_size, are labeled -1.
+
+    Parameters
+    ----------
+    k_neighbors: (N, k) ndarray
+        Returned from: self.get_neighbors(k, ...)
+    curvature: str
+        Name of the curvature column, i.e. returned from
+        self.add_scalar_field("eigen_features", features=["curvature"], ...)
+    normals: list of str, optional
+        Default: None
+        Names of the normal columns. Their orientation is ignored. If None,
+        ["nx", "ny", "nz"] if present, else the columns added by
+        self.add_scalar_field("normals", k_neighbors=k_neighbors).
+    angle_threshold: float, optional
+        Default: 10
+        Maximum angle in degrees between the normals of neighbors.
+    curvature_threshold: float, optional
+        Default: 0.05
+    min_size: int, optional
+        Default: 1
+        Minimum number of points in a region.
+    """
+
+    def __init__(self, *, pyntcloud, k_neighbors, curvature, normals=None,
+                 angle_threshold=10, curvature_threshold=0.05, min_size=1):
+        super().__init__(pyntcloud=pyntcloud)
+        self.k_neighbors = k_neighbors
+        self.curvature = curvature
+        self.normals_columns = normals
+        self.angle_threshold = angle_threshold
+        self.curvature_threshold = curvature_threshold
+        self.min_size = min_size
+
+    def extract_info(self):
+        columns = self.normals_columns
+        if columns is None:
+            columns = ["nx", "ny", "nz"]
+            if not set(columns).issubset(self.pyntcloud.points.columns):
+                scale = self.k_neighbors.shape[1] + 1
+                columns = ["{}({})".format(x, scale) for x in columns]
+        self.normals = self.pyntcloud.points[list(columns)].values
+        self.curvature_values = self.pyntcloud.points[self.curvature].values
+
+    def compute(self):
+        n_points, k = self.k_neighbors.shape
+        rows = np.repeat(np.arange(n_points), k)
+        cols = self.k_neighbors.ravel()
+
+        cos = np.abs(np.einsum("ij,ij->i", self.normals[rows], self.normals[cols]))
+        smooth = cos >= np.cos(np.deg2rad(self.angle_threshold))
+        with np.errstate(invalid="ignore"):
+            seed = self.curvature_values < self.curvature_threshold
+
+        # regions are the connected components of the smooth graph of seeds
+        edges = smooth & seed[rows] & seed[cols]
+        graph = coo_matrix(
+            (np.ones(edges.sum(), dtype=bool), (rows[edges], cols[edges])),
+            shape=(n_points, n_points))
+        components = connected_components(graph, directed=False)[1]
+
+        labels = np.full(n_points, -1, dtype=np.int64)
+        labels[seed] = components[seed]
+
+        # other points join the region of their most aligned seed neighbor
+        edges = np.flatnonzero(smooth & ~seed[rows] & seed[cols])
+        edges = edges[np.lexsort((-cos[edges], rows[edges]))]
+        joining, first = np.unique(rows[edges], return_index=True)
+        labels[joining] = labels[cols[edges[first]]]
+
+        sizes = np.bincount(labels + 1)
+        labels[sizes[labels + 1] < self.min_size] = -1
+        region = labels >= 0
+        labels[region] = np.unique(labels[region], return_inverse=True)[1]
+
+        name = "regions({},{})".format(self.angle_threshold, self.curvature_threshold)
+        self.to_be_added[name] = labels
@@ -1,4 +1,6 @@
 import numpy as np
+from scipy.sparse.csgraph import connected_components
+
 from .base import ScalarField
 
 
@@ -44,28 +46,23 @@ class VoxelN(VoxelgridScalarField):
 
 
 class EuclideanClusters(VoxelgridScalarField):
-    """Assing corresponding cluster to each point inside each voxel."""
-    def compute(self):
-        name = "{}({})".format("clusters", self.voxelgrid_id)
+    """Assing corresponding cluster to each point inside each voxel.
 
-        to_be_processed = np.zeros(self.voxelgrid.n_voxels, dtype=bool)
-        to_be_processed[np.unique(self.voxelgrid.voxel_n)] = True
+    Clusters are the connected components of the occupied voxels, where
+    each voxel is connected to its neighbors. See VoxelGrid.adjacency.
+    """
+    def __init__(self, *, pyntcloud, voxelgrid_id, connectivity=26):
+        super().__init__(pyntcloud=pyntcloud, voxelgrid_id=voxelgrid_id)
+        self.connectivity = connectivity
 
-        clusters = np.zeros(self.voxelgrid.voxel_n.shape[0])
-
-        C = 0
-        while np.any(to_be_processed):
-            Q = []
-            Q.append(np.random.choice(np.where(to_be_processed)[0]))
+    def compute(self):
+        name = "{}({})".format("clusters", self.voxelgrid_id)
+        if self.connectivity != 26:
+            name = "{}({},{})".format("clusters", self.voxelgrid_id, self.connectivity)
 
-            for voxel in Q:
-                clusters[np.where(self.voxelgrid.voxel_n == voxel)[0]] = C
-                to_be_processed[voxel] = False
-                neighbors = self.voxelgrid.get_voxel_neighbors(voxel)
-                for neighbor in neighbors:
-                    if to_be_processed[neighbor]:
-                        Q.append(neighbor)
-                        to_be_processed[neighbor] = False
-            C += 1
+        graph = self.voxelgrid.adjacency(connectivity=self.connectivity)
+        labels = connected_components(graph, directed=False)[1]
 
-        self.to_be_added[name] = clusters
+        # position of each point's voxel among the occupied voxels
+        inverse = np.searchsorted(self.voxelgrid.voxel_keys, self.voxelgrid.voxel_n)
+        self.to_be_added[name] = labels[inverse]
@@ -1,4 +1,6 @@
 import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 
 from .base import ScalarField
 from ..geometry.coord_systems import (
@@ -118,3 +120,77 @@ class CylindricalCoordinates(XYZScalarField):
 
         self.to_be_added["radial_cylindrical"] = radial_cylindrical
         self.to_be_added["angular_cylindrical"] = angular_cylindrical
+
+
+class EuclideanClustersPoints(XYZScalarField):
+    """
+    Density based (DBSCAN-like) Euclidean clustering of the points.
+
+    Points with at least min_points neighbors within eps, including
+    themselves, are core points. Core points within eps of each other belong
+    to the same cluster. Other points join the cluster of a core point within
+    eps, if any, and are labeled -1 (noise) otherwise.
+
+    Parameters
+    ----------
+    eps: float
+        Maximum distance between neighbors.
+    min_points: int, optional
+        Default: 1
+        Minimum neighbors of core points. With 1, every point is a core point.
+    kdtree: str, optional
+        Default: None
+        KDTree id used for the radius queries. If None, and hashgrid is None
+        too, a KDTree is added. See PyntCloud.get_neighbors.
+    hashgrid: str, optional
+        Default: None
+        HashGrid id used for the radius queries instead of a KDTree. Faster
+        when eps is close to the HashGrid size. kdtree is ignored if given.
+    sizes: bool, optional
+        Default: False
+        Also add the number of points of the cluster of each point (0 for
+        noise), to quickly filter small clusters.
+    """
+
+    def __init__(self, *, pyntcloud, eps, min_points=1, kdtree=None, hashgrid=None, sizes=False):
+        super().__init__(pyntcloud=pyntcloud)
+        self.eps = eps
+        self.min_points = min_points
+        self.kdtree = kdtree
+        self.hashgrid = hashgrid
+        self.sizes = sizes
+
+    def extract_info(self):
+        super().extract_info()
+        self.indptr, self.indices = self.pyntcloud.get_neighbors(
+            r=self.eps, kdtree=self.kdtree, hashgrid=self.hashgrid, as_csr=True)
+
+    def compute(self):
+        n_points = len(self.points)
+        counts = np.diff(self.indptr)
+        core = counts >= self.min_points
+        rows = np.repeat(np.arange(n_points, dtype=self.indices.dtype), counts)
+        core_neighbor = core[self.indices]
+
+        # components of the graph of core points
+        edges = core[rows] & core_neighbor
+        graph = coo_matrix(
+            (np.ones(edges.sum(), dtype=bool), (rows[edges], self.indices[edges])),
+            shape=(n_points, n_points))
+        components = connected_components(graph, directed=False)[1]
+
+        labels = np.full(n_points, -1, dtype=np.int64)
+        labels[core] = np.unique(components[core], return_inverse=True)[1]
+
+        # border points join the cluster of their first core neighbor
+        edges = ~core[rows] & core_neighbor
+        border, first = np.unique(rows[edges], return_index=True)
+        labels[border] = labels[self.indices[edges][first]]
+
+        name = "clusters({},{})".format(self.eps, self.min_points)
+        self.to_be_added[name] = labels
+
+        if self.sizes:
+            sizes = np.bincount(labels + 1)
+            sizes[0] = 0
+            self.to_be_added["cluster_size({},{})".format(self.eps, self.min_points)] = sizes[labels + 1]
@@ -4,12 +4,20 @@ HAKUNA MATATA
 """
 from .convex_hull import ConvexHull
 from .delanuay import Delaunay3D
+from .hashgrid import HashGrid
 from .kdtree import KDTree
+from .octree import Octree
+from .voxel_accumulator import VoxelAccumulator
+from .voxel_pyramid import VoxelPyramid
 from .voxelgrid import VoxelGrid
 
 ALL_STRUCTURES = {
     'convex_hull': ConvexHull,
     'delanuay3D': Delaunay3D,
+    'hashgrid': HashGrid,
     'kdtree': KDTree,
+    'octree': Octree,
+    'voxel_accumulator': VoxelAccumulator,
+    'voxel_pyramid': VoxelPyramid,
     'voxelgrid': VoxelGrid
 }
@@ -32,6 +32,10 @@ class StructuresDict(dict):
         self.n_kdtrees = 0
         self.n_delanuays = 0
         self.n_convex_hulls = 0
+        self.n_hashgrids = 0
+        self.n_octrees = 0
+        self.n_voxel_accumulators = 0
+        self.n_voxel_pyramids = 0
         super().__init__(*args)
 
     def __setitem__(self, key, val):
@@ -39,7 +43,11 @@ class StructuresDict(dict):
             raise TypeError("{} must be base.Structure subclass".format(key))
 
         # TODO better structure.id check
-        if key.startswith("V"):
+        if key.startswith("VA"):
+            self.n_voxel_accumulators += 1
+        elif key.startswith("VP"):
+            self.n_voxel_pyramids += 1
+        elif key.startswith("V"):
             self.n_voxelgrids += 1
         elif key.startswith("K"):
             self.n_kdtrees += 1
@@ -47,6 +55,10 @@ class StructuresDict(dict):
             self.n_delanuays += 1
         elif key.startswith("CH"):
             self.n_convex_hulls += 1
+        elif key.startswith("H"):
+            self.n_hashgrids += 1
+        elif key.startswith("O"):
+            self.n_octrees += 1
         else:
             raise ValueError("{} is not a valid structure.id".format(key))
         super().__setitem__(key, val)
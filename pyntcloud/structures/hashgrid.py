@@ -0,0 +1,182 @@
+import numpy as np
+
+from .base import Structure
+from ..neighbors import DEFAULT_MAX_MEMORY, block_size
+from ..utils.array import cartesian, expand_ranges
+
+
+class HashGrid(Structure):
+
+    def __init__(self, *, points, size, max_memory=DEFAULT_MAX_MEMORY):
+        """Spatial hash of points into cubic cells for fixed-radius queries.
+
+        Points are sorted by cell key and each occupied cell stores the start
+        and end offsets of its points in that order, so queries only look at
+        the cells around each query point.
+
+        Parameters
+        ----------
+        points: (N, 3) numpy.array
+        size: float
+            Side of each cubic cell. Radius queries with r <= size only visit
+            the 27 cells around each query point.
+        max_memory: int, optional
+            Default: neighbors.DEFAULT_MAX_MEMORY
+            Approximate number of bytes used by the temporaries of each block
+            of queried points.
+        """
+        super().__init__(points=points)
+        self.size = size
+        self.max_memory = max_memory
+
+    def compute(self):
+        """ABC API."""
+        self.id = "H({})".format(self.size)
+
+        self.xyzmin = self._points.min(0).astype(np.float64)
+        ijk = self.get_cell_ijk(self._points)
+        self.dims = ijk.max(0) + 1
+        keys = np.ravel_multi_index(ijk.T, self.dims)
+
+        index_dtype = np.int32 if len(keys) <= np.iinfo(np.int32).max else np.int64
+        self.order = np.argsort(keys, kind="mergesort").astype(index_dtype)
+        self.sorted_points = self._points[self.order]
+
+        self.cell_keys, cell_start, counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+        self.cell_start = cell_start.astype(index_dtype)
+        self.cell_end = (cell_start + counts).astype(index_dtype)
+
+    def get_cell_ijk(self, points):
+        """(N, 3) integer coordinates of the cell containing each point."""
+        return np.floor((points - self.xyzmin) / self.size).astype(np.int64)
+
+    def _lookup(self, ijk):
+        """Start and end offsets of the cells at ijk; empty for missing cells."""
+        inside = np.all((ijk >= 0) & (ijk < self.dims), axis=-1)
+        keys = np.ravel_multi_index(np.where(inside[..., None], ijk, 0).T, self.dims).T
+        pos = np.searchsorted(self.cell_keys, keys)
+        pos = np.minimum(pos, len(self.cell_keys) - 1)
+        found = inside & (self.cell_keys[pos] == keys)
+        start = np.where(found, self.cell_start[pos], 0)
+        end = np.where(found, self.cell_end[pos], 0)
+        return start, end
+
+    def _query_block(self, points, r):
+        """Candidate pairs within r for a block of query points.
+
+        Returns the query row, the position in sorted_points and the distance
+        of each pair, ordered by query row.
+        """
+        rings = int(np.ceil(r / self.size))
+        offsets = cartesian([np.arange(-rings, rings + 1)] * 3)
+
+        ijk = self.get_cell_ijk(points)[:, None, :] + offsets[None, :, :]
+        start, end = self._lookup(ijk)
+        start, end = start.ravel(), end.ravel()
+        rows = np.repeat(np.arange(len(start)) // len(offsets), end - start)
+        positions = expand_ranges(start, end)
+
+        diffs = self.sorted_points[positions] - points[rows]
+        distances = np.sqrt(np.einsum("ij,ij->i", diffs, diffs))
+
+        inside = distances <= r
+        return rows[inside], positions[inside], distances[inside]
+
+    def _iter_blocks(self, points, r):
+        rings = int(np.ceil(r / self.size))
+        mean_count = len(self.order) / len(self.cell_keys)
+        candidates = ((2 * rings + 1) ** 3) * (mean_count + 1)
+        rows = block_size(candidates * 64, self.max_memory)
+        for start in range(0, len(points), rows):
+            stop = min(start + rows, len(points))
+            yield start, stop, self._query_block(points[start:stop], r)
+
+    def query_radius(self, points, r, return_distances=False):
+        """Find all the points within distance r of each query point.
+
+        Parameters
+        ----------
+        points: (M, 3) numpy.array
+        r: float
+        return_distances: bool, optional
+            Default: False
+
+        Returns
+        -------
+        indptr: (M + 1,) int64 ndarray
+        indices: (indptr[-1],) ndarray
+            The neighbors of the query point i are indices[indptr[i]:indptr[i + 1]].
+        distances: (indptr[-1],) float32 ndarray
+            Only if return_distances.
+        """
+        counts = np.zeros(len(points), dtype=np.int64)
+        indices = []
+        distances = []
+        for start, stop, (rows, positions, block_distances) in self._iter_blocks(points, r):
+            counts[start:stop] = np.bincount(rows, minlength=stop - start)
+            indices.append(self.order[positions])
+            distances.append(block_distances.astype(np.float32))
+
+        indptr = np.zeros(len(points) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        indices = np.concatenate(indices) if indices else np.empty(0, dtype=self.order.dtype)
+
+        if return_distances:
+            distances = np.concatenate(distances) if distances else np.empty(0, dtype=np.float32)
+            return indptr, indices, distances
+
+        return indptr, indices
+
+    def query_knn(self, points, k, r):
+        """Find the k nearest neighbors within distance r of each query point.
+
+        Parameters
+        ----------
+        points: (M, 3) numpy.array
+        k: int
+        r: float
+            Maximum distance to consider a neighbor.
+
+        Returns
+        -------
+        distances: (M, k) float32 ndarray
+            Missing neighbors are given infinite distance.
+        indices: (M, k) ndarray
+            Missing neighbors are given index N, like scipy's cKDTree.
+        """
+        distances = np.full((len(points), k), np.inf, dtype=np.float32)
+        indices = np.full((len(points), k), len(self.order), dtype=self.order.dtype)
+
+        for start, stop, (rows, positions, block_distances) in self._iter_blocks(points, r):
+            sort = np.lexsort((block_distances, rows))
+            rows, positions, block_distances = rows[sort], positions[sort], block_distances[sort]
+            # rank of each neighbor inside its query row
+            first = np.searchsorted(rows, rows)
+            rank = np.arange(len(rows)) - first
+            keep = rank < k
+            distances[start + rows[keep], rank[keep]] = block_distances[keep]
+            indices[start + rows[keep], rank[keep]] = self.order[positions[keep]]
+
+        return distances, indices
+
+    def query_box(self, min_xyz, max_xyz):
+        """Find all the points inside the axis aligned box [min_xyz, max_xyz].
+
+        Returns
+        -------
+        indices: ndarray
+            Indices of the points inside the box.
+        """
+        min_xyz = np.asarray(min_xyz, dtype=np.float64)
+        max_xyz = np.asarray(max_xyz, dtype=np.float64)
+        # kept as float so unbounded boxes are supported
+        min_ijk = np.floor((min_xyz - self.xyzmin) / self.size)
+        max_ijk = np.floor((max_xyz - self.xyzmin) / self.size)
+        cells_ijk = np.stack(np.unravel_index(self.cell_keys, self.dims), axis=1)
+        cells = np.all((cells_ijk >= min_ijk) & (cells_ijk <= max_ijk), axis=1)
+
+        positions = expand_ranges(self.cell_start[cells], self.cell_end[cells])
+
+        candidates = self.sorted_points[positions]
+        inside = np.all((candidates >= min_xyz) & (candidates <= max_xyz), axis=1)
+        return self.order[positions[inside]]
@@ -13,6 +13,8 @@ class KDTree(cKDTree, Structure):
 
     def compute(self):
         self.id = "K({},{},{})".format(self._leafsize, self._compact_nodes, self._balanced_tree)
+        #: eps found by neighbors.calibrate_eps for each (k, recall)
+        self.calibrated_eps = {}
         cKDTree.__init__(
             self,
             self._points,
@@ -1,101 +1,173 @@
-#  HAKUNA MATATA
-
-"""
-VoxelGrid Class
-"""
-
 import numpy as np
 import pandas as pd
 
+from .base import Structure
+from ..utils.array import MORTON_BITS, eigh3D, morton_encode
+
 
-class Octree(object):
+class Octree(Structure):
 
-    def __init__(self, points, max_level=2):
-        self.points = points
+    def __init__(self, *, points, max_level=2):
+        """Linear octree of the points' cubic bounding box.
+
+        Each point gets the Morton code of its cell at max_level. Points are
+        sorted by code, so the nodes of every level are contiguous ranges of
+        the sorted points.
+
+        Parameters
+        ----------
+        points: (N, 3) numpy.array
+        max_level: int, optional
+            Default: 2
+            Number of subdivisions of the bounding box. At most 21.
+        """
+        super().__init__(points=points)
+        if not 1 <= max_level <= MORTON_BITS:
+            raise ValueError("max_level must be between 1 and {}".format(MORTON_BITS))
         self.max_level = max_level
-        self.structure = pd.DataFrame(
-            np.zeros((self.points.shape[0], self.max_level), dtype=np.uint8))
-        xyzmin = points.min(0)
-        xyzmax = points.max(0)
+
+    def compute(self):
+        """ABC API."""
+        self.id = "O({})".format(self.max_level)
+
+        xyzmin = self._points.min(0)
+        xyzmax = self._points.max(0)
         #: adjust to obtain a  minimum bounding box with all sides of equal length
         diff = max(xyzmax - xyzmin) - (xyzmax - xyzmin)
-        xyzmin = xyzmin - diff / 2
-        xyzmax = xyzmax + diff / 2
-        self.xyzmin = xyzmin
-        self.xyzmax = xyzmax
-        self.id = "O({})".format(max_level)
-        self.build()
-
-    def build(self):
-        self.sizes = np.zeros(self.max_level)
-        level_ptp = max(self.xyzmax - self.xyzmin) / 2
-        mid_points = np.zeros_like(self.points)
-        mid_points[:] = (self.xyzmin + self.xyzmax) / 2
-
-        for i in range(self.max_level):
-            self.sizes[i] = level_ptp
-            level_ptp /= 2
-            bigger = self.points > mid_points
-
-            if i != self.max_level - 1:
-                mid_points = np.where(
-                    bigger, mid_points + level_ptp, mid_points - level_ptp)
-
-            bigger = bigger.astype(np.uint8)
-            self.structure.loc[:, i] = (
-                (bigger[:, 1] * 2) + bigger[:, 0]) + (bigger[:, 2] * (2 * 2))
+        self.xyzmin = xyzmin - diff / 2
+        self.xyzmax = xyzmax + diff / 2
+        #: side of the nodes of each level, starting at level 1
+        self.sizes = max(self.xyzmax - self.xyzmin) / 2 ** np.arange(1, self.max_level + 1)
+
+        n_cells = 2 ** self.max_level
+        # right closed cells, like the original recursive split on points > mid point
+        ijk = np.ceil((self._points - self.xyzmin) / self.sizes[-1]).astype(np.int64) - 1
+        ijk = np.clip(ijk, 0, n_cells - 1)
+        codes = morton_encode(ijk)
+
+        index_dtype = np.int32 if len(codes) <= np.iinfo(np.int32).max else np.int64
+        self.order = np.argsort(codes, kind="mergesort").astype(index_dtype)
+        self.codes = codes
+        self.sorted_codes = codes[self.order]
+
+        #: node_codes[level], node_start[level]: sorted codes and offsets in order of each node
+        self.node_codes = [np.zeros(1, dtype=np.uint64)]
+        self.node_start = [np.zeros(1, dtype=np.int64)]
+        for level in range(1, self.max_level + 1):
+            level_codes = self.sorted_codes >> np.uint64(3 * (self.max_level - level))
+            start = np.r_[0, np.flatnonzero(level_codes[1:] != level_codes[:-1]) + 1]
+            self.node_codes.append(level_codes[start])
+            self.node_start.append(start)
+
+    def _check_level(self, level):
+        if not 0 <= level <= self.max_level:
+            raise ValueError("level must be between 0 and {}".format(self.max_level))
+
+    def get_level_codes(self, level):
+        """(N,) uint64 Morton code of the node containing each point at level."""
+        self._check_level(level)
+        return self.codes >> np.uint64(3 * (self.max_level - level))
+
+    def get_node_index(self, level):
+        """(N,) position, in node_codes[level], of the node containing each point."""
+        self._check_level(level)
+        index = np.empty(len(self.codes), dtype=np.int64)
+        counts = self.get_counts(level)
+        index[self.order] = np.repeat(np.arange(len(counts)), counts)
+        return index
+
+    def get_counts(self, level):
+        """(n_nodes,) number of points of each non empty node at level."""
+        self._check_level(level)
+        return np.diff(np.r_[self.node_start[level], len(self.codes)])
 
     def get_centroids(self, level):
-        st = self.structure.loc[:, range(level)]
-
-        for n, i in enumerate(["x", "y", "z"]):
-            st[i] = self.points[:, n]
-
-        return st.groupby([x for x in range(level)], sort=False).mean().values
+        """(n_nodes, 3) mean of the points of each non empty node at level,
+        sorted by node code."""
+        self._check_level(level)
+        sums = np.add.reduceat(self._points[self.order].astype(np.float64), self.node_start[level], axis=0)
+        return sums / self.get_counts(level)[:, None]
 
     def get_level_as_sf(self, level):
-        sf = np.zeros((self.points.shape[0], level), dtype=str)
-
-        for k, v in self.structure.groupby([x for x in range(level)]).indices.items():
-            sf[v] = k
-
-        return [int("".join(sf[i])) for i in range(len(sf))]
+        """Child index (0-7) of each level up to level, read as decimal digits.
+
+        Returns
+        -------
+        sf: (N,) int64 ndarray
+            i.e. 35 for a point in child 3 of level 1 and child 5 of level 2.
+        """
+        self._check_level(level)
+        codes = self.get_level_codes(level)
+        sf = np.zeros(len(codes), dtype=np.int64)
+        for i in range(level):
+            digit = (codes >> np.uint64(3 * (level - 1 - i))) & np.uint64(7)
+            sf = sf * 10 + digit.astype(np.int64)
+        return sf
+
+    @property
+    def structure(self):
+        """(N, max_level) DataFrame of the child index (0-7) of each point at each level."""
+        return pd.DataFrame(
+            np.stack([(self.get_level_codes(level) & np.uint64(7)).astype(np.uint8)
+                      for level in range(1, self.max_level + 1)], axis=1))
+
+    def get_covariances(self, level):
+        """(n_nodes, 3, 3) covariance, with ddof=1 like np.cov, of the points of
+        each non empty node at level. NaN for nodes with a single point."""
+        self._check_level(level)
+        start = self.node_start[level]
+        counts = self.get_counts(level)
+        points = self._points[self.order].astype(np.float64)
+        # centered on each node's centroid to avoid cancellation
+        diffs = points - np.repeat(self.get_centroids(level), counts, axis=0)
+        second = np.add.reduceat(diffs[:, :, None] * diffs[:, None, :], start, axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return second / (counts - 1)[:, None, None]
 
     def eigen_decomposition(self, level):
-        st = self.structure.loc[:, range(level)]
-
-        for n, i in enumerate(["x", "y", "z"]):
-            st[i] = self.points[:, n]
-
-        e_out = np.zeros((st.shape[0], 3))
-        ev1_out = np.zeros((st.shape[0], 3))
-        ev2_out = np.zeros((st.shape[0], 3))
-        ev3_out = np.zeros((st.shape[0], 3))
-
-        this_level = st.groupby([x for x in range(level)], sort=False)
-
-        # to use when groups in current level have less than 3 points
-        prev_level = st.groupby([x for x in range(level - 1)], sort=False)
-        min_level = prev_level
-        min_i = 1
-        # find the minimum level where there is no group with less than 3
-        while min_level.size().min() < 3:
-            min_i += 1
-            min_level = st.groupby([x for x in range(level - min_i)])
-
-        for n, g in this_level:
-            if g.shape[0] < 3:
-                g = prev_level.get_group(n[:-1])
-                if g.shape[0] < 3:
-                    g = min_level.get_group(n[:-min_i])
-
-            eig_val, eig_vec = np.linalg.eig(np.cov(g.values[:, level:].T))
-            idx = eig_val.argsort()[::-1]
-            eig_val = eig_val[idx]
-            eig_vec = eig_vec[:, idx]
-            e_out[g.index.values] = eig_val
-            ev1_out[g.index.values] = eig_vec[:, 0]
-            ev2_out[g.index.values] = eig_vec[:, 1]
-            ev3_out[g.index.values] = eig_vec[:, 2]
-
-        return e_out[:, 0], e_out[:, 1], e_out[:, 2], ev1_out, ev2_out, ev3_out
+        """Eigen decomposition of the covariance of the points of the node
+        containing each point at level.
+
+        Nodes with less than 3 points use their parent node instead and, if
+        it also has less than 3 points, the ancestor at the deepest level
+        where every node has at least 3 points.
+
+        Returns
+        -------
+        e1, e2, e3: (N,) ndarray
+            Eigen values, from largest to smallest.
+        ev1, ev2, ev3: (N, 3) ndarray
+            The corresponding eigen vectors.
+        """
+        self._check_level(level)
+        if level == 0:
+            raise ValueError("level must be between 1 and {}".format(self.max_level))
+
+        # deepest level above level where every node has at least 3 points
+        min_level = level - 1
+        while min_level > 0 and self.get_counts(min_level).min() < 3:
+            min_level -= 1
+
+        codes = self.node_codes[level]
+        counts = self.get_counts(level)
+        cov = self.get_covariances(level)
+
+        parent = np.searchsorted(self.node_codes[level - 1], codes >> np.uint64(3))
+        parent_small = self.get_counts(level - 1)[parent] < 3
+        small = counts < 3
+
+        use_parent = small & ~parent_small
+        cov[use_parent] = self.get_covariances(level - 1)[parent[use_parent]]
+
+        use_ancestor = small & parent_small
+        if np.any(use_ancestor):
+            ancestor = np.searchsorted(
+                self.node_codes[min_level], codes[use_ancestor] >> np.uint64(3 * (level - min_level)))
+            cov[use_ancestor] = self.get_covariances(min_level)[ancestor]
+
+        eigenvalues, eigenvectors = eigh3D(cov)
+
+        index = self.get_node_index(level)
+        e = eigenvalues[index]
+        ev = eigenvectors[index]
+        return e[:, 0], e[:, 1], e[:, 2], ev[:, :, 0], ev[:, :, 1], ev[:, :, 2]
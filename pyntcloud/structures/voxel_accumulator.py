@@ -0,0 +1,387 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from .base import Structure
+
+#: bits used by each axis in the voxel keys, voxels range from -2 ** 20 to 2 ** 20 - 1
+KEY_BITS = 21
+
+#: stored counts and sums are rescaled once the weight of new frames exceeds it
+MAX_WEIGHT = 1e100
+
+#: reductions supported by VoxelAccumulator.aggregate
+ACCUMULATIONS = ("sum", "mean", "max")
+
+#: feature vector modes supported by VoxelAccumulator.get_feature_vector
+ACCUMULATION_MODES = ("binary", "density", "x_max", "y_max", "z_max", "x_mean", "y_mean", "z_mean")
+
+
+class VoxelAccumulator(Structure):
+
+    def __init__(self, *, points, size, origin=None, decay=1, max_frames=None):
+        """Voxel grid with fixed origin and size, updated one batch of points at a time.
+
+        Only per-voxel statistics are stored: point count, sum and maximum of
+        each coordinate. Adding a frame of n points reaching m voxels costs
+        one O(n log n) sort and m binary searches among the V stored voxels.
+        A frame that reaches new voxels also merges their keys into the
+        sorted keys in one vectorized pass, an O(V) copy. No other step
+        touches all V voxels on every frame:
+
+        - decay is applied lazily, each new frame is weighted up by
+          1 / decay instead of weighting every stored voxel down. Stored
+          values are rescaled in place, O(V), once every
+          log(1e100) / -log(decay) frames to avoid overflow.
+        - when max_frames removes a frame, its counts and sums are
+          subtracted, and the maxima it reached are recomputed from the
+          kept frames on the next read.
+        - slots of emptied voxels are reclaimed, O(V), once more than
+          half of them are empty.
+
+        Reading statistics selects the occupied voxels, already sorted by key.
+
+        Only the voxelgrid_centers and voxelgrid_centroids samplers accept a
+        VoxelAccumulator. The voxelgrid_nearest and voxelgrid_highest
+        samplers and the voxelgrid scalar fields need the voxel of each
+        point, which is not kept.
+
+        Parameters
+        ----------
+        points: (N, 3) numpy.array
+            First frame.
+        size: float
+            Side of each cubic voxel.
+        origin: (3,) array-like, optional
+            Default: None
+            Corner of the voxel (0, 0, 0). If None, the minimum of the first frame.
+            Voxels range from -2 ** 20 to 2 ** 20 - 1 along each axis.
+        decay: float, optional
+            Default: 1
+            Counts and sums are multiplied by decay before adding each new
+            frame, so older points weight less. Maxima do not decay.
+        max_frames: int, optional
+            Default: None
+            If not None, the oldest frame is removed once more than max_frames
+            frames were added. Voxels left without points are emptied.
+        """
+        super().__init__(points=points)
+        self.size = size
+        self.origin = origin
+        self.decay = decay
+        self.max_frames = max_frames
+
+    def compute(self):
+        """ABC API."""
+        if self.origin is None:
+            self.origin = self._points.min(0)
+        self.origin = np.asarray(self.origin, dtype=np.float64)
+
+        self.id = "VA({},{},{},{})".format(self.size, self.origin.tolist(), self.decay, self.max_frames)
+
+        self.n_frames = 0
+        self.frames = deque()
+        self._n_slots = 0
+        self._n_empty = 0
+        self._keys = np.empty(0, dtype=np.int64)
+        self._count = np.empty(0)
+        self._sum = np.empty((0, 3))
+        self._max = np.empty((0, 3))
+        self._voxel_frames = np.empty(0, dtype=np.int32)
+        # voxels whose maximum must be recomputed from the kept frames
+        self._stale = np.empty(0, dtype=bool)
+        self._has_stale = False
+        # key to slot mapping, sorted by key
+        self._sorted_keys = np.empty(0, dtype=np.int64)
+        self._sorted_slots = np.empty(0, dtype=np.int64)
+        # stored counts and sums are the real ones multiplied by _weight
+        self._weight = 1.0
+
+        self.add_points(self._points)
+
+    def get_keys(self, points):
+        """(N,) int64 key of the voxel containing each point."""
+        ijk = np.floor((points - self.origin) / self.size).astype(np.int64) + 2 ** (KEY_BITS - 1)
+        if np.any((ijk < 0) | (ijk >= 2 ** KEY_BITS)):
+            raise ValueError("Points are too far from the origin")
+        return (ijk[:, 0] << (2 * KEY_BITS)) | (ijk[:, 1] << KEY_BITS) | ijk[:, 2]
+
+    def add_points(self, points):
+        """Add a new frame of points.
+
+        Parameters
+        ----------
+        points: (N, 3) numpy.array
+        """
+        keys = self.get_keys(points)
+        order = np.argsort(keys, kind="mergesort")
+        keys = keys[order]
+        sorted_points = points[order].astype(np.float64)
+
+        start = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+        count = np.diff(np.r_[start, len(keys)]).astype(np.float64)
+        if len(keys):
+            frame_sum = np.add.reduceat(sorted_points, start)
+            frame_max = np.maximum.reduceat(sorted_points, start)
+        else:
+            frame_sum = frame_max = np.empty((0, 3))
+        slots = self._get_slots(keys[start])
+
+        if self.n_frames and self.decay != 1:
+            self._weight /= self.decay
+            if self._weight > MAX_WEIGHT:
+                self._rescale()
+
+        # slots are unique, so in-place fancy updates are safe
+        self._count[slots] += self._weight * count
+        self._sum[slots] += self._weight * frame_sum
+        self._max[slots] = np.maximum(self._max[slots], frame_max)
+        self._n_empty -= np.count_nonzero(self._voxel_frames[slots] == 0)
+        self._voxel_frames[slots] += 1
+
+        if self.max_frames is not None:
+            self.frames.append((self._weight, slots, count, frame_sum, frame_max))
+        self.n_frames += 1
+
+        while self.max_frames is not None and len(self.frames) > self.max_frames:
+            self.remove_oldest_frame()
+
+    def remove_oldest_frame(self):
+        """Remove the points of the oldest frame still in the accumulator.
+
+        Only available if max_frames is not None, as frames are not kept otherwise.
+        """
+        if self.max_frames is None:
+            raise ValueError("Frames are only kept if max_frames is not None")
+        if not self.frames:
+            raise ValueError("There are no frames left")
+
+        weight, slots, count, frame_sum, frame_max = self.frames.popleft()
+        self._count[slots] -= weight * count
+        self._sum[slots] -= weight * frame_sum
+        self._voxel_frames[slots] -= 1
+
+        emptied = slots[self._voxel_frames[slots] == 0]
+        self._count[emptied] = 0
+        self._sum[emptied] = 0
+        self._max[emptied] = -np.inf
+        self._stale[emptied] = False
+        self._n_empty += len(emptied)
+
+        # maxima can't be subtracted, the ones reached by this frame are recomputed on read
+        kept = self._voxel_frames[slots] > 0
+        reached = np.any(frame_max[kept] >= self._max[slots[kept]], axis=1)
+        if reached.any():
+            self._stale[slots[kept][reached]] = True
+            self._has_stale = True
+
+        if 2 * self._n_empty > self._n_slots:
+            self._compact()
+
+    def _get_slots(self, unique_keys):
+        """Slot of each of the sorted unique_keys, allocating the missing ones."""
+        pos = np.searchsorted(self._sorted_keys, unique_keys)
+        found = pos < len(self._sorted_keys)
+        found[found] = self._sorted_keys[pos[found]] == unique_keys[found]
+        slots = np.empty(len(unique_keys), dtype=np.int64)
+        slots[found] = self._sorted_slots[pos[found]]
+
+        new = ~found
+        n_new = np.count_nonzero(new)
+        if n_new:
+            new_slots = np.arange(self._n_slots, self._n_slots + n_new)
+            self._reserve(self._n_slots + n_new)
+            self._n_slots += n_new
+            self._n_empty += n_new
+            self._keys[new_slots] = unique_keys[new]
+            # all the new keys are merged in a single copy of the sorted arrays
+            self._sorted_keys = np.insert(self._sorted_keys, pos[new], unique_keys[new])
+            self._sorted_slots = np.insert(self._sorted_slots, pos[new], new_slots)
+            slots[new] = new_slots
+
+        return slots
+
+    def _reserve(self, n_slots):
+        """Grow the per-voxel arrays geometrically to hold at least n_slots."""
+        capacity = len(self._keys)
+        if n_slots <= capacity:
+            return
+        capacity = max(n_slots, 2 * capacity)
+
+        def grow(array, fill):
+            grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        self._keys = grow(self._keys, 0)
+        self._count = grow(self._count, 0)
+        self._sum = grow(self._sum, 0)
+        self._max = grow(self._max, -np.inf)
+        self._voxel_frames = grow(self._voxel_frames, 0)
+        self._stale = grow(self._stale, False)
+
+    def _rescale(self):
+        """Divide the stored counts and sums by _weight, so they don't overflow."""
+        self._count[:self._n_slots] /= self._weight
+        self._sum[:self._n_slots] /= self._weight
+        self.frames = deque(
+            (weight / self._weight, slots, count, frame_sum, frame_max)
+            for weight, slots, count, frame_sum, frame_max in self.frames)
+        self._weight = 1.0
+
+    def _compact(self):
+        """Drop the slots of empty voxels."""
+        keep = np.flatnonzero(self._voxel_frames[:self._n_slots] > 0)
+        remap = np.full(self._n_slots, -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+
+        self._n_slots = len(keep)
+        self._n_empty = 0
+        self._keys = self._keys[keep]
+        self._count = self._count[keep]
+        self._sum = self._sum[keep]
+        self._max = self._max[keep]
+        self._voxel_frames = self._voxel_frames[keep]
+        self._stale = self._stale[keep]
+
+        kept = remap[self._sorted_slots] >= 0
+        self._sorted_keys = self._sorted_keys[kept]
+        self._sorted_slots = remap[self._sorted_slots[kept]]
+        self.frames = deque(
+            (weight, remap[slots], count, frame_sum, frame_max)
+            for weight, slots, count, frame_sum, frame_max in self.frames)
+
+    def _refresh_max(self):
+        """Recompute the stale maxima from the kept frames."""
+        if not self._has_stale:
+            return
+        self._max[self._stale] = -np.inf
+        for _, slots, _, _, frame_max in self.frames:
+            selected = self._stale[slots]
+            slots = slots[selected]
+            self._max[slots] = np.maximum(self._max[slots], frame_max[selected])
+        self._stale[:] = False
+        self._has_stale = False
+
+    def _occupied_slots(self):
+        """Slots of the occupied voxels, sorted by key."""
+        return self._sorted_slots[self._voxel_frames[self._sorted_slots] > 0]
+
+    @property
+    def voxel_keys(self):
+        """Sorted keys of the occupied voxels."""
+        return self._keys[self._occupied_slots()]
+
+    @property
+    def voxel_counts(self):
+        """Number of points, weighted by decay, of each occupied voxel."""
+        return self._count[self._occupied_slots()] / self._weight
+
+    def get_voxel_ijk(self, voxel_n=None):
+        """Integer coordinates of voxels along each axis, relative to origin.
+
+        Parameters
+        ----------
+        voxel_n: int or array of int, optional
+            Default: None
+            Voxel keys. If None, the occupied voxels.
+
+        Returns
+        -------
+        ijk: (..., 3) int64 ndarray
+        """
+        if voxel_n is None:
+            voxel_n = self.voxel_keys
+        voxel_n = np.asarray(voxel_n, dtype=np.int64)
+        mask = 2 ** KEY_BITS - 1
+        ijk = np.stack([voxel_n >> (2 * KEY_BITS), (voxel_n >> KEY_BITS) & mask, voxel_n & mask], axis=-1)
+        return ijk - 2 ** (KEY_BITS - 1)
+
+    def get_voxel_centers(self, voxel_n=None):
+        """Centers of voxels.
+
+        Parameters
+        ----------
+        voxel_n: int or array of int, optional
+            Default: None
+            Voxel keys. If None, the occupied voxels.
+
+        Returns
+        -------
+        centers: (..., 3) float32 ndarray
+        """
+        return (self.origin + (self.get_voxel_ijk(voxel_n) + 0.5) * self.size).astype(np.float32)
+
+    def aggregate(self, spec, points=None):
+        """Per-voxel statistics of the accumulated points.
+
+        Parameters
+        ----------
+        spec: dict
+            Map "x", "y" or "z" to a list of reductions among "sum", "mean"
+            and "max". The entry "count": True adds the number of points
+            inside each voxel, weighted by decay.
+        points: None
+            Only for compatibility with VoxelGrid.aggregate, other fields
+            are not accumulated.
+
+        Returns
+        -------
+        aggregated: pandas.DataFrame
+            One row per occupied voxel, indexed by voxel key, with a
+            "{field}_{reduction}" column for each requested reduction and a
+            "count" column if requested.
+        """
+        self._refresh_max()
+        slots = self._occupied_slots()
+        aggregated = pd.DataFrame(index=pd.Index(self._keys[slots], name="voxel_n"))
+        for field, reductions in spec.items():
+            if field == "count":
+                continue
+            if field not in ("x", "y", "z"):
+                raise ValueError("Only x, y and z are accumulated, got {}".format(field))
+            if isinstance(reductions, str):
+                reductions = [reductions]
+            axis = "xyz".index(field)
+            for reduction in reductions:
+                if reduction == "sum":
+                    values = self._sum[slots, axis] / self._weight
+                elif reduction == "mean":
+                    values = self._sum[slots, axis] / self._count[slots]
+                elif reduction == "max":
+                    values = self._max[slots, axis]
+                else:
+                    raise ValueError("Unsupported reduction: {}".format(reduction))
+                aggregated["{}_{}".format(field, reduction)] = values
+
+        if spec.get("count", False):
+            aggregated["count"] = self._count[slots] / self._weight
+        return aggregated
+
+    def get_feature_vector(self, mode="binary"):
+        """Feature of each occupied voxel in coordinate (COO) form.
+
+        Parameters
+        ----------
+        mode: str, optional
+            Default: "binary"
+            One of the modes of VoxelGrid.get_feature_vector except TDF.
+            density is the weighted count of each voxel over the total.
+
+        Returns
+        -------
+        ijk: (M, 3) int64 ndarray
+            Coordinates of the M occupied voxels, relative to origin.
+        values: (M,) ndarray
+        """
+        if mode not in ACCUMULATION_MODES:
+            raise NotImplementedError("{} is not a supported feature vector mode".format(mode))
+
+        slots = self._occupied_slots()
+        ijk = self.get_voxel_ijk(self._keys[slots])
+        if mode == "binary":
+            return ijk, np.ones(len(slots))
+        if mode == "density":
+            return ijk, self._count[slots] / self._count[slots].sum()
+        return ijk, self.aggregate({mode[0]: [mode[2:]]}).values[:, 0]
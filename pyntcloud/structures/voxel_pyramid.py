@@ -0,0 +1,86 @@
+import numpy as np
+
+from .base import Structure
+from .voxelgrid import VoxelGrid
+from ..utils.array import expand_ranges
+
+
+class VoxelPyramid(Structure):
+
+    def __init__(self, *, points, max_level=6, n_levels=4, sparse=False):
+        """VoxelGrids of the same points at several power of two resolutions.
+
+        The points are only voxelized at the finest level. Each coarser level
+        halves the voxel indices of the next finer one and merges its occupied
+        voxels, without sorting the points again.
+
+        Parameters
+        ----------
+        points: (N, 3) numpy.array
+        max_level: int, optional
+            Default: 6
+            The finest level has 2 ** max_level voxels along each axis. At most 20.
+        n_levels: int, optional
+            Default: 4
+            Number of levels, from max_level - n_levels + 1 to max_level.
+        sparse: bool, optional
+            Default: False
+            Passed to the VoxelGrid of each level.
+        """
+        super().__init__(points=points)
+        if not 0 <= max_level <= 20:
+            raise ValueError("max_level must be between 0 and 20, got {}".format(max_level))
+        if not 1 <= n_levels <= max_level + 1:
+            raise ValueError("n_levels must be between 1 and max_level + 1, got {}".format(n_levels))
+        self.max_level = max_level
+        self.n_levels = n_levels
+        self.sparse = sparse
+
+    def compute(self):
+        """ABC API."""
+        self.id = "VP({},{},{})".format(self.max_level, self.n_levels, self.sparse)
+
+        n = 2 ** self.max_level
+        finest = VoxelGrid(points=self._points, n_x=n, n_y=n, n_z=n, sparse=self.sparse)
+        finest.compute()
+
+        self.levels = {self.max_level: finest}
+        for level in range(self.max_level - 1, self.max_level - self.n_levels, -1):
+            self.levels[level] = self._coarsen(self.levels[level + 1])
+
+    def _coarsen(self, finer):
+        """VoxelGrid with half the voxels along each axis of finer."""
+        n = finer.x_y_z[0] // 2
+        voxelgrid = VoxelGrid(points=self._points, n_x=n, n_y=n, n_z=n, sparse=self.sparse)
+        voxelgrid._set_segments(finer.xyzmin, finer.xyzmax)
+        voxelgrid.id = voxelgrid._get_id()
+
+        ijk = np.stack([finer.voxel_x, finer.voxel_y, finer.voxel_z]) >> 1
+        voxel_n = np.ravel_multi_index(ijk, voxelgrid.x_y_z)
+
+        # merge the occupied voxels of finer inside each coarse voxel
+        parents = np.ravel_multi_index((finer.get_voxel_ijk() >> 1).T, voxelgrid.x_y_z)
+        children = np.argsort(parents, kind="mergesort")
+        voxel_keys, first = np.unique(parents[children], return_index=True)
+        children_start = finer.voxel_start[children]
+        children_counts = finer.voxel_counts[children]
+        voxel_counts = np.add.reduceat(children_counts, first).astype(finer.voxel_counts.dtype)
+        voxel_start = np.zeros_like(voxel_counts)
+        np.cumsum(voxel_counts[:-1], out=voxel_start[1:])
+        order = finer.order[expand_ranges(children_start, children_start + children_counts)]
+
+        voxelgrid._set_voxels(ijk, voxel_n, occupied=(order, voxel_keys, voxel_start, voxel_counts))
+        return voxelgrid
+
+    def get_level(self, level):
+        """VoxelGrid with 2 ** level voxels along each axis."""
+        if level not in self.levels:
+            raise ValueError("level must be between {} and {}, got {}".format(
+                self.max_level - self.n_levels + 1, self.max_level, level))
+        return self.levels[level]
+
+    def get_and_set(self, pyntcloud):
+        """Also add the VoxelGrid of each level, so they can be used by id."""
+        for voxelgrid in self.levels.values():
+            voxelgrid.get_and_set(pyntcloud)
+        return super().get_and_set(pyntcloud)
@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 
 try:
     import matplotlib.pyplot as plt
@@ -6,22 +7,74 @@ try:
 except ImportError:
     is_matplotlib_avaliable = False
 
+from scipy.sparse import csr_matrix
 from scipy.spatial import cKDTree
 
 from .base import Structure
+from ..neighbors import DEFAULT_MAX_MEMORY, block_size
 from ..plot import plot_voxelgrid
 from ..utils.array import cartesian
 
 try:
-    from ..utils.numba import groupby_max, groupby_count, groupby_sum
+    from ..utils.numba import aggregate_sorted, voxelize as voxelize_numba
     is_numba_avaliable = True
 except ImportError:
     is_numba_avaliable = False
 
+#: reductions supported by VoxelGrid.aggregate, in the order used by utils.numba.aggregate_sorted
+AGGREGATIONS = ("sum", "mean", "min", "max")
+
+#: feature vector modes computed with VoxelGrid.aggregate
+AGGREGATION_MODES = ("x_max", "y_max", "z_max", "x_mean", "y_mean", "z_mean")
+
+
+def voxelize(points, segments):
+    """Find the voxel containing each point in a single pass over the points.
+
+    Indices are computed as ceil((p - min) / step) - 1 and corrected by one
+    comparison against the segments, so each voxel i holds the points in
+    (segments[i], segments[i + 1]], plus the points at the lower bound of the
+    first voxel. Points outside the segments are clipped to the border voxels.
+
+    Parameters
+    ----------
+    points: (N, 3) numpy.array
+    segments: list of 3 numpy.array
+        Boundaries of the voxels along each axis, as computed by numpy.linspace.
+
+    Returns
+    -------
+    ijk: (3, N) int32 ndarray
+        Voxel index along x, y and z axis.
+    voxel_n: (N,) int64 ndarray
+        Voxel index in 3D array using 'C' order.
+    """
+    segments = [np.asarray(s, dtype=np.float64) for s in segments]
+    ijk = np.empty((3, len(points)), dtype=np.int32)
+    voxel_n = np.empty(len(points), dtype=np.int64)
+
+    if is_numba_avaliable:
+        return voxelize_numba(points, segments[0], segments[1], segments[2], ijk, voxel_n)
+
+    for i, s in enumerate(segments):
+        n = len(s) - 1
+        step = (s[-1] - s[0]) / n
+        if step == 0:
+            ijk[i] = 0
+            continue
+        j = np.clip(np.ceil((points[:, i] - s[0]) / step), 1, n).astype(np.int32) - 1
+        # one step of correction against float rounding keeps the cells right-closed
+        j -= (j > 0) & (points[:, i] <= s[j])
+        j += (j < n - 1) & (points[:, i] > s[j + 1])
+        ijk[i] = j
+    voxel_n[:] = np.ravel_multi_index(ijk, [len(s) - 1 for s in segments])
+    return ijk, voxel_n
+
 
 class VoxelGrid(Structure):
 
-    def __init__(self, *, points, n_x=1, n_y=1, n_z=1, size_x=None, size_y=None, size_z=None, regular_bounding_box=True):
+    def __init__(self, *, points, n_x=1, n_y=1, n_z=1, size_x=None, size_y=None, size_z=None, regular_bounding_box=True,
+                 sparse=False):
         """Grid of voxels with support for different build methods.
 
         Parameters
@@ -39,11 +92,19 @@ class VoxelGrid(Structure):
             Default: True
             If True, the bounding box of the point cloud will be adjusted
             in order to have all the dimensions of equal length.
+        sparse : bool, optional
+            Default: False
+            If True, only the occupied voxels are stored: voxel_centers is not
+            computed and get_feature_vector returns the occupied voxels in
+            coordinate (COO) form instead of a dense [n_x, n_y, n_z] array.
+            Memory then scales with the number of occupied voxels instead of
+            the volume of the bounding box.
         """
         super().__init__(points=points)
         self.x_y_z = [n_x, n_y, n_z]
         self.sizes = [size_x, size_y, size_z]
         self.regular_bounding_box = regular_bounding_box
+        self.sparse = sparse
 
     def compute(self):
         """ABC API."""
@@ -64,6 +125,20 @@ class VoxelGrid(Structure):
             xyzmax[n] += margin / 2
             self.x_y_z[n] = ((xyzmax[n] - xyzmin[n]) / size).astype(int)
 
+        self._set_segments(xyzmin, xyzmax)
+
+        self.id = self._get_id()
+
+        # find where each point lies in corresponding segmented axis
+        ijk, voxel_n = voxelize(self._points, self.segments)
+        self._set_voxels(ijk, voxel_n)
+
+    def _get_id(self):
+        return "V({},{},{}{})".format(
+            self.x_y_z, self.sizes, self.regular_bounding_box, ",sparse" if self.sparse else "")
+
+    def _set_segments(self, xyzmin, xyzmax):
+        """Divide the bounding box [xyzmin, xyzmax] in self.x_y_z voxels."""
         self.xyzmin = xyzmin
         self.xyzmax = xyzmax
 
@@ -78,20 +153,33 @@ class VoxelGrid(Structure):
         self.segments = segments
         self.shape = shape
 
-        self.n_voxels = self.x_y_z[0] * self.x_y_z[1] * self.x_y_z[2]
-
-        self.id = "V({},{},{})".format(self.x_y_z, self.sizes, self.regular_bounding_box)
+        self.n_voxels = int(self.x_y_z[0]) * int(self.x_y_z[1]) * int(self.x_y_z[2])
 
-        # find where each point lies in corresponding segmented axis
-        # -1 so index are 0-based; clip for edge cases
-        self.voxel_x = np.clip(np.searchsorted(self.segments[0], self._points[:, 0]) - 1, 0, self.x_y_z[0])
-        self.voxel_y = np.clip(np.searchsorted(self.segments[1], self._points[:, 1]) - 1, 0, self.x_y_z[1])
-        self.voxel_z = np.clip(np.searchsorted(self.segments[2], self._points[:, 2]) - 1, 0,  self.x_y_z[2])
-        self.voxel_n = np.ravel_multi_index([self.voxel_x, self.voxel_y, self.voxel_z], self.x_y_z)
+    def _set_voxels(self, ijk, voxel_n, occupied=None):
+        """Store the voxel of each point and the occupied voxels.
 
-        # compute center of each voxel
-        midsegments = [(self.segments[i][1:] + self.segments[i][:-1]) / 2 for i in range(3)]
-        self.voxel_centers = cartesian(midsegments).astype(np.float32)
+        occupied: (order, voxel_keys, voxel_start, voxel_counts), optional
+            Computed from voxel_n if None.
+        """
+        self.voxel_x, self.voxel_y, self.voxel_z = ijk
+        self.voxel_n = voxel_n
+
+        if occupied is None:
+            # points sorted by voxel; each occupied voxel stores the offset of its
+            # first point in that order and its number of points
+            index_dtype = np.int32 if len(self.voxel_n) <= np.iinfo(np.int32).max else np.int64
+            order = np.argsort(self.voxel_n, kind="mergesort").astype(index_dtype)
+            voxel_keys, voxel_start, voxel_counts = np.unique(
+                self.voxel_n[order], return_index=True, return_counts=True)
+            occupied = order, voxel_keys, voxel_start.astype(index_dtype), voxel_counts.astype(index_dtype)
+        self.order, self.voxel_keys, self.voxel_start, self.voxel_counts = occupied
+
+        if self.sparse:
+            self.voxel_centers = None
+        else:
+            # compute center of each voxel
+            midsegments = [(self.segments[i][1:] + self.segments[i][:-1]) / 2 for i in range(3)]
+            self.voxel_centers = cartesian(midsegments).astype(np.float32)
 
     def query(self, points):
         """ABC API. Query structure.
@@ -99,28 +187,67 @@ class VoxelGrid(Structure):
         TODO Make query_voxelgrid an independent function, and add a light
         save mode where only segments and x_y_z are saved.
         """
-        voxel_x = np.clip(np.searchsorted(
-            self.segments[0], points[:, 0]) - 1, 0, self.x_y_z[0])
-        voxel_y = np.clip(np.searchsorted(
-            self.segments[1], points[:, 1]) - 1, 0, self.x_y_z[1])
-        voxel_z = np.clip(np.searchsorted(
-            self.segments[2], points[:, 2]) - 1, 0, self.x_y_z[2])
-        voxel_n = np.ravel_multi_index([voxel_x, voxel_y, voxel_z], self.x_y_z)
+        return voxelize(points, self.segments)[1]
+
+    def get_voxel_ijk(self, voxel_n=None):
+        """Integer coordinates of voxels along each axis.
+
+        Parameters
+        ----------
+        voxel_n: int or array of int, optional
+            Default: None
+            Voxel indices in 'C' order. If None, the occupied voxels.
+
+        Returns
+        -------
+        ijk: (..., 3) ndarray
+        """
+        if voxel_n is None:
+            voxel_n = self.voxel_keys
+        return np.stack(np.unravel_index(voxel_n, self.x_y_z), axis=-1)
 
-        return voxel_n
+    def get_voxel_centers(self, voxel_n=None):
+        """Centers of voxels, computed on demand in sparse mode.
 
-    def get_feature_vector(self, mode="binary"):
+        Parameters
+        ----------
+        voxel_n: int or array of int, optional
+            Default: None
+            Voxel indices in 'C' order. If None, the occupied voxels.
+
+        Returns
+        -------
+        centers: (..., 3) float32 ndarray
+        """
+        if voxel_n is None:
+            voxel_n = self.voxel_keys
+        if self.voxel_centers is not None:
+            return self.voxel_centers[voxel_n]
+        ijk = self.get_voxel_ijk(voxel_n)
+        return (self.xyzmin + (ijk + 0.5) * self.shape).astype(np.float32)
+
+    def get_feature_vector(self, mode="binary", truncation=None, kdtree=None):
         """Return a vector of size self.n_voxels. See mode options below.
 
         Parameters
         ----------
         mode: str in available modes. See Notes
             Default "binary"
+        truncation: float, optional
+            Default: None
+            Only for TDF. See get_truncated_distances.
+        kdtree: pyntcloud.structures.KDTree, optional
+            Default: None
+            Only for TDF. See get_truncated_distances.
 
         Returns
         -------
         feature_vector: [n_x, n_y, n_z] ndarray
             See Notes.
+            If self.sparse, a tuple (ijk, values) instead, where ijk is the
+            (M, 3) array of coordinates of the M occupied voxels and values
+            the (M,) feature of each one. Empty voxels are 0 in all modes.
+            For TDF, the M voxels are the ones with a non zero value.
 
         Notes
         -----
@@ -135,7 +262,7 @@ class VoxelGrid(Structure):
         TDF
             Truncated Distance Function. Value between 0 and 1 indicating the distance
             between the voxel's center and the closest point. 1 on the surface,
-            0 on voxels further than 2 * voxel side.
+            0 on voxels further than truncation, 2 * voxel side by default.
 
         x_max, y_max, z_max
             Maximum coordinate value of points inside each voxel.
@@ -143,6 +270,17 @@ class VoxelGrid(Structure):
         x_mean, y_mean, z_mean
             Mean coordinate value of points inside each voxel.
         """
+        if mode == "TDF":
+            voxel_n, distances = self.get_truncated_distances(truncation=truncation, kdtree=kdtree)
+            if self.sparse:
+                return self.get_voxel_ijk(voxel_n), distances
+            vector = np.zeros(self.n_voxels)
+            vector[voxel_n] = distances
+            return vector.reshape(self.x_y_z)
+
+        if self.sparse:
+            return self.get_voxel_ijk(), self._get_sparse_feature_vector(mode)
+
         vector = np.zeros(self.n_voxels)
 
         if mode == "binary":
@@ -153,33 +291,205 @@ class VoxelGrid(Structure):
             vector[:len(count)] = count
             vector /= len(self.voxel_n)
 
-        elif mode == "TDF":
-            # truncation = np.linalg.norm(self.shape)
-            kdt = cKDTree(self._points)
-            vector, i = kdt.query(self.voxel_centers, n_jobs=-1)
-
-        elif mode.endswith("_max"):
-            if not is_numba_avaliable:
-                raise ImportError("numba is required to compute {}".format(mode))
-            axis = {"x_max": 0, "y_max": 1, "z_max": 2}
-            vector = groupby_max(self._points, self.voxel_n, axis[mode], vector)
-
-        elif mode.endswith("_mean"):
-            if not is_numba_avaliable:
-                raise ImportError("numba is required to compute {}".format(mode))
-            axis = {"x_mean": 0, "y_mean": 1, "z_mean": 2}
-            voxel_sum = groupby_sum(self._points, self.voxel_n, axis[mode], np.zeros(self.n_voxels))
-            voxel_count = groupby_count(self._points, self.voxel_n, np.zeros(self.n_voxels))
-            vector = np.nan_to_num(voxel_sum / voxel_count)
+        elif mode in AGGREGATION_MODES:
+            vector[self.voxel_keys] = self.aggregate({mode[0]: [mode[2:]]}).values[:, 0]
 
         else:
             raise NotImplementedError("{} is not a supported feature vector mode".format(mode))
 
         return vector.reshape(self.x_y_z)
 
+    def _get_sparse_feature_vector(self, mode):
+        """Feature of each occupied voxel, in the order of self.voxel_keys."""
+        if mode == "binary":
+            return np.ones(len(self.voxel_keys))
+
+        elif mode == "density":
+            return self.voxel_counts / len(self.voxel_n)
+
+        elif mode in AGGREGATION_MODES:
+            return self.aggregate({mode[0]: [mode[2:]]}).values[:, 0]
+
+        else:
+            raise NotImplementedError("{} is not a supported feature vector mode".format(mode))
+
+    def get_truncated_distances(self, truncation=None, kdtree=None):
+        """Normalized truncated distance from voxel centers to the closest point.
+
+        Only the voxels whose center can be within truncation of a point,
+        given the occupied voxels, are evaluated, with queries bounded by
+        truncation. The cost scales with the number of occupied voxels
+        instead of self.n_voxels.
+
+        Parameters
+        ----------
+        truncation: float, optional
+            Default: None
+            Distance at which values reach 0. If None, 2 * the largest voxel side.
+        kdtree: pyntcloud.structures.KDTree or scipy.spatial.cKDTree, optional
+            Default: None
+            Tree built on the same points as the voxelgrid. If None, a new one
+            is built. PyntCloud.get_feature_vector passes the cloud's KDTree.
+
+        Returns
+        -------
+        voxel_n: (M,) int64 ndarray
+            Sorted indices of the voxels with a value above 0.
+        values: (M,) ndarray
+            1 - distance / truncation, between 0 and 1.
+        """
+        if truncation is None:
+            truncation = 2 * max(self.shape)
+        if kdtree is None:
+            kdtree = cKDTree(self._points)
+
+        # offsets from an occupied voxel to the voxels whose center may be
+        # within truncation of one of its points
+        shape = np.asarray(self.shape, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rings = np.where(shape > 0, np.floor(truncation / shape + 0.5), 0).astype(int)
+        offsets = cartesian([np.arange(-r, r + 1) for r in rings])
+        gaps = np.maximum(np.abs(offsets) - 0.5, 0) * shape
+        offsets = offsets[np.einsum("ij,ij->i", gaps, gaps) <= truncation ** 2]
+
+        voxel_n = []
+        values = []
+        occupied_ijk = self.get_voxel_ijk()
+        rows = block_size(len(offsets) * 64, DEFAULT_MAX_MEMORY)
+        for start in range(0, len(occupied_ijk), rows):
+            ijk = (occupied_ijk[start:start + rows, None, :] + offsets[None, :, :]).reshape(-1, 3)
+            ijk = ijk[np.all((ijk >= 0) & (ijk < self.x_y_z), axis=1)]
+            keys = np.unique(np.ravel_multi_index(ijk.T, self.x_y_z))
+            distances = kdtree.query(self.get_voxel_centers(keys), distance_upper_bound=truncation)[0]
+            inside = distances < truncation
+            voxel_n.append(keys[inside])
+            values.append(1 - distances[inside] / truncation)
+
+        # voxels near several blocks are evaluated more than once, with the same value
+        voxel_n, first = np.unique(np.concatenate(voxel_n), return_index=True)
+        return voxel_n, np.concatenate(values)[first]
+
+    def aggregate(self, spec, points=None):
+        """Compute several per-voxel reductions of several fields at once.
+
+        Parameters
+        ----------
+        spec: dict
+            Map each field to a list of reductions among "sum", "mean", "min"
+            and "max". "x", "y" and "z" are the coordinates of the points,
+            any other field is read from points. The entry "count": True adds
+            the number of points inside each voxel.
+            Example: {"z": ["max", "mean"], "intensity": ["mean"], "count": True}
+        points: pandas.DataFrame, optional
+            Default: None
+            Values of the fields other than x, y and z, in the same order as
+            the points used to build the voxelgrid. Usually PyntCloud.points.
+
+        Returns
+        -------
+        aggregated: pandas.DataFrame
+            One row per occupied voxel, indexed by voxel_n, with a
+            "{field}_{reduction}" column for each requested reduction and a
+            "count" column if requested.
+
+        Notes
+        -----
+        With numba, all the reductions are computed in parallel over the
+        voxels in a single pass. Otherwise numpy reduceat is used on the
+        points sorted by voxel.
+        """
+        fields = []
+        columns = []
+        column_fields = []
+        column_reductions = []
+        for field, reductions in spec.items():
+            if field == "count":
+                continue
+            if isinstance(reductions, str):
+                reductions = [reductions]
+            for reduction in reductions:
+                if reduction not in AGGREGATIONS:
+                    raise ValueError("Unsupported reduction: {}".format(reduction))
+                columns.append("{}_{}".format(field, reduction))
+                column_fields.append(len(fields))
+                column_reductions.append(AGGREGATIONS.index(reduction))
+            fields.append(field)
+
+        values = np.empty((len(fields), len(self.voxel_n)))
+        for i, field in enumerate(fields):
+            if field in ("x", "y", "z"):
+                values[i] = self._points[:, "xyz".index(field)]
+            elif points is not None and field in points:
+                values[i] = np.asarray(points[field])
+            else:
+                raise ValueError("{} is not x, y, z or a column of points".format(field))
+
+        result = np.empty((len(self.voxel_keys), len(columns)))
+        if is_numba_avaliable and columns:
+            aggregate_sorted(
+                values, self.order, self.voxel_start, self.voxel_counts,
+                np.array(column_fields), np.array(column_reductions), result)
+
+        else:
+            sorted_values = values[:, self.order]
+            for c, (f, reduction) in enumerate(zip(column_fields, column_reductions)):
+                ufunc = (np.add, np.add, np.minimum, np.maximum)[reduction]
+                result[:, c] = ufunc.reduceat(sorted_values[f], self.voxel_start)
+                if AGGREGATIONS[reduction] == "mean":
+                    result[:, c] /= self.voxel_counts
+
+        aggregated = pd.DataFrame(result, columns=columns, index=pd.Index(self.voxel_keys, name="voxel_n"))
+        if spec.get("count", False):
+            aggregated["count"] = self.voxel_counts
+        return aggregated
+
+    def adjacency(self, connectivity=26):
+        """Neighbor graph of the occupied voxels.
+
+        Parameters
+        ----------
+        connectivity: {6, 18, 26}, optional
+            Default: 26
+            6: voxels sharing a face.
+            18: voxels sharing a face or an edge.
+            26: voxels sharing a face, an edge or a corner.
+
+        Returns
+        -------
+        adjacency: (M, M) scipy.sparse.csr_matrix of bool
+            Where M = len(self.voxel_keys). Row and column i correspond to
+            the voxel self.voxel_keys[i]. The graph is symmetric and has no
+            self loops.
+        """
+        if connectivity not in (6, 18, 26):
+            raise ValueError("connectivity must be 6, 18 or 26, got {}".format(connectivity))
+
+        ijk = self.get_voxel_ijk()
+        offsets = cartesian([[-1, 0, 1]] * 3)
+        offsets = offsets[np.isin(np.abs(offsets).sum(1), {6: [1], 18: [1, 2], 26: [1, 2, 3]}[connectivity])]
+
+        rows = []
+        cols = []
+        for offset in offsets:
+            neighbors = ijk + offset
+            valid = np.all((neighbors >= 0) & (neighbors < self.x_y_z), axis=1)
+            keys = np.ravel_multi_index(neighbors[valid].T, self.x_y_z)
+            pos = np.minimum(np.searchsorted(self.voxel_keys, keys), len(self.voxel_keys) - 1)
+            found = self.voxel_keys[pos] == keys
+            rows.append(np.flatnonzero(valid)[found])
+            cols.append(pos[found])
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        n_occupied = len(self.voxel_keys)
+        return csr_matrix(
+            (np.ones(len(rows), dtype=bool), (rows, cols)), shape=(n_occupied, n_occupied))
+
     def get_voxel_neighbors(self, voxel):
         """Get valid, non-empty 26 neighbors of voxel.
 
+        See adjacency for the neighbors of all the occupied voxels at once.
+
         Parameters
         ----------
         voxel: int in self.set_voxel_n
@@ -219,7 +529,7 @@ class VoxelGrid(Structure):
                                               valid_neighbor_indices[:, 1],
                                               valid_neighbor_indices[:, 2]), self.x_y_z)
 
-        return [x for x in ravel_indices if x in np.unique(self.voxel_n)]
+        return ravel_indices[np.isin(ravel_indices, self.voxel_keys)].tolist()
 
     def plot(self,
              d=2,
@@ -229,6 +539,9 @@ class VoxelGrid(Structure):
              output_name=None,
              width=800,
              height=500):
+        if self.sparse:
+            raise NotImplementedError("Plotting is not supported in sparse mode")
+
         feature_vector = self.get_feature_vector(mode)
 
         if d == 2:
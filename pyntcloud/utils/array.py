@@ -123,3 +123,376 @@ def cov3D(k_neighbors):
     """
     diffs = k_neighbors - k_neighbors.mean(1, keepdims=True)
     return np.einsum('ijk,ijl->ikl', diffs, diffs) / k_neighbors.shape[1]
+
+
+def cov3D_from_indices(points, k_neighbors, queries=None):
+    """Covariance of each neighbourhood without gathering its coordinates.
+
+    First and second moments are accumulated one neighbor column at a time,
+    relative to the first point of each neighbourhood, so the memory used is
+    O(M * 9) instead of the O(M * K * 3) of cov3D.
+
+    Parameters
+    ----------
+    points: (N, 3) ndarray
+    k_neighbors: (M, K) ndarray
+        Indices in points of the members of each neighbourhood.
+    queries: (M,) ndarray, optional
+        Default: None
+        Indices in points of an extra member of each neighbourhood, i.e. the
+        point that owns it when k_neighbors excludes self.
+
+    Returns
+    -------
+    cov: (M, 3, 3) float64 ndarray
+        Same as cov3D(points[np.c_[queries, k_neighbors]]).
+    """
+    return next(iter_cov3D_prefixes(points, k_neighbors, [k_neighbors.shape[1]], queries=queries))
+
+
+def iter_cov3D_prefixes(points, k_neighbors, sizes, queries=None):
+    """Covariances of the neighbourhoods restricted to their first neighbors.
+
+    The moments are accumulated once along the neighbor columns, so every
+    size but the largest comes at the marginal cost of its eigen solve.
+
+    Parameters
+    ----------
+    points: (N, 3) ndarray
+    k_neighbors: (M, K) ndarray
+        Indices in points of the members of each neighbourhood, i.e. sorted
+        by distance.
+    sizes: sequence of int
+        Number of columns of k_neighbors used for each covariance, in
+        increasing order and no larger than K.
+    queries: (M,) ndarray, optional
+        Default: None
+        See cov3D_from_indices.
+
+    Yields
+    ------
+    cov: (M, 3, 3) float64 ndarray
+        Same as cov3D_from_indices(points, k_neighbors[:, :size], queries) for
+        each size.
+    """
+    if queries is None:
+        origin, first_column = k_neighbors[:, 0], 1
+    else:
+        origin, first_column = queries, 0
+    origin = points[origin].astype(np.float64)
+
+    first = np.zeros((len(k_neighbors), 3))
+    second = np.zeros((len(k_neighbors), 3, 3))
+    column = first_column
+    for size in sizes:
+        for j in range(column, size):
+            diffs = points[k_neighbors[:, j]] - origin
+            first += diffs
+            second += diffs[:, :, None] * diffs[:, None, :]
+        column = max(column, size)
+
+        n = size + (queries is not None)
+        mean = first / n
+        yield second / n - mean[:, :, None] * mean[:, None, :]
+
+
+def cov3D_from_csr(points, indptr, indices, queries):
+    """Covariance of variable size neighbourhoods in CSR layout.
+
+    The moments are computed with segment reductions, without Python loops
+    over the neighbourhoods.
+
+    Parameters
+    ----------
+    points: (N, 3) ndarray
+    indptr: (M + 1,) ndarray
+    indices: (indptr[-1],) ndarray
+        The members of neighbourhood i are points[indices[indptr[i]:indptr[i + 1]]].
+    queries: (M,) ndarray
+        Indices in points of the point owning each neighbourhood. Only used as
+        the origin of the moments, for numerical stability.
+
+    Returns
+    -------
+    cov: (M, 3, 3) float64 ndarray
+        NaN for empty neighbourhoods.
+    counts: (M,) ndarray
+        Number of members of each neighbourhood.
+    """
+    indptr = indptr - indptr[0]
+    counts = np.diff(indptr)
+    rows = np.repeat(np.arange(len(counts)), counts)
+    diffs = points[indices] - points[queries].astype(np.float64)[rows]
+
+    first = reduce_segments(diffs, indptr)
+    second = reduce_segments(diffs[:, :, None] * diffs[:, None, :], indptr)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = first / counts[:, None]
+        cov = second / counts[:, None, None] - mean[:, :, None] * mean[:, None, :]
+    return cov, counts
+
+
+def _eigvalsh3D(cov):
+    """Closed-form eigenvalues of (N, 3, 3) symmetric matrices, largest first.
+
+    Also returns a mask of the matrices where the trigonometric solution is
+    ill-conditioned because of (nearly) repeated eigenvalues.
+    """
+    a00, a11, a22 = cov[:, 0, 0], cov[:, 1, 1], cov[:, 2, 2]
+    a01, a02, a12 = cov[:, 0, 1], cov[:, 0, 2], cov[:, 1, 2]
+
+    q = (a00 + a11 + a22) / 3
+    b00, b11, b22 = a00 - q, a11 - q, a22 - q
+    p = np.sqrt((b00 ** 2 + b11 ** 2 + b22 ** 2 + 2 * (a01 ** 2 + a02 ** 2 + a12 ** 2)) / 6)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # det((A - qI) / p) / 2, expanded along the first row
+        minor0 = b11 * b22 - a12 * a12
+        minor1 = a01 * b22 - a12 * a02
+        minor2 = a01 * a12 - b11 * a02
+        det = b00 * minor0 - a01 * minor1 + a02 * minor2
+        r = np.clip(det / (2 * p ** 3), -1, 1)
+
+    scalar = p == 0
+    r[scalar] = 0
+    phi = np.arccos(r) / 3
+
+    eigenvalues = np.empty((len(cov), 3))
+    eigenvalues[:, 0] = q + 2 * p * np.cos(phi)
+    eigenvalues[:, 2] = q + 2 * p * np.cos(phi + (2 * np.pi / 3))
+    eigenvalues[:, 1] = 3 * q - eigenvalues[:, 0] - eigenvalues[:, 2]
+    eigenvalues[scalar] = q[scalar, None]
+
+    # dphi = dr / sqrt(1 - r ** 2) blows up when two eigenvalues meet
+    ill_conditioned = ~scalar & (1 - np.abs(r) < 1e-6)
+
+    return eigenvalues, ill_conditioned
+
+
+def _clean_eigenvalues(eigenvalues):
+    """Set to exactly 0 the eigenvalues below the precision of the largest one."""
+    scale = np.abs(eigenvalues).max(1, keepdims=True)
+    eigenvalues[np.abs(eigenvalues) <= 64 * np.finfo(np.float64).eps * scale] = 0
+    return eigenvalues
+
+
+def eigvalsh3D(cov):
+    """Eigenvalues of (N, 3, 3) symmetric matrices, sorted from largest to smallest.
+
+    Uses the closed-form trigonometric solution, falling back to
+    np.linalg.eigvalsh where it is ill-conditioned. Eigenvalues below the
+    numerical precision of the largest one are set to exactly 0.
+
+    Parameters
+    ----------
+    cov: (N, 3, 3) ndarray
+        Symmetric matrices, i.e. covariances from cov3D.
+
+    Returns
+    -------
+    eigenvalues: (N, 3) float64 ndarray
+    """
+    cov = np.asarray(cov, dtype=np.float64)
+    eigenvalues, ill_conditioned = _eigvalsh3D(cov)
+    if np.any(ill_conditioned):
+        eigenvalues[ill_conditioned] = np.linalg.eigvalsh(cov[ill_conditioned])[:, ::-1]
+    return _clean_eigenvalues(eigenvalues)
+
+
+def _eigenvector3D(cov, eigenvalues):
+    """Unit eigenvectors of (N, 3, 3) symmetric matrices for simple eigenvalues.
+
+    The eigenvector lies in the null space of A - eI, so it is parallel to the
+    cross product of any two independent rows; the largest one is used. Also
+    returns a mask of the matrices where no pair of rows is independent enough.
+    """
+    m = cov - eigenvalues[:, None, None] * np.eye(3)
+    crosses = np.stack([
+        np.cross(m[:, 0], m[:, 1]),
+        np.cross(m[:, 0], m[:, 2]),
+        np.cross(m[:, 1], m[:, 2])], axis=1)
+    norms = np.einsum("ijk,ijk->ij", crosses, crosses)
+    best = norms.argmax(1)
+    idx = np.arange(len(cov))
+
+    vectors = crosses[idx, best]
+    norm = np.sqrt(norms[idx, best])
+    scale = np.einsum("ijk,ijk->i", m, m)
+    ill_conditioned = norm <= 1e-6 * scale
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vectors /= norm[:, None]
+    return vectors, ill_conditioned
+
+
+def eigh3D(cov):
+    """Eigen decomposition of (N, 3, 3) symmetric matrices, sorted from largest
+    to smallest eigenvalue.
+
+    Uses the closed-form trigonometric solution and cross products of the rows
+    of A - eI, falling back to np.linalg.eigh for the matrices with (nearly)
+    repeated eigenvalues. Eigenvalues below the numerical precision of the
+    largest one are set to exactly 0.
+
+    Parameters
+    ----------
+    cov: (N, 3, 3) ndarray
+        Symmetric matrices, i.e. covariances from cov3D.
+
+    Returns
+    -------
+    eigenvalues: (N, 3) float64 ndarray
+    eigenvectors: (N, 3, 3) float64 ndarray
+        eigenvectors[:, :, i] is the unit eigenvector of eigenvalues[:, i].
+        They form a right-handed orthonormal basis.
+    """
+    cov = np.asarray(cov, dtype=np.float64)
+    eigenvalues, ill_conditioned = _eigvalsh3D(cov)
+
+    v1, ill_v1 = _eigenvector3D(cov, eigenvalues[:, 0])
+    v3, ill_v3 = _eigenvector3D(cov, eigenvalues[:, 2])
+    # enforce orthogonality
+    v1 -= np.einsum("ij,ij->i", v1, v3)[:, None] * v3
+    v1 /= np.linalg.norm(v1, axis=1, keepdims=True)
+    v2 = np.cross(v3, v1)
+
+    eigenvectors = np.stack([v1, v2, v3], axis=2)
+
+    fallback = ill_conditioned | ill_v1 | ill_v3 | ~np.isfinite(eigenvectors).all((1, 2))
+    # matrices with NaN have NaN eigen decomposition
+    fallback &= np.isfinite(cov).all((1, 2))
+    if np.any(fallback):
+        values, vectors = np.linalg.eigh(cov[fallback])
+        eigenvalues[fallback] = values[:, ::-1]
+        eigenvectors[fallback] = vectors[:, :, ::-1]
+
+    return _clean_eigenvalues(eigenvalues), eigenvectors
+
+
+def reduce_segments(values, indptr, ufunc=np.add, empty=0):
+    """Reduce consecutive segments of values, as delimited by a CSR indptr.
+
+    Unlike a bare ufunc.reduceat, empty segments are supported.
+
+    Parameters
+    ----------
+    values: (M, ...) ndarray
+        Values to be reduced along the first axis.
+    indptr: (S + 1,) ndarray
+        Segment i spans values[indptr[i]:indptr[i + 1]].
+    ufunc: numpy.ufunc, optional
+        Default: np.add
+    empty: scalar, optional
+        Default: 0
+        Value assigned to empty segments.
+
+    Returns
+    -------
+    reduced: (S, ...) ndarray
+    """
+    values = np.asarray(values)
+    indptr = np.asarray(indptr)
+    non_empty = indptr[1:] > indptr[:-1]
+
+    out = np.full((len(indptr) - 1,) + values.shape[1:], empty, dtype=values.dtype)
+    if np.any(non_empty):
+        out[non_empty] = ufunc.reduceat(values, indptr[:-1][non_empty], axis=0)
+    return out
+
+
+def expand_ranges(start, end):
+    """Concatenate np.arange(start[i], end[i]) for every i, without Python loops.
+
+    Parameters
+    ----------
+    start, end: (S,) int ndarray
+
+    Returns
+    -------
+    expanded: (sum(end - start),) int64 ndarray
+    """
+    counts = np.asarray(end, dtype=np.int64) - start
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(counts.sum()) - first + np.repeat(np.asarray(start, dtype=np.int64), counts)
+
+
+#: bits per axis of the 63-bit Morton codes
+MORTON_BITS = 21
+
+
+def _spread_bits(x):
+    """Insert two zero bits between each of the lower 21 bits of x."""
+    x = x.astype(np.uint64) & np.uint64(0x1fffff)
+    x = (x | x << np.uint64(32)) & np.uint64(0x1f00000000ffff)
+    x = (x | x << np.uint64(16)) & np.uint64(0x1f0000ff0000ff)
+    x = (x | x << np.uint64(8)) & np.uint64(0x100f00f00f00f00f)
+    x = (x | x << np.uint64(4)) & np.uint64(0x10c30c30c30c30c3)
+    x = (x | x << np.uint64(2)) & np.uint64(0x1249249249249249)
+    return x
+
+
+def morton_encode(ijk):
+    """Interleave the bits of integer coordinates into Morton (Z-order) codes.
+
+    Bit 3 * b of each code is bit b of the x coordinate, followed by y and z,
+    so the 3 bits of each level of an octree read as x + 2 * y + 4 * z.
+
+    Parameters
+    ----------
+    ijk: (N, 3) int ndarray
+        Non negative coordinates below 2 ** MORTON_BITS.
+
+    Returns
+    -------
+    codes: (N,) uint64 ndarray
+    """
+    x = _spread_bits(ijk[:, 0])
+    y = _spread_bits(ijk[:, 1]) << np.uint64(1)
+    z = _spread_bits(ijk[:, 2]) << np.uint64(2)
+    return x | y | z
+
+
+def hilbert_encode(ijk, bits=MORTON_BITS):
+    """Position of integer coordinates along a 3D Hilbert curve.
+
+    Skilling's transform ("Programming the Hilbert curve", 2004), vectorized
+    over the points, followed by Morton interleaving of the transposed bits.
+    Consecutive positions are always adjacent cells.
+
+    Parameters
+    ----------
+    ijk: (N, 3) int ndarray
+        Non negative coordinates below 2 ** bits.
+    bits: int, optional
+        Default: MORTON_BITS
+        Bits per axis, at most MORTON_BITS.
+
+    Returns
+    -------
+    codes: (N,) uint64 ndarray
+    """
+    x = ijk.astype(np.uint64)
+    q = 1 << (bits - 1)
+    while q > 1:
+        p = np.uint64(q - 1)
+        for i in range(3):
+            upper = (x[:, i] & np.uint64(q)) != 0
+            # invert the lower bits of x or exchange them with axis i
+            x[upper, 0] ^= p
+            t = (x[~upper, 0] ^ x[~upper, i]) & p
+            x[~upper, 0] ^= t
+            x[~upper, i] ^= t
+        q >>= 1
+
+    # Gray encode
+    x[:, 1] ^= x[:, 0]
+    x[:, 2] ^= x[:, 1]
+    t = np.zeros(len(x), dtype=np.uint64)
+    q = 1 << (bits - 1)
+    while q > 1:
+        t[(x[:, 2] & np.uint64(q)) != 0] ^= np.uint64(q - 1)
+        q >>= 1
+    x ^= t[:, None]
+
+    # the first axis holds the most significant bit of each level
+    return morton_encode(x[:, ::-1])
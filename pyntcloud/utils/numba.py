@@ -1,23 +1,62 @@
-from numba import jit
+import numpy as np
+from numba import njit, prange
 
 
-@jit
-def groupby_count(xyz, indices, out):
-    for i in range(xyz.shape[0]):
-        out[indices[i]] += 1
-    return out
+@njit
+def _voxel_index(value, segments):
+    n = segments.shape[0] - 1
+    step = (segments[n] - segments[0]) / n
+    if step == 0:
+        return 0
+    j = min(max(int(np.ceil((value - segments[0]) / step)), 1), n) - 1
+    # one step of correction against float rounding keeps the cells right-closed
+    if j > 0 and value <= segments[j]:
+        j -= 1
+    elif j < n - 1 and value > segments[j + 1]:
+        j += 1
+    return j
 
 
-@jit
-def groupby_sum(xyz, indices, N, out):
-    for i in range(xyz.shape[0]):
-        out[indices[i]] += xyz[i][N]
-    return out
+@njit(parallel=True)
+def voxelize(points, segments_x, segments_y, segments_z, ijk, voxel_n):
+    n_y = segments_y.shape[0] - 1
+    n_z = segments_z.shape[0] - 1
+    for i in prange(points.shape[0]):
+        x = _voxel_index(points[i, 0], segments_x)
+        y = _voxel_index(points[i, 1], segments_y)
+        z = _voxel_index(points[i, 2], segments_z)
+        ijk[0, i] = x
+        ijk[1, i] = y
+        ijk[2, i] = z
+        voxel_n[i] = (np.int64(x) * n_y + y) * n_z + z
+    return ijk, voxel_n
+
 
+@njit(parallel=True)
+def aggregate_sorted(values, order, start, counts, fields, reductions, out):
+    """Reduce values[fields[c]] over each group of order into out[:, c].
 
-@jit
-def groupby_max(xyz, indices, N, out):
-    for i in range(xyz.shape[0]):
-        if xyz[i][N] > out[indices[i]]:
-            out[indices[i]] = xyz[i][N]
+    Group g holds the points order[start[g]:start[g] + counts[g]].
+    reductions: 0 sum, 1 mean, 2 min, 3 max.
+    """
+    for g in prange(start.shape[0]):
+        first = start[g]
+        last = first + counts[g]
+        for c in range(fields.shape[0]):
+            f = fields[c]
+            r = reductions[c]
+            acc = values[f, order[first]]
+            for p in range(first + 1, last):
+                x = values[f, order[p]]
+                if r == 2:
+                    if x < acc:
+                        acc = x
+                elif r == 3:
+                    if x > acc:
+                        acc = x
+                else:
+                    acc += x
+            if r == 1:
+                acc /= counts[g]
+            out[g, c] = acc
     return out
@@ -0,0 +1,89 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+
+import pyntcloud.core_class
+from pyntcloud import PyntCloud
+
+
+@pytest.mark.usefixtures("simple_pyntcloud")
+def test_get_neighbors_r_as_csr(simple_pyntcloud):
+    expected = simple_pyntcloud.get_neighbors(r=0.2)
+    indptr, indices = simple_pyntcloud.get_neighbors(r=0.2, as_csr=True)
+
+    assert np.all(np.diff(indptr) == [len(x) for x in expected])
+    for i, neighbors in enumerate(expected):
+        assert sorted(indices[indptr[i]:indptr[i + 1]]) == sorted(neighbors)
+
+
+@pytest.mark.usefixtures("simple_pyntcloud")
+def test_get_neighbors_r_with_hashgrid(simple_pyntcloud):
+    expected = simple_pyntcloud.get_neighbors(r=0.2)
+    hashgrid_id = simple_pyntcloud.add_structure("hashgrid", size=0.2)
+
+    neighbors = simple_pyntcloud.get_neighbors(r=0.2, hashgrid=hashgrid_id)
+    indptr, indices = simple_pyntcloud.get_neighbors(r=0.2, hashgrid=hashgrid_id, as_csr=True)
+
+    for i in range(len(expected)):
+        assert sorted(neighbors[i]) == sorted(expected[i])
+        assert sorted(indices[indptr[i]:indptr[i + 1]]) == sorted(expected[i])
+
+
+@pytest.mark.usefixtures("pyntcloud_with_rgb_and_normals")
+def test_get_neighbors_k_with_hashgrid_requires_r(pyntcloud_with_rgb_and_normals):
+    cloud = pyntcloud_with_rgb_and_normals
+    hashgrid_id = cloud.add_structure("hashgrid", size=0.2)
+    expected = cloud.get_neighbors(k=3)
+
+    with pytest.raises(ValueError):
+        cloud.get_neighbors(k=3, hashgrid=hashgrid_id)
+
+    neighbors = cloud.get_neighbors(k=3, r=0.5, hashgrid=hashgrid_id)
+    np.testing.assert_array_equal(neighbors, expected)
+
+
+@pytest.mark.usefixtures("pyntcloud_with_rgb_and_normals")
+def test_get_neighbors_approximate_k(pyntcloud_with_rgb_and_normals):
+    cloud = pyntcloud_with_rgb_and_normals
+    exact = cloud.get_neighbors(k=8)
+    approximate = cloud.get_neighbors(k=8, approximate=True, recall=0.8)
+
+    assert approximate.shape == exact.shape
+    hits = (approximate[:, :, None] == exact[:, None, :]).any(1).mean()
+    assert hits > 0.7
+
+
+def test_get_neighbors_k_with_hashgrid_excludes_self_with_duplicates():
+    xyz = np.array([[0, 0, 0], [0, 0, 0], [0, 0, 0], [0.1, 0, 0], [0.3, 0, 0]], dtype=np.float32)
+    cloud = PyntCloud(pd.DataFrame(xyz, columns=["x", "y", "z"]))
+    hashgrid_id = cloud.add_structure("hashgrid", size=0.5)
+
+    neighbors = cloud.get_neighbors(k=2, r=0.5, hashgrid=hashgrid_id)
+
+    assert np.all(neighbors != np.arange(len(xyz))[:, None])
+    assert sorted(neighbors[0]) == [1, 2]
+    assert sorted(neighbors[1]) == [0, 2]
+    assert sorted(neighbors[2]) == [0, 1]
+
+
+@pytest.mark.usefixtures("pyntcloud_with_rgb_and_normals")
+def test_get_neighbors_approximate_k_calibrates_once_per_kdtree(pyntcloud_with_rgb_and_normals, monkeypatch):
+    cloud = pyntcloud_with_rgb_and_normals
+    kdtree_id = cloud.add_structure("kdtree")
+    calls = []
+
+    def calibrate_eps(kdtree, k, recall):
+        calls.append((k, recall))
+        return 0.5
+    monkeypatch.setattr(pyntcloud.core_class, "calibrate_eps", calibrate_eps)
+
+    first = cloud.get_neighbors(k=8, kdtree=kdtree_id, approximate=True, recall=0.8)
+    second = cloud.get_neighbors(k=8, kdtree=kdtree_id, approximate=True, recall=0.8)
+    np.testing.assert_array_equal(first, second)
+    assert calls == [(8, 0.8)]
+    assert cloud.structures[kdtree_id].calibrated_eps == {(8, 0.8): 0.5}
+
+    explicit = cloud.get_neighbors(k=8, kdtree=kdtree_id, eps=0.5)
+    np.testing.assert_array_equal(explicit, first)
+    assert calls == [(8, 0.8)]
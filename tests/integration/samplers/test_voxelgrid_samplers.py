@@ -1,5 +1,6 @@
 import pytest
 
+from numpy.testing import assert_array_almost_equal
 from pandas import DataFrame
 
 from pyntcloud import PyntCloud
@@ -140,3 +141,19 @@ def test_voxelgrid_highest_expected_values(simple_pyntcloud, size_x, expected_n,
     assert len(sample) == expected_n
     assert point_in_array_2D(expected_in, sample.loc[:, ["x", "y", "z"]].values)
     assert not point_in_array_2D(expected_not_in, sample.loc[:, ["x", "y", "z"]].values)
+
+
+@pytest.mark.parametrize("sampling_method", [
+    "voxelgrid_centers",
+    "voxelgrid_centroids",
+    "voxelgrid_nearest",
+    "voxelgrid_highest"
+])
+@pytest.mark.usefixtures("simple_pyntcloud")
+def test_voxelgrid_sampling_sparse_matches_dense(simple_pyntcloud, sampling_method):
+    dense_id = simple_pyntcloud.add_structure("voxelgrid", n_x=2, n_y=2, n_z=2)
+    sparse_id = simple_pyntcloud.add_structure("voxelgrid", n_x=2, n_y=2, n_z=2, sparse=True)
+
+    dense = simple_pyntcloud.get_sample(sampling_method, voxelgrid_id=dense_id)
+    sparse = simple_pyntcloud.get_sample(sampling_method, voxelgrid_id=sparse_id)
+    assert_array_almost_equal(sparse.loc[:, ["x", "y", "z"]].values, dense.loc[:, ["x", "y", "z"]].values)
@@ -70,3 +70,68 @@ def test_normals_bounds(pyntcloud_with_rgb_and_normals, pyntcloud_with_rgb_and_n
     for x in scalar_fields:
         assert all(pyntcloud_with_rgb_and_normals.points[x] >= -1)
         assert all(pyntcloud_with_rgb_and_normals.points[x] <= 1)
+
+
+@pytest.mark.usefixtures("plane_pyntcloud", "plane_k_neighbors")
+def test_eigen_features_subset(plane_pyntcloud, plane_k_neighbors):
+    kdtree_id = plane_pyntcloud.add_structure("kdtree")
+    scalar_fields = plane_pyntcloud.add_scalar_field(
+        "eigen_features",
+        k_neighbors=plane_k_neighbors,
+        features=["planarity", "curvature"])
+
+    assert scalar_fields == ["planarity(3)", "curvature(3)"]
+    assert kdtree_id in plane_pyntcloud.structures
+    assert plane_pyntcloud.points["curvature(3)"][2] == 0
+    assert plane_pyntcloud.points["planarity(3)"][2] > 0
+
+
+@pytest.mark.usefixtures("plane_pyntcloud", "plane_k_neighbors")
+def test_multiscale_eigen_features_suffixes_each_scale(plane_pyntcloud, plane_k_neighbors):
+    scalar_fields = plane_pyntcloud.add_scalar_field(
+        "multiscale_eigen_features",
+        k_neighbors=plane_k_neighbors,
+        ks=[1, 2],
+        features=["curvature"])
+
+    assert scalar_fields == ["curvature(2)", "curvature(3)"]
+    assert plane_pyntcloud.points["curvature(3)"][2] == 0
+
+
+@pytest.mark.usefixtures("pyntcloud_with_rgb_and_normals")
+def test_eigen_values_with_r_neighbors(pyntcloud_with_rgb_and_normals):
+    cloud = pyntcloud_with_rgb_and_normals
+    r_neighbors = cloud.get_neighbors(r=0.5, as_csr=True)
+    scalar_fields = cloud.add_scalar_field("eigen_values", r_neighbors=r_neighbors, r=0.5, min_neighbors=4)
+
+    assert scalar_fields == ["e1(r=0.5)", "e2(r=0.5)", "e3(r=0.5)"]
+    counts = np.diff(r_neighbors[0])
+    assert np.all(np.isnan(cloud.points["e1(r=0.5)"].values[counts < 4]))
+    assert np.all(cloud.points["e1(r=0.5)"].values[counts >= 4] >= 0)
+
+
+@pytest.mark.usefixtures("plane_pyntcloud", "plane_k_neighbors")
+def test_oriented_normals_face_viewpoint(plane_pyntcloud, plane_k_neighbors):
+    scalar_fields = plane_pyntcloud.add_scalar_field(
+        "oriented_normals",
+        k_neighbors=plane_k_neighbors,
+        viewpoint=(0, 0, -10))
+
+    assert scalar_fields == ["nx(3)", "ny(3)", "nz(3)"]
+    assert all(plane_pyntcloud.points["nz(3)"] < 0)
+
+
+@pytest.mark.usefixtures("pyntcloud_with_rgb_and_normals", "pyntcloud_with_rgb_and_normals_k_neighbors")
+def test_eigen_decomposition_downcasts_to_dtype(
+        pyntcloud_with_rgb_and_normals,
+        pyntcloud_with_rgb_and_normals_k_neighbors):
+    cloud = pyntcloud_with_rgb_and_normals
+    cloud.points = cloud.points.astype({"x": np.float64, "y": np.float64, "z": np.float64})
+    scalar_fields = cloud.add_scalar_field(
+        "eigen_decomposition",
+        k_neighbors=pyntcloud_with_rgb_and_normals_k_neighbors,
+        dtype=np.float32)
+
+    assert len(scalar_fields) == 12
+    assert all(cloud.points[x].dtype == np.float32 for x in scalar_fields)
+    assert cloud.points["x"].dtype == np.float64
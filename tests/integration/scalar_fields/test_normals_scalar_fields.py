@@ -1,6 +1,9 @@
 import pytest
 
 import numpy as np
+import pandas as pd
+
+from pyntcloud import PyntCloud
 
 
 @pytest.mark.parametrize("scalar_field_name, min_val, max_val", [
@@ -35,3 +38,20 @@ def test_normal_scalar_fields_bounds(pyntcloud_with_rgb_and_normals, scalar_fiel
     assert all(scalar_field_values >= min_val)
     assert all(scalar_field_values <= max_val)
 
+
+def test_region_growing_uses_computed_normals():
+    a, b = np.meshgrid(np.linspace(0, 1, 20), np.linspace(0, 1, 20))
+    a, b = a.ravel(), b.ravel()
+    xyz = np.r_[
+        np.c_[a, b, np.zeros(400)],
+        np.c_[np.zeros(380), a[20:], b[20:]]]
+    cloud = PyntCloud(pd.DataFrame(xyz.astype(np.float32), columns=["x", "y", "z"]))
+    k_neighbors = cloud.get_neighbors(k=10)
+    cloud.add_scalar_field("normals", k_neighbors=k_neighbors)
+    curvature = cloud.add_scalar_field("eigen_features", k_neighbors=k_neighbors, features=["curvature"])
+
+    regions = cloud.add_scalar_field(
+        "region_growing", k_neighbors=k_neighbors, curvature=curvature, min_size=10)
+
+    regions = cloud.points[regions].values
+    assert len(np.unique(regions[regions >= 0])) == 2
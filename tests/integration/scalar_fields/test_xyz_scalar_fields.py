@@ -69,3 +69,15 @@ def test_cylindrical_coords_bounds(pyntcloud_with_rgb_and_normals):
     assert all(pyntcloud_with_rgb_and_normals.points["angular_cylindrical"] >= - (np.pi / 2))
     assert all(pyntcloud_with_rgb_and_normals.points["angular_cylindrical"] <= (np.pi * 1.5))
 
+
+@pytest.mark.usefixtures("pyntcloud_with_clusters_and_voxelgrid_id")
+def test_euclidean_clusters_points_with_hashgrid(pyntcloud_with_clusters_and_voxelgrid_id):
+    cloud = pyntcloud_with_clusters_and_voxelgrid_id[0]
+    hashgrid = cloud.add_structure("hashgrid", size=2)
+    scalar_fields = cloud.add_scalar_field("euclidean_clusters_points", eps=2, hashgrid=hashgrid, sizes=True)
+    assert scalar_fields == ["clusters(2,1)", "cluster_size(2,1)"]
+    clusters = cloud.points["clusters(2,1)"].values
+    assert len(set(clusters[:5])) == 1
+    assert len(set(clusters[5:])) == 1
+    assert clusters[0] != clusters[5]
+    assert all(cloud.points["cluster_size(2,1)"] == 5)
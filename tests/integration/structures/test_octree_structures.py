@@ -0,0 +1,10 @@
+import numpy as np
+
+
+def test_add_octree_structure(pyntcloud_with_rgb_and_normals):
+    octree_id = pyntcloud_with_rgb_and_normals.add_structure("octree", max_level=3)
+    assert octree_id == "O(3)"
+    assert pyntcloud_with_rgb_and_normals.structures.n_octrees == 1
+    octree = pyntcloud_with_rgb_and_normals.structures[octree_id]
+    assert np.all(octree.get_counts(3) > 0)
+    assert octree.get_centroids(3).shape == (len(octree.node_codes[3]), 3)
@@ -0,0 +1,31 @@
+import pytest
+
+import numpy as np
+
+
+def test_add_voxel_accumulator_structure_and_frames(pyntcloud_with_rgb_and_normals):
+    cloud = pyntcloud_with_rgb_and_normals
+    accumulator_id = cloud.add_structure("voxel_accumulator", size=0.25, max_frames=2)
+    assert accumulator_id.startswith("VA")
+    assert cloud.structures.n_voxel_accumulators == 1
+    assert cloud.structures.n_voxelgrids == 0
+
+    accumulator = cloud.structures[accumulator_id]
+    accumulator.add_points(cloud.xyz + 0.1)
+    ijk, density = accumulator.get_feature_vector(mode="density")
+    assert ijk.shape == (len(density), 3)
+    np.testing.assert_allclose(density.sum(), 1)
+
+    centers = cloud.get_sample("voxelgrid_centers", voxelgrid_id=accumulator_id)
+    centroids = cloud.get_sample("voxelgrid_centroids", voxelgrid_id=accumulator_id)
+    assert len(centers) == len(centroids) == len(accumulator.voxel_keys)
+    # each centroid lies inside the voxel of its center
+    assert np.all(np.abs(centroids.values - centers.values) <= 0.125 + 1e-6)
+
+
+@pytest.mark.parametrize("sampling_method", ["voxelgrid_nearest", "voxelgrid_highest"])
+def test_voxel_accumulator_rejects_per_point_samplers(pyntcloud_with_rgb_and_normals, sampling_method):
+    cloud = pyntcloud_with_rgb_and_normals
+    accumulator_id = cloud.add_structure("voxel_accumulator", size=0.25)
+    with pytest.raises(TypeError):
+        cloud.get_sample(sampling_method, voxelgrid_id=accumulator_id)
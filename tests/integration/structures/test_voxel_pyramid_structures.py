@@ -0,0 +1,18 @@
+def test_add_voxel_pyramid_structure_and_sample_levels(pyntcloud_with_rgb_and_normals):
+    cloud = pyntcloud_with_rgb_and_normals
+    pyramid_id = cloud.add_structure("voxel_pyramid", max_level=4, n_levels=3)
+    assert pyramid_id == "VP(4,3,False)"
+    assert cloud.structures.n_voxel_pyramids == 1
+    assert cloud.structures.n_voxelgrids == 3
+
+    pyramid = cloud.structures[pyramid_id]
+    n_samples = []
+    for level in [2, 3, 4]:
+        voxelgrid = pyramid.get_level(level)
+        assert cloud.structures[voxelgrid.id] is voxelgrid
+        sample = cloud.get_sample("voxelgrid_centroids", voxelgrid_id=voxelgrid.id)
+        assert len(sample) == len(voxelgrid.voxel_keys)
+        n_samples.append(len(sample))
+        voxel_n = cloud.add_scalar_field("voxel_n", voxelgrid_id=voxelgrid.id)
+        assert cloud.points[voxel_n].max() < 8 ** level
+    assert n_samples == sorted(n_samples)
@@ -73,3 +73,33 @@ def test_regular_bounding_box_changes_the_shape_of_the_bounding_box(x, y, z):
     regular_last_centroid = voxelgrid.voxel_centers[-1]
 
     assert np.all(irregular_last_centroid <= regular_last_centroid)
+
+
+def test_TDF_reuses_kdtree_from_structures(pyntcloud_with_rgb_and_normals):
+    cloud = pyntcloud_with_rgb_and_normals
+    kdtree_id = cloud.add_structure("kdtree")
+    voxelgrid_id = cloud.add_structure("voxelgrid", n_x=8, n_y=8, n_z=8)
+    voxelgrid = cloud.structures[voxelgrid_id]
+
+    feature_vector = voxelgrid.get_feature_vector(mode="TDF", kdtree=cloud.structures[kdtree_id])
+    assert feature_vector.shape == (8, 8, 8)
+    assert feature_vector.min() >= 0
+    assert feature_vector.max() <= 1
+    np.testing.assert_array_equal(feature_vector, voxelgrid.get_feature_vector(mode="TDF"))
+
+
+def test_TDF_from_cloud_reuses_kdtree(pyntcloud_with_rgb_and_normals, monkeypatch):
+    cloud = pyntcloud_with_rgb_and_normals
+    voxelgrid_id = cloud.add_structure("voxelgrid", n_x=8, n_y=8, n_z=8)
+    expected = cloud.structures[voxelgrid_id].get_feature_vector(mode="TDF")
+
+    cloud.add_structure("kdtree")
+
+    def fail(points):
+        raise AssertionError("a new KDTree was built")
+
+    monkeypatch.setattr("pyntcloud.structures.voxelgrid.cKDTree", fail)
+    np.testing.assert_array_equal(cloud.get_feature_vector(voxelgrid_id, mode="TDF"), expected)
+    np.testing.assert_array_equal(
+        cloud.get_feature_vector(voxelgrid_id, mode="binary"),
+        cloud.structures[voxelgrid_id].get_feature_vector(mode="binary"))
@@ -94,3 +94,69 @@ def test_split_on():
     assert len(output) == 8
 
     rmtree("tmp_out")
+
+
+def test_transfer_fields():
+    """PyntCloud.transfer_fields.
+
+    - Transferred columns must be added to target points
+    - k=1 must keep source dtype
+    - Source KDTree must be reused if present
+    - k larger than the source must raise ValueError
+
+    """
+    source = PyntCloud(pd.DataFrame({
+        "x": np.array([0, 1, 3], dtype=np.float32),
+        "y": np.zeros(3, dtype=np.float32),
+        "z": np.zeros(3, dtype=np.float32),
+        "label": np.array([1, 2, 3], dtype=np.uint8),
+        "intensity": np.array([10., 20., 30.], dtype=np.float32)}))
+    target = PyntCloud(pd.DataFrame(
+        np.array([[0.1, 0, 0], [2.9, 0, 0]], dtype=np.float32),
+        columns=["x", "y", "z"]))
+
+    kdtree_id = source.add_structure("kdtree")
+
+    added = target.transfer_fields(source, ["label", "intensity"])
+
+    assert added == ["label", "intensity"]
+    assert target.points["label"].dtype == np.uint8
+    assert np.all(target.points["label"] == [1, 3])
+    assert len(source.structures) == 1
+
+    target.transfer_fields(source, ["intensity"], k=2, kdtree=kdtree_id)
+
+    assert np.allclose(target.points["intensity"], [15, 25])
+
+    with pytest.raises(ValueError):
+        target.transfer_fields(source, ["intensity"], k=4)
+
+
+@pytest.mark.parametrize("method", ["morton", "hilbert"])
+def test_reorder(method):
+    """PyntCloud.reorder.
+
+    - Points must be sorted along the curve, keeping their columns
+    - Mesh must reference the same vertices after reordering
+    - method="original" must restore the original order
+
+    """
+    xyz = np.array([[1, 1, 1], [0, 0, 0], [1, 0, 0], [0, 1, 1]], dtype=np.float32)
+    points = pd.DataFrame(xyz, columns=["x", "y", "z"])
+    points["label"] = np.arange(4)
+    mesh = pd.DataFrame({"v1": [0, 1], "v2": [1, 2], "v3": [2, 3]})
+    cloud = PyntCloud(points, mesh=mesh)
+    faces = cloud.xyz[mesh.values]
+
+    permutation = cloud.reorder(method=method)
+
+    assert np.all(cloud.points["label"] == permutation)
+    assert cloud.points.loc[0, "label"] == 1
+    assert np.all(cloud.original_order == permutation)
+    np.testing.assert_array_equal(cloud.xyz[cloud.mesh[["v1", "v2", "v3"]].values], faces)
+
+    cloud.reorder(method="original")
+
+    np.testing.assert_array_equal(cloud.xyz, xyz)
+    np.testing.assert_array_equal(cloud.mesh.values, mesh.values)
+    assert cloud.original_order is None
@@ -0,0 +1,98 @@
+import pytest
+
+import numpy as np
+
+from pyntcloud.neighbors import (
+    calibrate_eps,
+    exclude_self,
+    interpolate_k_neighbors,
+    iter_k_neighbors,
+    k_neighbors,
+    neighbors_recall
+)
+from pyntcloud.structures import KDTree
+
+
+@pytest.mark.parametrize("max_memory", [1, 100, 2 ** 20])
+@pytest.mark.usefixtures("pyntcloud_with_kdtree_and_kdtree_id")
+def test_k_neighbors_is_independent_of_max_memory(pyntcloud_with_kdtree_and_kdtree_id, max_memory):
+    cloud, kdtree_id = pyntcloud_with_kdtree_and_kdtree_id
+    kdtree = cloud.structures[kdtree_id]
+    expected = kdtree.query(kdtree.data, k=3)[1][:, 1:]
+
+    result = k_neighbors(kdtree, 2, max_memory=max_memory)
+
+    assert result.dtype == np.int32
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.usefixtures("pyntcloud_with_kdtree_and_kdtree_id")
+def test_iter_k_neighbors_blocks_cover_all_points(pyntcloud_with_kdtree_and_kdtree_id):
+    cloud, kdtree_id = pyntcloud_with_kdtree_and_kdtree_id
+    kdtree = cloud.structures[kdtree_id]
+    expected_distances = kdtree.query(kdtree.data, k=3)[0][:, 1:]
+
+    stops = []
+    for start, stop, indices, distances in iter_k_neighbors(kdtree, 2, max_memory=200, return_distances=True):
+        assert indices.shape == (stop - start, 2)
+        assert distances.dtype == np.float32
+        np.testing.assert_allclose(distances, expected_distances[start:stop], rtol=1e-6)
+        stops.append(stop)
+
+    assert len(stops) > 1
+    assert stops[-1] == len(cloud.xyz)
+
+
+def test_neighbors_recall():
+    exact = np.array([[1, 2], [0, 2], [0, 1]])
+    approximate = np.array([[2, 1], [0, 3], [3, 4]])
+    assert neighbors_recall(exact, exact) == 1
+    assert neighbors_recall(approximate, exact) == 0.5
+
+
+@pytest.mark.parametrize("recall", [0.5, 0.9, 1])
+@pytest.mark.usefixtures("pyntcloud_with_rgb_and_normals")
+def test_calibrate_eps_reaches_recall(pyntcloud_with_rgb_and_normals, recall):
+    cloud = pyntcloud_with_rgb_and_normals
+    kdtree = cloud.structures[cloud.add_structure("kdtree")]
+    exact = k_neighbors(kdtree, 8)
+
+    eps = calibrate_eps(kdtree, 8, recall, n_samples=len(cloud.xyz), random_state=0)
+
+    assert neighbors_recall(k_neighbors(kdtree, 8, eps=eps), exact) >= recall
+
+
+@pytest.mark.parametrize("k, weighting, expected", [
+    (1, "uniform", [10, 30]),
+    (2, "uniform", [15, 25]),
+    (2, "distance", [10, 28]),
+])
+def test_interpolate_k_neighbors(k, weighting, expected):
+    kdtree = KDTree(points=np.array([[0, 0, 0], [1, 0, 0], [3, 0, 0]], dtype=np.float32))
+    kdtree.compute()
+    values = np.array([10, 20, 30], dtype=np.uint8)
+    points = np.array([[0, 0, 0], [2.6, 0, 0]])
+
+    result, = interpolate_k_neighbors(kdtree, points, [values], k=k, weighting=weighting, max_memory=1)
+
+    if k == 1:
+        assert result.dtype == np.uint8
+    np.testing.assert_allclose(result, expected)
+
+
+def test_interpolate_k_neighbors_raises_if_k_exceeds_points():
+    kdtree = KDTree(points=np.array([[0, 0, 0], [1, 0, 0]], dtype=np.float32))
+    kdtree.compute()
+    with pytest.raises(ValueError):
+        interpolate_k_neighbors(kdtree, np.zeros((1, 3)), [np.array([10, 20])], k=3)
+
+
+def test_exclude_self_removes_point_by_index():
+    indices = np.array([
+        [1, 0, 2],
+        [1, 0, 2],
+        [0, 1, 3],
+        [4, 5, 6]])
+    np.testing.assert_array_equal(
+        exclude_self(indices, start=0),
+        [[1, 2], [0, 2], [0, 1], [4, 5]])
@@ -0,0 +1,35 @@
+import pytest
+
+import numpy as np
+
+from pyntcloud.neighbors import r_neighbors, r_neighbors_csr
+
+
+@pytest.mark.parametrize("r", [0.1, 0.2, 0.5, 2])
+@pytest.mark.usefixtures("pyntcloud_with_kdtree_and_kdtree_id")
+def test_r_neighbors_csr_matches_r_neighbors(pyntcloud_with_kdtree_and_kdtree_id, r):
+    cloud, kdtree_id = pyntcloud_with_kdtree_and_kdtree_id
+    kdtree = cloud.structures[kdtree_id]
+    expected = r_neighbors(kdtree, r)
+
+    indptr, indices = r_neighbors_csr(kdtree, r, chunk_size=4)
+
+    assert indptr.dtype == np.int32
+    assert indices.dtype == np.int32
+    assert len(indptr) == len(expected) + 1
+    for i, neighbors in enumerate(expected):
+        assert sorted(indices[indptr[i]:indptr[i + 1]]) == sorted(neighbors)
+
+
+@pytest.mark.usefixtures("pyntcloud_with_kdtree_and_kdtree_id")
+def test_r_neighbors_csr_distances(pyntcloud_with_kdtree_and_kdtree_id):
+    cloud, kdtree_id = pyntcloud_with_kdtree_and_kdtree_id
+    kdtree = cloud.structures[kdtree_id]
+
+    indptr, indices, distances = r_neighbors_csr(kdtree, 0.5, return_distances=True)
+
+    assert distances.dtype == np.float32
+    assert np.all(distances <= 0.5)
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    expected = np.linalg.norm(cloud.xyz[indices] - cloud.xyz[rows], axis=1)
+    np.testing.assert_allclose(distances, expected, rtol=1e-5)
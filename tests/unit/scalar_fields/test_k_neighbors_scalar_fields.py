@@ -1,10 +1,15 @@
 import pytest
 
 import numpy as np
+import pandas as pd
 
+from pyntcloud import PyntCloud
 from pyntcloud.scalar_fields.k_neighbors import (
     EigenValues,
     EigenDecomposition,
+    EigenFeatures,
+    MultiscaleEigenFeatures,
+    OrientedNormals,
     UnorientedNormals
 )
 
@@ -12,6 +17,7 @@ from pyntcloud.scalar_fields.k_neighbors import (
 @pytest.mark.parametrize("ScalarField", [
     EigenValues,
     EigenDecomposition,
+    EigenFeatures,
     UnorientedNormals
 ])
 @pytest.mark.usefixtures("plane_pyntcloud", "plane_k_neighbors")
@@ -118,3 +124,159 @@ def test_UnorientedNormals_bounds(pyntcloud_with_rgb_and_normals, pyntcloud_with
     for x in ["nx(4)", "ny(4)", "nz(4)"]:
         assert all(scalar_field.to_be_added[x] >= -1)
         assert all(scalar_field.to_be_added[x] <= 1)
+
+
+@pytest.mark.parametrize("ScalarField", [
+    EigenValues,
+    EigenDecomposition,
+    EigenFeatures,
+    UnorientedNormals
+])
+@pytest.mark.usefixtures("pyntcloud_with_rgb_and_normals", "pyntcloud_with_rgb_and_normals_k_neighbors")
+def test_KNeighborsScalarField_is_independent_of_max_memory(
+        pyntcloud_with_rgb_and_normals, pyntcloud_with_rgb_and_normals_k_neighbors, ScalarField):
+    results = []
+    for max_memory in [1, 2 ** 30]:
+        scalar_field = ScalarField(
+            pyntcloud=pyntcloud_with_rgb_and_normals,
+            k_neighbors=pyntcloud_with_rgb_and_normals_k_neighbors,
+            max_memory=max_memory)
+        scalar_field.extract_info()
+        scalar_field.compute()
+        results.append(scalar_field.to_be_added)
+
+    for name in results[0]:
+        np.testing.assert_array_equal(results[0][name], results[1][name])
+
+
+@pytest.mark.usefixtures("pyntcloud_with_rgb_and_normals", "pyntcloud_with_rgb_and_normals_k_neighbors")
+def test_EigenFeatures_match_EigenValuesScalarFields(
+        pyntcloud_with_rgb_and_normals, pyntcloud_with_rgb_and_normals_k_neighbors):
+    cloud = pyntcloud_with_rgb_and_normals
+    ev = cloud.add_scalar_field("eigen_values", k_neighbors=pyntcloud_with_rgb_and_normals_k_neighbors)
+
+    scalar_field = EigenFeatures(
+        pyntcloud=cloud,
+        k_neighbors=pyntcloud_with_rgb_and_normals_k_neighbors,
+        max_memory=1)
+    scalar_field.extract_info()
+    scalar_field.compute()
+
+    assert len(scalar_field.to_be_added) == 8
+    for name, values in scalar_field.to_be_added.items():
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected = cloud.add_scalar_field(name.split("(")[0], ev=ev)
+        expected = cloud.points[expected].values
+        np.testing.assert_allclose(values, expected, rtol=1e-3, atol=1e-5)
+
+
+def test_EigenFeatures_raises_ValueError_on_unsupported_feature(plane_pyntcloud, plane_k_neighbors):
+    with pytest.raises(ValueError):
+        EigenFeatures(pyntcloud=plane_pyntcloud, k_neighbors=plane_k_neighbors, features=["foo"])
+
+
+@pytest.mark.usefixtures("pyntcloud_with_rgb_and_normals", "pyntcloud_with_rgb_and_normals_k_neighbors")
+def test_MultiscaleEigenFeatures_match_EigenFeatures_of_each_scale(
+        pyntcloud_with_rgb_and_normals, pyntcloud_with_rgb_and_normals_k_neighbors):
+    scalar_field = MultiscaleEigenFeatures(
+        pyntcloud=pyntcloud_with_rgb_and_normals,
+        k_neighbors=pyntcloud_with_rgb_and_normals_k_neighbors,
+        ks=[3, 2],
+        max_memory=1)
+    scalar_field.extract_info()
+    scalar_field.compute()
+
+    assert len(scalar_field.to_be_added) == 16
+    for k in [2, 3]:
+        expected = EigenFeatures(
+            pyntcloud=pyntcloud_with_rgb_and_normals,
+            k_neighbors=pyntcloud_with_rgb_and_normals_k_neighbors[:, :k])
+        expected.extract_info()
+        expected.compute()
+        for name, values in expected.to_be_added.items():
+            np.testing.assert_allclose(scalar_field.to_be_added[name], values, rtol=1e-5, atol=1e-7)
+
+
+@pytest.mark.usefixtures("plane_pyntcloud", "plane_k_neighbors")
+def test_MultiscaleEigenFeatures_raises_ValueError_on_too_large_k(plane_pyntcloud, plane_k_neighbors):
+    with pytest.raises(ValueError):
+        MultiscaleEigenFeatures(pyntcloud=plane_pyntcloud, k_neighbors=plane_k_neighbors, ks=[1, 3])
+
+
+@pytest.mark.parametrize("ScalarField", [
+    EigenValues,
+    EigenDecomposition,
+    EigenFeatures,
+    UnorientedNormals
+])
+@pytest.mark.usefixtures("pyntcloud_with_rgb_and_normals", "pyntcloud_with_rgb_and_normals_k_neighbors")
+def test_KNeighborsScalarField_r_neighbors_match_k_neighbors(
+        pyntcloud_with_rgb_and_normals, pyntcloud_with_rgb_and_normals_k_neighbors, ScalarField):
+    k_neighbors = pyntcloud_with_rgb_and_normals_k_neighbors
+    n, k = k_neighbors.shape
+    # same neighbourhoods in CSR layout, including each point
+    r_neighbors = (np.arange(0, n * (k + 1) + 1, k + 1), np.c_[np.arange(n), k_neighbors].ravel())
+
+    results = []
+    for kwargs in [dict(k_neighbors=k_neighbors), dict(r_neighbors=r_neighbors, r=1, max_memory=1)]:
+        scalar_field = ScalarField(pyntcloud=pyntcloud_with_rgb_and_normals, **kwargs)
+        scalar_field.extract_info()
+        scalar_field.compute()
+        results.append(list(scalar_field.to_be_added.values()))
+
+    for k_result, r_result in zip(*results):
+        np.testing.assert_allclose(np.abs(k_result), np.abs(r_result), rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.usefixtures("plane_pyntcloud")
+def test_KNeighborsScalarField_r_neighbors_below_min_neighbors_are_nan(plane_pyntcloud):
+    n = len(plane_pyntcloud.xyz)
+    # only the point itself
+    r_neighbors = (np.arange(n + 1), np.arange(n))
+    scalar_field = EigenValues(pyntcloud=plane_pyntcloud, r_neighbors=r_neighbors, r=0.1)
+    scalar_field.extract_info()
+    scalar_field.compute()
+
+    assert list(scalar_field.to_be_added) == ["e1(r=0.1)", "e2(r=0.1)", "e3(r=0.1)"]
+    assert np.all(np.isnan(scalar_field.to_be_added["e1(r=0.1)"]))
+
+
+@pytest.mark.usefixtures("plane_pyntcloud", "plane_k_neighbors")
+def test_KNeighborsScalarField_raises_ValueError_without_neighbors(plane_pyntcloud, plane_k_neighbors):
+    with pytest.raises(ValueError):
+        EigenValues(pyntcloud=plane_pyntcloud)
+    with pytest.raises(ValueError):
+        EigenValues(pyntcloud=plane_pyntcloud, r_neighbors=(np.arange(2), np.arange(1)))
+
+
+def fibonacci_sphere_pyntcloud(n=1000):
+    i = np.arange(n) + 0.5
+    phi = np.arccos(1 - 2 * i / n)
+    theta = np.pi * (1 + 5 ** 0.5) * i
+    xyz = np.c_[np.cos(theta) * np.sin(phi), np.sin(theta) * np.sin(phi), np.cos(phi)]
+    return PyntCloud(pd.DataFrame(xyz.astype(np.float32), columns=["x", "y", "z"]))
+
+
+@pytest.mark.parametrize("method, viewpoint, outwards", [
+    ("viewpoint", (0, 0, 0), 0),
+    ("mst", (0, 0, 0), 0),
+    ("mst", (10, 0, 0), 1)
+])
+def test_OrientedNormals_are_consistent_on_sphere(method, viewpoint, outwards):
+    cloud = fibonacci_sphere_pyntcloud()
+    scalar_field = OrientedNormals(
+        pyntcloud=cloud,
+        k_neighbors=cloud.get_neighbors(k=10),
+        method=method,
+        viewpoint=viewpoint)
+    scalar_field.extract_info()
+    scalar_field.compute()
+
+    normals = np.c_[tuple(scalar_field.to_be_added.values())]
+    assert np.mean(np.einsum("ij,ij->i", normals, cloud.xyz) > 0) == outwards
+
+
+@pytest.mark.usefixtures("plane_pyntcloud", "plane_k_neighbors")
+def test_OrientedNormals_raises_ValueError_on_unsupported_method(plane_pyntcloud, plane_k_neighbors):
+    with pytest.raises(ValueError):
+        OrientedNormals(pyntcloud=plane_pyntcloud, k_neighbors=plane_k_neighbors, method="foo")
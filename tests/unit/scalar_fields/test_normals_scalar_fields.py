@@ -1,12 +1,15 @@
 import pytest
 
 import numpy as np
+import pandas as pd
 
+from pyntcloud import PyntCloud
 from pyntcloud.scalar_fields.normals import (
     InclinationDegrees,
     InclinationRadians,
     OrientationDegrees,
-    OrientationRadians
+    OrientationRadians,
+    RegionGrowing
 )
 
 
@@ -44,3 +47,30 @@ def test_NormalsScalarFields_bounds(pyntcloud_with_rgb_and_normals, scalar_field
     assert all(scalar_field_values >= min_val)
     assert all(scalar_field_values <= max_val)
 
+
+def test_RegionGrowing_segments_perpendicular_planes():
+    a, b = np.meshgrid(np.linspace(0, 1, 20), np.linspace(0, 1, 20))
+    a, b = a.ravel(), b.ravel()
+    xyz = np.r_[
+        np.c_[a, b, np.zeros(400)],
+        np.c_[np.zeros(380), a[20:], b[20:]]]
+    cloud = PyntCloud(pd.DataFrame(xyz.astype(np.float32), columns=["x", "y", "z"]))
+    k_neighbors = cloud.get_neighbors(k=10)
+    normals = cloud.add_scalar_field("normals", k_neighbors=k_neighbors)
+    curvature = cloud.add_scalar_field("eigen_features", k_neighbors=k_neighbors, features=["curvature"])
+
+    scalar_field = RegionGrowing(
+        pyntcloud=cloud,
+        k_neighbors=k_neighbors,
+        curvature=curvature,
+        normals=normals,
+        min_size=10)
+    scalar_field.extract_info()
+    scalar_field.compute()
+    regions = scalar_field.to_be_added["regions(10,0.05)"]
+
+    first, second = regions[:400], regions[400:]
+    assert len(np.unique(first[first >= 0])) == 1
+    assert len(np.unique(second[second >= 0])) == 1
+    assert np.unique(first[first >= 0]) != np.unique(second[second >= 0])
+    assert np.mean(regions >= 0) > 0.9
@@ -1,7 +1,9 @@
 import pytest
 
 import numpy as np
+import pandas as pd
 
+from pyntcloud import PyntCloud
 from pyntcloud.scalar_fields.voxelgrid import (
     EuclideanClusters,
     VoxelgridScalarField,
@@ -76,4 +78,40 @@ def test_EuclideanClusters_values(pyntcloud_with_clusters_and_voxelgrid_id):
     with np.errstate(divide='ignore', invalid='ignore'):
         scalar_field.compute()
     scalar_field_values = next(iter(scalar_field.to_be_added.values()))
-    assert all(scalar_field_values[:5] != scalar_field_values[5:])
\ No newline at end of file
+    assert all(scalar_field_values[:5] != scalar_field_values[5:])
+
+
+def test_EuclideanClusters_connects_26_neighbors():
+    xyz = np.array([[0, 0, 0], [1, 1, 1], [2, 2, 2], [2, 2.5, 2], [5, 5, 5], [6, 6, 6], [6, 5, 6]], dtype=float)
+    cloud = PyntCloud(pd.DataFrame(data=xyz, columns=["x", "y", "z"]))
+    voxelgrid_id = cloud.add_structure("voxelgrid", n_x=7, n_y=7, n_z=7)
+    scalar_field = EuclideanClusters(
+        pyntcloud=cloud,
+        voxelgrid_id=voxelgrid_id)
+    scalar_field.extract_info()
+    scalar_field.compute()
+    scalar_field_values = next(iter(scalar_field.to_be_added.values()))
+    assert len(np.unique(scalar_field_values[:4])) == 1
+    assert len(np.unique(scalar_field_values[4:])) == 1
+    assert scalar_field_values[0] != scalar_field_values[4]
+
+
+@pytest.mark.parametrize("connectivity,expected_n_clusters", [
+    (6, 5),
+    (18, 4),
+    (26, 2)
+])
+def test_EuclideanClusters_connectivity(connectivity, expected_n_clusters):
+    xyz = np.array([[0, 0, 0], [1, 1, 1], [2, 2, 2], [2, 2.5, 2], [5, 5, 5], [6, 6, 6], [6, 5, 6]], dtype=float)
+    cloud = PyntCloud(pd.DataFrame(data=xyz, columns=["x", "y", "z"]))
+    voxelgrid_id = cloud.add_structure("voxelgrid", n_x=7, n_y=7, n_z=7)
+    scalar_field = EuclideanClusters(
+        pyntcloud=cloud,
+        voxelgrid_id=voxelgrid_id,
+        connectivity=connectivity)
+    scalar_field.extract_info()
+    scalar_field.compute()
+    scalar_field_values = next(iter(scalar_field.to_be_added.values()))
+    assert len(np.unique(scalar_field_values)) == expected_n_clusters
+    assert scalar_field_values[2] == scalar_field_values[3]
+    assert scalar_field_values[5] == scalar_field_values[6]
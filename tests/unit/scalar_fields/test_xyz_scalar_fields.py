@@ -1,8 +1,11 @@
 import pytest
 
 import numpy as np
+import pandas as pd
 
+from pyntcloud import PyntCloud
 from pyntcloud.scalar_fields.xyz import (
+    EuclideanClustersPoints,
     PlaneFit,
     SphereFit,
     SphericalCoordinates,
@@ -97,3 +100,18 @@ def test_CylindricalCoordinates_bounds(pyntcloud_with_rgb_and_normals):
     assert all(scalar_field.to_be_added["angular_cylindrical"] >= - (np.pi / 2))
     assert all(scalar_field.to_be_added["angular_cylindrical"] <= (np.pi * 1.5))
 
+
+@pytest.mark.parametrize("min_points, expected_clusters, expected_sizes", [
+    (1, [0, 0, 0, 1, 1, 2], [3, 3, 3, 2, 2, 1]),
+    (3, [0, 0, 0, -1, -1, -1], [3, 3, 3, 0, 0, 0]),
+])
+def test_EuclideanClustersPoints_core_border_and_noise(min_points, expected_clusters, expected_sizes):
+    xyz = np.zeros((6, 3), dtype=np.float32)
+    xyz[:, 0] = [0, 0.1, 0.2, 1, 1.1, 5]
+    cloud = PyntCloud(pd.DataFrame(xyz, columns=["x", "y", "z"]))
+    scalar_field = EuclideanClustersPoints(pyntcloud=cloud, eps=0.15, min_points=min_points, sizes=True)
+    scalar_field.extract_info()
+    scalar_field.compute()
+    clusters, sizes = scalar_field.to_be_added.values()
+    np.testing.assert_array_equal(clusters, expected_clusters)
+    np.testing.assert_array_equal(sizes, expected_sizes)
@@ -0,0 +1,63 @@
+import pytest
+
+import numpy as np
+
+from scipy.spatial import cKDTree
+
+from pyntcloud.structures import HashGrid
+
+
+@pytest.fixture()
+def random_xyz():
+    return np.random.RandomState(0).rand(500, 3).astype(np.float32)
+
+
+def test_points_are_sorted_by_cell(random_xyz):
+    hashgrid = HashGrid(points=random_xyz, size=0.2)
+    hashgrid.compute()
+    assert np.all(np.diff(hashgrid.cell_keys) > 0)
+    assert hashgrid.cell_end[-1] == len(random_xyz)
+    for key, start, end in zip(hashgrid.cell_keys, hashgrid.cell_start, hashgrid.cell_end):
+        ijk = hashgrid.get_cell_ijk(random_xyz[hashgrid.order[start:end]])
+        assert np.all(np.ravel_multi_index(ijk.T, hashgrid.dims) == key)
+
+
+@pytest.mark.parametrize("size, r", [
+    (0.1, 0.1),
+    (0.2, 0.1),
+    (0.05, 0.12),
+])
+def test_query_radius_matches_kdtree(random_xyz, size, r):
+    hashgrid = HashGrid(points=random_xyz, size=size, max_memory=2 ** 12)
+    hashgrid.compute()
+    expected = cKDTree(random_xyz).query_ball_point(random_xyz, r)
+
+    indptr, indices, distances = hashgrid.query_radius(random_xyz, r, return_distances=True)
+
+    assert np.all(distances <= r)
+    for i, neighbors in enumerate(expected):
+        assert sorted(indices[indptr[i]:indptr[i + 1]]) == sorted(neighbors)
+
+
+def test_query_knn_matches_kdtree(random_xyz):
+    hashgrid = HashGrid(points=random_xyz, size=0.1)
+    hashgrid.compute()
+    expected_distances, expected_indices = cKDTree(random_xyz).query(
+        random_xyz, k=5, distance_upper_bound=0.1)
+
+    distances, indices = hashgrid.query_knn(random_xyz, 5, 0.1)
+
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-5)
+    np.testing.assert_array_equal(indices[:, 0], np.arange(len(random_xyz)))
+    np.testing.assert_array_equal(indices == len(random_xyz), expected_indices == len(random_xyz))
+
+
+@pytest.mark.parametrize("min_xyz, max_xyz", [
+    ([0.2, 0.2, 0.2], [0.5, 0.6, 0.7]),
+    ([-np.inf, 0.5, -np.inf], [np.inf, np.inf, 0.1]),
+])
+def test_query_box(random_xyz, min_xyz, max_xyz):
+    hashgrid = HashGrid(points=random_xyz, size=0.15)
+    hashgrid.compute()
+    expected = np.where(np.all((random_xyz >= min_xyz) & (random_xyz <= max_xyz), axis=1))[0]
+    assert sorted(hashgrid.query_box(min_xyz, max_xyz)) == list(expected)
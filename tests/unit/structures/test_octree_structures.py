@@ -0,0 +1,71 @@
+import pytest
+
+import numpy as np
+
+from pyntcloud.structures import Octree
+from pyntcloud.utils.array import morton_encode
+
+
+@pytest.fixture()
+def random_xyz():
+    return np.random.RandomState(0).rand(500, 3).astype(np.float32)
+
+
+def test_morton_encode_interleaves_bits():
+    ijk = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1], [3, 0, 0], [2 ** 21 - 1] * 3])
+    np.testing.assert_array_equal(morton_encode(ijk), [1, 2, 4, 9, 2 ** 63 - 1])
+
+
+def test_nodes_are_contiguous_in_sorted_points(random_xyz):
+    octree = Octree(points=random_xyz, max_level=3)
+    octree.compute()
+    for level in range(octree.max_level + 1):
+        codes = octree.get_level_codes(level)
+        assert np.all(np.diff(octree.node_codes[level].astype(np.int64)) > 0)
+        assert octree.get_counts(level).sum() == len(random_xyz)
+        np.testing.assert_array_equal(octree.node_codes[level][octree.get_node_index(level)], codes)
+
+
+def test_level_codes_match_bounding_box_split(random_xyz):
+    octree = Octree(points=random_xyz, max_level=2)
+    octree.compute()
+    mid_point = (octree.xyzmin + octree.xyzmax) / 2
+    bigger = random_xyz > mid_point
+    expected = bigger[:, 0] + 2 * bigger[:, 1] + 4 * bigger[:, 2]
+    np.testing.assert_array_equal(octree.get_level_codes(1), expected)
+    np.testing.assert_array_equal(octree.get_level_as_sf(2) // 10, expected)
+
+
+def test_centroids_are_mean_of_node_points(random_xyz):
+    octree = Octree(points=random_xyz, max_level=2)
+    octree.compute()
+    centroids = octree.get_centroids(2)
+    index = octree.get_node_index(2)
+    for node in range(len(centroids)):
+        np.testing.assert_allclose(centroids[node], random_xyz[index == node].mean(0), rtol=1e-5)
+
+
+def test_max_level_out_of_bounds_raises_ValueError(random_xyz):
+    with pytest.raises(ValueError):
+        Octree(points=random_xyz, max_level=22)
+
+
+def test_eigen_decomposition_falls_back_to_parent_of_small_nodes(random_xyz):
+    octree = Octree(points=random_xyz, max_level=4)
+    octree.compute()
+    e1, e2, e3, ev1, ev2, ev3 = octree.eigen_decomposition(4)
+
+    index = octree.get_node_index(4)
+    parent_index = octree.get_node_index(3)
+    assert np.any(octree.get_counts(4) < 3)
+    for node in np.unique(index):
+        members = index == node
+        if members.sum() < 3:
+            members = parent_index == parent_index[members][0]
+        if members.sum() < 3:
+            continue
+        eigenvalues, eigenvectors = np.linalg.eigh(np.cov(random_xyz[members].T.astype(np.float64)))
+        node_points = index == node
+        np.testing.assert_allclose(e1[node_points], eigenvalues[2], rtol=1e-5)
+        np.testing.assert_allclose(e3[node_points], eigenvalues[0], rtol=1e-5, atol=1e-9)
+        np.testing.assert_allclose(np.abs(ev1[node_points] @ eigenvectors[:, 2]), 1, rtol=1e-5)
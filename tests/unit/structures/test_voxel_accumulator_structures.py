@@ -0,0 +1,124 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+
+from pyntcloud.structures import VoxelAccumulator
+
+
+def random_frames(n_frames, n_points=200, seed=0):
+    rng = np.random.RandomState(seed)
+    # frames drift along x, like a moving sensor
+    return [rng.rand(n_points, 3).astype(np.float32) + [i * 0.5, 0, 0] for i in range(n_frames)]
+
+
+def expected_statistics(points, origin, size):
+    ijk = np.floor((points - origin) / size).astype(np.int64)
+    df = pd.DataFrame(points.astype(np.float64), columns=["x", "y", "z"])
+    df["i"], df["j"], df["k"] = ijk.T
+    return df.groupby(["i", "j", "k"]).agg({"x": ["sum", "max"], "z": ["mean", "count"]})
+
+
+def check_statistics(accumulator, points):
+    expected = expected_statistics(points, accumulator.origin, accumulator.size)
+    ijk, count = accumulator.get_feature_vector(mode="density")
+    aggregated = accumulator.aggregate({"x": ["sum", "max"], "z": "mean", "count": True})
+
+    order = np.lexsort(ijk.T[::-1])
+    np.testing.assert_array_equal(ijk[order], np.array(expected.index.tolist()))
+    aggregated = aggregated.iloc[order]
+    np.testing.assert_allclose(aggregated["x_sum"], expected["x"]["sum"])
+    np.testing.assert_allclose(aggregated["x_max"], expected["x"]["max"])
+    np.testing.assert_allclose(aggregated["z_mean"], expected["z"]["mean"])
+    np.testing.assert_allclose(aggregated["count"], expected["z"]["count"])
+
+
+def test_accumulated_frames_match_all_points():
+    frames = random_frames(5)
+    accumulator = VoxelAccumulator(points=frames[0], size=0.25)
+    accumulator.compute()
+    for frame in frames[1:]:
+        accumulator.add_points(frame)
+
+    assert accumulator.id.startswith("VA")
+    assert accumulator.n_frames == 5
+    check_statistics(accumulator, np.concatenate(frames))
+
+
+def test_max_frames_only_keeps_last_frames():
+    frames = random_frames(12)
+    accumulator = VoxelAccumulator(points=frames[0], size=0.25, max_frames=3)
+    accumulator.compute()
+    for frame in frames[1:]:
+        accumulator.add_points(frame)
+
+    assert len(accumulator.frames) == 3
+    check_statistics(accumulator, np.concatenate(frames[-3:]))
+    # empty voxels were compacted away
+    assert accumulator._n_slots < 2 * len(accumulator.voxel_keys)
+
+
+def test_decay_weights_older_frames():
+    frames = random_frames(2)
+    frames[1] = frames[0][::-1].copy()
+    accumulator = VoxelAccumulator(points=frames[0], size=0.5, decay=0.5)
+    accumulator.compute()
+    accumulator.add_points(frames[1])
+
+    expected = 1.5 * expected_statistics(frames[0], accumulator.origin, accumulator.size)["z"]["count"].values
+    np.testing.assert_allclose(np.sort(accumulator.voxel_counts), np.sort(expected))
+
+
+def test_decay_and_max_frames():
+    frames = random_frames(4)
+    accumulator = VoxelAccumulator(points=frames[0], size=0.25, decay=0.5, max_frames=2)
+    accumulator.compute()
+    for frame in frames[1:]:
+        accumulator.add_points(frame)
+
+    expected = VoxelAccumulator(points=frames[2], size=0.25, origin=accumulator.origin, decay=0.5)
+    expected.compute()
+    expected.add_points(frames[3])
+    np.testing.assert_array_equal(accumulator.voxel_keys, expected.voxel_keys)
+    np.testing.assert_allclose(accumulator.voxel_counts, expected.voxel_counts)
+    pd.testing.assert_frame_equal(
+        accumulator.aggregate({"y": ["max", "mean"]}), expected.aggregate({"y": ["max", "mean"]}))
+
+
+def test_decay_survives_rescaling():
+    frames = random_frames(150, n_points=20)
+    accumulator = VoxelAccumulator(points=frames[0], size=0.25, decay=0.1, max_frames=2)
+    accumulator.compute()
+    for frame in frames[1:]:
+        accumulator.add_points(frame)
+    assert accumulator._weight < 1e100
+
+    expected = VoxelAccumulator(points=frames[-2], size=0.25, origin=accumulator.origin, decay=0.1)
+    expected.compute()
+    expected.add_points(frames[-1])
+    np.testing.assert_array_equal(accumulator.voxel_keys, expected.voxel_keys)
+    np.testing.assert_allclose(accumulator.voxel_counts, expected.voxel_counts)
+    pd.testing.assert_frame_equal(
+        accumulator.aggregate({"x": ["max", "sum"]}), expected.aggregate({"x": ["max", "sum"]}))
+
+
+def test_voxel_centers():
+    points = np.array([[0, 0, 0], [1, 1, 1], [-0.5, 0.2, 0.7]])
+    accumulator = VoxelAccumulator(points=points, size=1, origin=[0, 0, 0])
+    accumulator.compute()
+    np.testing.assert_allclose(
+        accumulator.get_voxel_centers(),
+        [[-0.5, 0.5, 0.5], [0.5, 0.5, 0.5], [1.5, 1.5, 1.5]])
+
+
+def test_invalid_requests_raise():
+    accumulator = VoxelAccumulator(points=random_frames(1)[0], size=0.25)
+    accumulator.compute()
+    with pytest.raises(ValueError):
+        accumulator.remove_oldest_frame()
+    with pytest.raises(ValueError):
+        accumulator.aggregate({"z": ["min"]})
+    with pytest.raises(ValueError):
+        accumulator.add_points(np.array([[1e9, 0, 0]]))
+    with pytest.raises(NotImplementedError):
+        accumulator.get_feature_vector(mode="TDF")
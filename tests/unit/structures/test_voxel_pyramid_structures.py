@@ -0,0 +1,47 @@
+import pytest
+
+import numpy as np
+
+from pyntcloud.structures import VoxelGrid, VoxelPyramid
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_levels_match_voxelgrids_computed_from_points(sparse):
+    xyz = np.random.RandomState(0).rand(2000, 3) * [1, 2, 0.5]
+    pyramid = VoxelPyramid(points=xyz, max_level=5, n_levels=4, sparse=sparse)
+    pyramid.compute()
+    assert sorted(pyramid.levels) == [2, 3, 4, 5]
+
+    for level, voxelgrid in pyramid.levels.items():
+        n = 2 ** level
+        expected = VoxelGrid(points=xyz, n_x=n, n_y=n, n_z=n, sparse=sparse)
+        expected.compute()
+        assert voxelgrid.id == expected.id
+        for attribute in ["voxel_x", "voxel_y", "voxel_z", "voxel_n", "voxel_keys", "voxel_start", "voxel_counts"]:
+            np.testing.assert_array_equal(getattr(voxelgrid, attribute), getattr(expected, attribute))
+        # points inside each voxel may be listed in a different order
+        np.testing.assert_array_equal(voxelgrid.voxel_n[voxelgrid.order], expected.voxel_n[expected.order])
+        np.testing.assert_allclose(
+            voxelgrid.aggregate({"z": ["mean", "max"]}), expected.aggregate({"z": ["mean", "max"]}))
+        if not sparse:
+            np.testing.assert_allclose(
+                voxelgrid.get_feature_vector(mode="density"), expected.get_feature_vector(mode="density"))
+
+
+@pytest.mark.parametrize("max_level, n_levels", [
+    (21, 1),
+    (-1, 1),
+    (3, 0),
+    (3, 5)
+])
+def test_invalid_levels_raise(max_level, n_levels):
+    with pytest.raises(ValueError):
+        VoxelPyramid(points=np.zeros((1, 3)), max_level=max_level, n_levels=n_levels)
+
+
+def test_get_level():
+    pyramid = VoxelPyramid(points=np.random.rand(10, 3), max_level=3, n_levels=2)
+    pyramid.compute()
+    assert pyramid.get_level(2).x_y_z == [4, 4, 4]
+    with pytest.raises(ValueError):
+        pyramid.get_level(1)
@@ -94,3 +94,185 @@ def test_output_shape_of_all_feature_vector_modes(mode, simple_pyntcloud):
     feature_vector = voxelgrid.get_feature_vector(mode=mode)
 
     assert feature_vector.shape == (2, 2, 2)
+
+
+@pytest.mark.parametrize("mode", [
+    "binary",
+    "density",
+    "x_mean",
+    "y_mean",
+    "z_mean",
+    "x_max",
+    "y_max",
+    "z_max"
+])
+def test_sparse_feature_vector_matches_dense(mode, simple_pyntcloud):
+    dense = VoxelGrid(points=simple_pyntcloud.xyz, n_x=5, n_y=5, n_z=5)
+    dense.compute()
+    sparse = VoxelGrid(points=simple_pyntcloud.xyz, n_x=5, n_y=5, n_z=5, sparse=True)
+    sparse.compute()
+
+    assert sparse.voxel_centers is None
+    assert sparse.id != dense.id
+    np.testing.assert_array_equal(sparse.voxel_n, dense.voxel_n)
+
+    ijk, values = sparse.get_feature_vector(mode=mode)
+    assert ijk.shape == (len(np.unique(dense.voxel_n)), 3)
+    feature_vector = np.zeros(sparse.x_y_z)
+    feature_vector[tuple(ijk.T)] = values
+    np.testing.assert_allclose(feature_vector, dense.get_feature_vector(mode=mode))
+
+
+def test_sparse_voxel_centers_and_neighbors_match_dense(simple_pyntcloud):
+    dense = VoxelGrid(points=simple_pyntcloud.xyz, n_x=5, n_y=5, n_z=5)
+    dense.compute()
+    sparse = VoxelGrid(points=simple_pyntcloud.xyz, n_x=5, n_y=5, n_z=5, sparse=True)
+    sparse.compute()
+
+    np.testing.assert_array_equal(sparse.voxel_keys, [0, 31, 62, 124])
+    np.testing.assert_array_equal(sparse.voxel_counts, [2, 1, 1, 2])
+    np.testing.assert_allclose(sparse.get_voxel_centers(), dense.voxel_centers[sparse.voxel_keys], atol=1e-6)
+    np.testing.assert_allclose(sparse.get_voxel_centers(62), dense.voxel_centers[62], atol=1e-6)
+    for voxel in sparse.voxel_keys:
+        assert sparse.get_voxel_neighbors(voxel) == dense.get_voxel_neighbors(voxel)
+    assert sparse.get_voxel_neighbors(31) == [0, 31, 62]
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_voxelize_matches_searchsorted_including_boundaries(use_numba, monkeypatch):
+    import pyntcloud.structures.voxelgrid as voxelgrid_module
+    if not use_numba:
+        monkeypatch.setattr(voxelgrid_module, "is_numba_avaliable", False)
+    elif not voxelgrid_module.is_numba_avaliable:
+        pytest.skip("numba is not available")
+
+    rng = np.random.RandomState(0)
+    x_y_z = [7, 3, 10]
+    segments = [np.linspace(-1.3, 2.9, num=n + 1) for n in x_y_z]
+    points = rng.uniform(-1.3, 2.9, (1000, 3))
+    # points lying exactly on every boundary of every axis
+    for axis, s in enumerate(segments):
+        points[:len(s), axis] = s
+    points = np.concatenate([points, points.astype(np.float32)])
+
+    expected_ijk = np.stack([
+        np.clip(np.searchsorted(segments[i], points[:, i]) - 1, 0, x_y_z[i] - 1) for i in range(3)])
+    ijk, voxel_n = voxelgrid_module.voxelize(points, segments)
+
+    assert ijk.dtype == np.int32
+    np.testing.assert_array_equal(ijk, expected_ijk)
+    np.testing.assert_array_equal(voxel_n, np.ravel_multi_index(expected_ijk, x_y_z))
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_voxelize_flat_axis_and_outside_points(use_numba, monkeypatch):
+    import pyntcloud.structures.voxelgrid as voxelgrid_module
+    if not use_numba:
+        monkeypatch.setattr(voxelgrid_module, "is_numba_avaliable", False)
+    elif not voxelgrid_module.is_numba_avaliable:
+        pytest.skip("numba is not available")
+
+    segments = [np.linspace(0, 1, num=3), np.linspace(0, 1, num=3), np.array([0.5, 0.5])]
+    points = np.array([
+        [-1, 2, 0.5],
+        [0.5, 0.75, 0.5]])
+    ijk, voxel_n = voxelgrid_module.voxelize(points, segments)
+
+    np.testing.assert_array_equal(ijk, [[0, 0], [1, 1], [0, 0]])
+    np.testing.assert_array_equal(voxel_n, [1, 1])
+
+
+@pytest.mark.parametrize("connectivity", [6, 18, 26])
+@pytest.mark.parametrize("sparse", [False, True])
+def test_adjacency_matches_get_voxel_neighbors(connectivity, sparse):
+    xyz = np.random.RandomState(0).rand(300, 3)
+    voxelgrid = VoxelGrid(points=xyz, n_x=6, n_y=6, n_z=6, sparse=sparse)
+    voxelgrid.compute()
+
+    adjacency = voxelgrid.adjacency(connectivity=connectivity)
+    assert adjacency.shape == (len(voxelgrid.voxel_keys), len(voxelgrid.voxel_keys))
+    assert (adjacency != adjacency.T).nnz == 0
+    assert adjacency.diagonal().sum() == 0
+
+    ijk = voxelgrid.get_voxel_ijk()
+    for i, voxel in enumerate(voxelgrid.voxel_keys):
+        expected = [x for x in voxelgrid.get_voxel_neighbors(voxel) if x != voxel]
+        distance = np.abs(voxelgrid.get_voxel_ijk(expected) - ijk[i]).sum(1)
+        expected = np.array(expected)[distance <= {6: 1, 18: 2, 26: 3}[connectivity]]
+        np.testing.assert_array_equal(voxelgrid.voxel_keys[adjacency[i].indices], expected)
+
+
+def test_adjacency_raises_on_invalid_connectivity(simple_pyntcloud):
+    voxelgrid = VoxelGrid(points=simple_pyntcloud.xyz)
+    voxelgrid.compute()
+    with pytest.raises(ValueError):
+        voxelgrid.adjacency(connectivity=8)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_aggregate_matches_pandas_groupby(use_numba, monkeypatch):
+    import pyntcloud.structures.voxelgrid as voxelgrid_module
+    if not use_numba:
+        monkeypatch.setattr(voxelgrid_module, "is_numba_avaliable", False)
+    elif not voxelgrid_module.is_numba_avaliable:
+        pytest.skip("numba is not available")
+
+    rng = np.random.RandomState(0)
+    points = pd.DataFrame(rng.uniform(-1, 1, (500, 3)), columns=["x", "y", "z"])
+    points["intensity"] = rng.randint(0, 255, 500).astype(np.uint8)
+    voxelgrid = VoxelGrid(points=points[["x", "y", "z"]].values, n_x=4, n_y=4, n_z=4)
+    voxelgrid.compute()
+
+    aggregated = voxelgrid.aggregate(
+        {"z": ["max", "mean"], "intensity": ["mean", "min", "sum"], "count": True}, points=points)
+
+    grouped = points.groupby(voxelgrid.voxel_n)
+    assert list(aggregated.columns) == ["z_max", "z_mean", "intensity_mean", "intensity_min", "intensity_sum", "count"]
+    np.testing.assert_array_equal(aggregated.index, voxelgrid.voxel_keys)
+    np.testing.assert_allclose(aggregated["z_max"], grouped["z"].max())
+    np.testing.assert_allclose(aggregated["z_mean"], grouped["z"].mean())
+    np.testing.assert_allclose(aggregated["intensity_mean"], grouped["intensity"].mean())
+    np.testing.assert_allclose(aggregated["intensity_min"], grouped["intensity"].min())
+    np.testing.assert_allclose(aggregated["intensity_sum"], grouped["intensity"].sum())
+    np.testing.assert_array_equal(aggregated["count"], grouped.size())
+
+
+def test_aggregate_raises_on_unsupported_reduction_or_field(simple_pyntcloud):
+    voxelgrid = VoxelGrid(points=simple_pyntcloud.xyz)
+    voxelgrid.compute()
+    with pytest.raises(ValueError):
+        voxelgrid.aggregate({"z": ["median"]})
+    with pytest.raises(ValueError):
+        voxelgrid.aggregate({"intensity": ["mean"]})
+
+
+def test_max_feature_vector_of_negative_coordinates():
+    xyz = -np.random.RandomState(0).rand(100, 3) - 1
+    voxelgrid = VoxelGrid(points=xyz, n_x=2, n_y=2, n_z=2)
+    voxelgrid.compute()
+    feature_vector = voxelgrid.get_feature_vector(mode="z_max")
+    assert feature_vector.max() <= -1
+
+
+@pytest.mark.parametrize("truncation", [None, 0.05, 0.3])
+@pytest.mark.parametrize("regular_bounding_box", [True, False])
+def test_TDF_matches_brute_force(truncation, regular_bounding_box):
+    from scipy.spatial import cKDTree
+    xyz = np.random.RandomState(0).rand(50, 3) * [1, 0.5, 0.2]
+    voxelgrid = VoxelGrid(points=xyz, n_x=12, n_y=9, n_z=7, regular_bounding_box=regular_bounding_box)
+    voxelgrid.compute()
+
+    expected_truncation = 2 * max(voxelgrid.shape) if truncation is None else truncation
+    distances = cKDTree(xyz).query(voxelgrid.voxel_centers)[0]
+    expected = np.clip(1 - distances / expected_truncation, 0, 1).reshape(voxelgrid.x_y_z)
+
+    feature_vector = voxelgrid.get_feature_vector(mode="TDF", truncation=truncation)
+    np.testing.assert_allclose(feature_vector, expected, atol=1e-6)
+
+    sparse = VoxelGrid(
+        points=xyz, n_x=12, n_y=9, n_z=7, regular_bounding_box=regular_bounding_box, sparse=True)
+    sparse.compute()
+    ijk, values = sparse.get_feature_vector(mode="TDF", truncation=truncation, kdtree=cKDTree(xyz))
+    assert np.all(values > 0)
+    np.testing.assert_array_equal(ijk, np.argwhere(expected > 0))
+    np.testing.assert_allclose(values, expected[tuple(ijk.T)], atol=1e-5)
@@ -0,0 +1,80 @@
+import pytest
+
+import numpy as np
+
+from pyntcloud.utils.array import cov3D, cov3D_from_csr, cov3D_from_indices, eigh3D, eigvalsh3D, reduce_segments
+
+
+@pytest.mark.parametrize("ufunc, empty, expected", [
+    (np.add, 0, [3, 0, 3, 0, 15]),
+    (np.maximum, -1, [2, -1, 3, -1, 6]),
+])
+def test_reduce_segments_handles_empty_segments(ufunc, empty, expected):
+    values = np.array([1, 2, 3, 4, 5, 6])
+    indptr = np.array([0, 2, 2, 3, 3, 6])
+    result = reduce_segments(values, indptr, ufunc=ufunc, empty=empty)
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_reduce_segments_reduces_along_first_axis():
+    values = np.arange(12).reshape(6, 2)
+    indptr = np.array([0, 0, 4, 6])
+    result = reduce_segments(values, indptr)
+    np.testing.assert_array_equal(result, [[0, 0], [12, 16], [18, 20]])
+
+
+def random_covariances(n=1000, seed=0):
+    x = np.random.RandomState(seed).randn(n, 3, 3)
+    return x @ x.transpose(0, 2, 1)
+
+
+def test_eigvalsh3D_matches_numpy():
+    cov = random_covariances()
+    expected = np.linalg.eigvalsh(cov)[:, ::-1]
+    assert np.allclose(eigvalsh3D(cov), expected, rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize("cov", [
+    random_covariances(),
+    # repeated and zero eigen values
+    np.array([np.eye(3), np.diag([1., 1., 2.]), np.diag([3., 1., 1.]), np.zeros((3, 3)), np.diag([1., 0., 0.])]),
+    # coplanar neighbourhoods
+    np.array([[[2., 1., 0.], [1., 3., 0.], [0., 0., 0.]]])
+])
+def test_eigh3D_is_orthonormal_decomposition(cov):
+    eigenvalues, eigenvectors = eigh3D(cov)
+    assert np.all(np.diff(eigenvalues, axis=1) <= 0)
+    assert np.allclose(np.einsum("nij,njk->nik", cov, eigenvectors), eigenvectors * eigenvalues[:, None, :],
+                       rtol=0, atol=1e-10)
+    assert np.allclose(np.einsum("nji,njk->nik", eigenvectors, eigenvectors), np.eye(3))
+
+
+def test_eigh3D_exact_zero_for_coplanar():
+    cov = np.array([[[2., 1., 0.], [1., 3., 0.], [0., 0., 0.]]])
+    eigenvalues, eigenvectors = eigh3D(cov)
+    assert eigenvalues[0, 2] == 0
+    assert np.all(eigenvectors[0, :2, 2] == 0)
+    assert np.all(eigenvectors[0, 2, :2] == 0)
+
+
+def test_cov3D_from_indices_matches_cov3D():
+    random_state = np.random.RandomState(0)
+    points = random_state.rand(100, 3) + 100
+    k_neighbors = random_state.randint(0, 100, (20, 8))
+    queries = np.arange(20)
+    assert np.allclose(cov3D_from_indices(points, k_neighbors), cov3D(points[k_neighbors]))
+    assert np.allclose(
+        cov3D_from_indices(points, k_neighbors, queries=queries),
+        cov3D(points[np.c_[queries, k_neighbors]]))
+
+
+def test_cov3D_from_csr_matches_cov3D():
+    random_state = np.random.RandomState(0)
+    points = random_state.rand(100, 3) + 100
+    indptr = np.array([0, 4, 4, 10])
+    indices = random_state.randint(0, 100, 10)
+    cov, counts = cov3D_from_csr(points, indptr, indices, np.arange(3))
+    np.testing.assert_array_equal(counts, [4, 0, 6])
+    assert np.allclose(cov[0], cov3D(points[indices[None, :4]])[0])
+    assert np.all(np.isnan(cov[1]))
+    assert np.allclose(cov[2], cov3D(points[indices[None, 4:]])[0])